@@ -7,5 +7,12 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'reserfast.settings')
+# Las URLs de login usan las vistas asíncronas (ver SERVIDOR en settings).
+os.environ.setdefault('RESERFAST_SERVIDOR', 'asgi')
 
 application = get_asgi_application()
+
+# gunicorn/uwsgi no corren los system checks: se verifican los de despliegue.
+from reserfast_app.checks import verificar_al_iniciar  # noqa: E402
+
+verificar_al_iniciar()
@@ -35,3 +35,6 @@ else:
 EMAIL_HOST_USER = ""
 EMAIL_HOST_PASSWORD = ""
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+# Costo de bcrypt calibrado para este equipo (manage.py calibrar_bcrypt --write)
+# BCRYPT_ROUNDS = 12
@@ -79,6 +79,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'reserfast.wsgi.application'
 
+# 'asgi' when served by reserfast/asgi.py (which sets it): the login URLs then
+# route to the async views, which await bcrypt without holding a worker.
+SERVIDOR = os.environ.get('RESERFAST_SERVIDOR', 'wsgi')
+
 DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite3').lower()
 
 if DB_ENGINE == 'mysql':
@@ -122,6 +126,14 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploaded photos under these prefixes are stored by content hash (dedup);
+# unreferenced files are removed with `python manage.py limpiar_media`.
+STORAGES = {
+    'default': {'BACKEND': 'reserfast_app.storage.ContenidoStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+CONTENT_ADDRESSED_PREFIXES = ('menu_img/', 'perfil_img/')
+
 # Email configuration
 EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True').lower() in ('1','true','yes','on')
@@ -134,7 +146,89 @@ DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
 if DEBUG and os.environ.get('EMAIL_BACKEND') is None:
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Cache: per-process LocMem by default. In multi-process deployments point it
+# to a shared backend (Redis/Memcached) so version counters are shared; the
+# reserfast_app.E001 check (also run at WSGI/ASGI startup) refuses LocMem when
+# WEB_PROCESSES > 1.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'reserfast'),
+    }
+}
+
+# Web server processes serving this settings module. Read from the same
+# variable gunicorn uses for its default worker count.
+WEB_PROCESSES = int(os.environ.get('WEB_CONCURRENCY', '1'))
+
+# Seconds an authenticated principal (TblCliente/TblUsuario) may be served
+# from cache; writes invalidate it immediately through its version counter.
+PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', '300'))
+
+# Seconds the admin dashboard counters are cached; model writes invalidate
+# them immediately, the TTL only bounds bulk/raw updates.
+DASHBOARD_STATS_TTL = int(os.environ.get('DASHBOARD_STATS_TTL', '30'))
+
+# Threads per process that run bcrypt (hash/verify). Bounds the CPU a login
+# burst can take; 0/unset means min(4, cpu_count).
+PASSWORD_HASHER_WORKERS = int(os.environ.get('PASSWORD_HASHER_WORKERS', '0'))
+
+# bcrypt cost factor for new hashes. Calibrate per host with
+# `python manage.py calibrar_bcrypt --write` (writes local_settings.py);
+# existing hashes are migrated on the next successful login.
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+
+# Login throttling (atomic sliding-window counters), as (capacity, attempts per
+# minute): `capacity` attempts per window of capacity / per-minute minutes.
+# Checked before any DB lookup or bcrypt work; per client IP and per account.
+LOGIN_THROTTLE_IP = (
+    int(os.environ.get('LOGIN_THROTTLE_IP_BURST', '20')),
+    int(os.environ.get('LOGIN_THROTTLE_IP_PER_MINUTE', '10')),
+)
+LOGIN_THROTTLE_CUENTA = (
+    int(os.environ.get('LOGIN_THROTTLE_CUENTA_BURST', '5')),
+    int(os.environ.get('LOGIN_THROTTLE_CUENTA_PER_MINUTE', '2')),
+)
+
+# Resized derivatives (original format + WebP) generated in the background for
+# uploaded menu/profile photos; templates serve them through srcset. Backfill
+# existing media with `python manage.py generar_derivadas`.
+IMAGE_DERIVATIVE_WIDTHS = tuple(
+    int(w) for w in os.environ.get('IMAGE_DERIVATIVE_WIDTHS', '320,640,1024').split(',') if w.strip()
+)
+IMAGE_DERIVATIVE_WORKERS = int(os.environ.get('IMAGE_DERIVATIVE_WORKERS', '1'))
+
+# Photo uploads (menu images, profile photos) are validated while streaming:
+# magic bytes and dimensions from the first chunk, size as data arrives.
+FILE_UPLOAD_HANDLERS = [
+    'reserfast_app.uploads.ImagenUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+IMAGE_UPLOAD_FIELDS = ('s_imagen', 's_foto_perfil')
+IMAGE_UPLOAD_MAX_BYTES = int(os.environ.get('IMAGE_UPLOAD_MAX_BYTES', str(5 * 1024 * 1024)))
+IMAGE_UPLOAD_MAX_PIXELS = int(os.environ.get('IMAGE_UPLOAD_MAX_PIXELS', '40000000'))
+
+# Rendered menu/mesa cards are cached per object ({% fragmento %}); keys carry
+# a fingerprint of the object, so edits never need invalidation.
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', '3600'))
+
+# Read-only API (/api/v1/), authenticated with the web session (the views set
+# reserfast_app.api.SesionAuthentication themselves). Responses are
+# cached under the version of the data they show (catalog, availability or the
+# client's reservations), so writes invalidate them immediately.
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    'DEFAULT_PARSER_CLASSES': ['rest_framework.parsers.JSONParser'],
+    'UNAUTHENTICATED_USER': None,
+}
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', '300'))
+
+# Cached sessions; the database row is only rewritten when the data changes or
+# the stored expiry lags by more than SESSION_WRITE_STALE_FRACTION of the age.
+# Purge expired rows with `python manage.py purgar_sesiones`.
+SESSION_ENGINE = 'reserfast_app.sesiones'
+SESSION_WRITE_STALE_FRACTION = float(os.environ.get('SESSION_WRITE_STALE_FRACTION', '0.2'))
 SESSION_COOKIE_AGE = 3600
 SESSION_SAVE_EVERY_REQUEST = True
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
@@ -9,6 +9,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('reserfast/admin/', RedirectView.as_view(url='/admin/', permanent=False)),
     path('reserfast/', include('reserfast_app.urls', namespace='reserfast')),
+    path('api/v1/', include('reserfast_app.api_urls', namespace='api_v1')),
     path('password_reset/', include('django.contrib.auth.urls')),
     path('', RedirectView.as_view(url='/reserfast/', permanent=False)),
 ]
@@ -9,3 +9,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'reserfast.settings')
 
 application = get_wsgi_application()
+
+# gunicorn/uwsgi no corren los system checks: se verifican los de despliegue.
+from reserfast_app.checks import verificar_al_iniciar  # noqa: E402
+
+verificar_al_iniciar()
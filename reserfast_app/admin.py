@@ -5,7 +5,7 @@ from django.contrib.auth.forms import ReadOnlyPasswordHashField
 from django import forms
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-import bcrypt
+from . import catalogo, passwords
 from .models import (
     TblMenu, TblMesa, TblReserva, TblReservamenu, TblReservamesa,
     TblUsuario, TblPerfil, TblGenero, TblCliente
@@ -35,7 +35,7 @@ class TblUsuarioCreationForm(forms.ModelForm):
     def save(self, commit=True):
         user = super().save(commit=False)
         password = self.cleaned_data["password1"]
-        user.s_contrasenausuario = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        user.s_contrasenausuario = passwords.hash_password(password)
         if commit:
             user.save()
         return user
@@ -78,7 +78,7 @@ class TblClienteCreationForm(forms.ModelForm):
     def save(self, commit=True):
         cliente = super().save(commit=False)
         password = self.cleaned_data["password1"]
-        cliente.s_contrasena = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        cliente.s_contrasena = passwords.hash_password(password)
         if commit:
             cliente.save()
         return cliente
@@ -104,9 +104,9 @@ class TblClienteChangeForm(forms.ModelForm):
         return cliente
 
 class TblMenuAdmin(admin.ModelAdmin):
-    list_display = ('id_menu', 's_titulomenu', 'i_precio', 'b_activo', 'menu_image_tag')
+    list_display = ('id_menu', 's_titulomenu', 's_categoria', 'i_precio', 'b_activo', 'menu_image_tag')
     search_fields = ('s_titulomenu',)
-    list_filter = ('b_activo',)
+    list_filter = ('b_activo', 's_categoria')
     fieldsets = (
         (None, {'fields': ('s_titulomenu', 's_descripcionmenu', 's_tipomenu', 'i_precio', 's_imagen', 'b_activo')}),
     )
@@ -135,10 +135,12 @@ class TblMesaAdmin(admin.ModelAdmin):
     @admin.action(description='Marcar mesas seleccionadas como Disponibles')
     def marcar_disponible(self, request, queryset):
         queryset.update(b_ocupado=0)
+        catalogo.invalidar()
 
     @admin.action(description='Marcar mesas seleccionadas como Ocupadas')
     def marcar_ocupada(self, request, queryset):
         queryset.update(b_ocupado=1)
+        catalogo.invalidar()
 
 class TblReservaAdmin(admin.ModelAdmin):
     list_display = ('id_reserva', 'fk_id_cliente', 'd_fechainicio', 'i_totalreserva', 'b_activo')
@@ -4,7 +4,7 @@ from django.contrib import messages
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django import forms
-import bcrypt
+from . import passwords
 from .models import TblUsuario, TblCliente
 
 class PasswordChangeForm(forms.Form):
@@ -39,8 +39,7 @@ def change_usuario_password(request, user_id):
         form = PasswordChangeForm(request.POST)
         if form.is_valid():
             new_password = form.cleaned_data['new_password1']
-            hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
-            usuario.s_contrasenausuario = hashed_password.decode('utf-8')
+            usuario.s_contrasenausuario = passwords.hash_password(new_password)
             usuario.save()
             
             messages.success(request, f'✅ Contraseña cambiada exitosamente para {usuario.s_usuario}')
@@ -65,8 +64,7 @@ def change_cliente_password(request, cliente_id):
         form = PasswordChangeForm(request.POST)
         if form.is_valid():
             new_password = form.cleaned_data['new_password1']
-            hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
-            cliente.s_contrasena = hashed_password.decode('utf-8')
+            cliente.s_contrasena = passwords.hash_password(new_password)
             cliente.save()
             
             nombre = f"{cliente.s_primernombrecliente} {cliente.s_primerapellidocliente}".strip()
@@ -0,0 +1,303 @@
+"""API REST de solo lectura (v1) para la app móvil y el kiosco.
+
+    GET /api/v1/menus/           menús activos (?categoria=entrada|rapida|almuerzo|bebida)
+    GET /api/v1/mesas/           mesas activas (?ubicacion=...)
+    GET /api/v1/disponibilidad/  ocupación mesa × fecha (?desde=&hasta=&ubicacion=)
+    GET /api/v1/reservas/        reservas activas del cliente de la sesión
+
+- Serialización con `values()`: cada respuesta lee solo las columnas pedidas
+  y arma diccionarios, sin instanciar modelos ni serializers de DRF.
+- `?fields=id,titulo` (sparse fieldsets) limita los campos devueltos y las
+  columnas consultadas.
+- Los listados usan paginación por cursor (`?cursor=`, `?limite=` hasta 100),
+  estable aunque se agreguen filas entre páginas.
+- Las respuestas se cachean con claves que incluyen la versión de lo que
+  muestran (catálogo, disponibilidad o reservas del cliente), así que una
+  escritura las invalida sin borrar nada.
+
+La autenticación es la sesión de la web (cliente o empleado, vía `identity`).
+"""
+import hashlib
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import BasePermission
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import catalogo, disponibilidad, reservas, versions
+from .identity import get_cliente, get_usuario
+from .models import TblCliente, TblMenu, TblMesa, TblReserva, TblReservamenu, TblReservamesa
+
+
+def _timeout():
+    return getattr(settings, 'API_CACHE_TIMEOUT', 300)
+
+
+def _url_imagen(name):
+    return default_storage.url(name) if name else None
+
+
+# =================== AUTENTICACIÓN Y PERMISOS ===================
+
+class SesionAuthentication(BaseAuthentication):
+    """Principal (TblCliente o TblUsuario) de la sesión web, memorizado por request."""
+
+    def authenticate(self, request):
+        principal = get_cliente(request._request) or get_usuario(request._request)
+        if principal is None:
+            return None
+        return principal, None
+
+    def authenticate_header(self, request):
+        # Con cabecera la respuesta sin sesión es 401 en vez de 403.
+        return 'Session'
+
+
+class ConSesion(BasePermission):
+    def has_permission(self, request, view):
+        return request.user is not None
+
+
+class EsCliente(BasePermission):
+    def has_permission(self, request, view):
+        return isinstance(request.user, TblCliente)
+
+
+class Cursor(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'limite'
+    max_page_size = 100
+
+
+# =================== BASE ===================
+
+def _campos_pedidos(request, disponibles):
+    """Campos de `?fields=` (todos si no se indica); 400 si alguno no existe."""
+    pedido = request.query_params.get('fields')
+    if not pedido:
+        return list(disponibles)
+    campos = [c.strip() for c in pedido.split(',') if c.strip()]
+    desconocidos = [c for c in campos if c not in disponibles]
+    if desconocidos or not campos:
+        raise exceptions.ValidationError({
+            'fields': f"Campos desconocidos: {', '.join(desconocidos)}. Disponibles: {', '.join(disponibles)}."
+        })
+    return campos
+
+
+def _clave(nombre, version, request):
+    params = sorted((k, v) for k, vs in request.query_params.lists() for v in vs)
+    firma = hashlib.md5(
+        repr((request.build_absolute_uri(request.path), params)).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'reserfast:api:v1:{nombre}:{version}:{firma}'
+
+
+def _exigir(cls, *atributos):
+    """Falla al definir `cls` si no declara alguno de `atributos`."""
+    faltantes = [a for a in atributos if getattr(cls, a, None) is None]
+    if faltantes:
+        raise TypeError(f"{cls.__name__} debe definir: {', '.join(faltantes)}")
+
+
+class _Lectura(APIView):
+    """GET con respuesta cacheada bajo `version(request)`.
+
+    Cada recurso define `nombre` (parte de la clave de caché), `version` y
+    `datos(request)`; se verifica al declarar la subclase.
+    """
+    authentication_classes = [SesionAuthentication]
+    permission_classes = [ConSesion]
+    nombre = None
+    version = None
+    datos = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not cls.__name__.startswith('_'):
+            _exigir(cls, 'nombre', 'version', 'datos')
+
+    def get(self, request):
+        key = _clave(self.nombre, self.version(request), request)
+        data = cache.get(key)
+        if data is None:
+            data = self.datos(request)
+            cache.set(key, data, _timeout())
+        return Response(data)
+
+
+class _Listado(_Lectura):
+    """Listado paginado por cursor sobre `values()` con campos a elección.
+
+    Cada listado define `campos` (nombre en la API -> columna del ORM, o None
+    para los que arma `completar`), `orden` (columna del cursor) y
+    `get_queryset(request)`; `convertir` transforma el valor de algunas
+    columnas (p. ej. nombre de archivo -> URL).
+    """
+    campos = None
+    convertir = {}
+    orden = None
+    get_queryset = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not cls.__name__.startswith('_'):
+            _exigir(cls, 'campos', 'orden', 'get_queryset')
+
+    def completar(self, resultados, filas, campos):
+        """Agrega a `resultados` campos que no son columnas (relaciones)."""
+
+    def datos(self, request):
+        campos = _campos_pedidos(request, self.campos)
+        columnas = {self.campos[c] for c in campos if self.campos[c]}
+        columnas.add(self.orden.lstrip('-'))
+        qs = self.get_queryset(request).values(*columnas)
+
+        paginador = Cursor()
+        paginador.ordering = (self.orden,)
+        filas = paginador.paginate_queryset(qs, request, view=self)
+        resultados = [
+            {c: self.convertir.get(c, lambda v: v)(fila[self.campos[c]]) for c in campos if self.campos[c]}
+            for fila in filas
+        ]
+        self.completar(resultados, filas, campos)
+        return paginador.get_paginated_response(resultados).data
+
+
+# =================== RECURSOS ===================
+
+class MenusAPI(_Listado):
+    nombre = 'menus'
+    orden = 'id_menu'
+    campos = {
+        'id': 'id_menu',
+        'titulo': 's_titulomenu',
+        'descripcion': 's_descripcionmenu',
+        'tipo': 's_tipomenu',
+        'categoria': 's_categoria',
+        'precio': 'i_precio',
+        'imagen': 's_imagen',
+    }
+    convertir = {'imagen': _url_imagen}
+
+    def version(self, request):
+        return catalogo.version()
+
+    def get_queryset(self, request):
+        qs = TblMenu.objects.filter(b_activo=True)
+        categoria = request.query_params.get('categoria')
+        if categoria:
+            qs = qs.filter(s_categoria=categoria)
+        return qs
+
+
+class MesasAPI(_Listado):
+    nombre = 'mesas'
+    orden = 'id_mesa'
+    campos = {
+        'id': 'id_mesa',
+        'nombre': 's_nombremesa',
+        'descripcion': 's_descripcionmesa',
+        'ubicacion': 's_ubicacion',
+    }
+
+    def version(self, request):
+        return catalogo.version()
+
+    def get_queryset(self, request):
+        qs = TblMesa.objects.filter(b_activo=True)
+        ubicacion = request.query_params.get('ubicacion', '').strip()
+        if ubicacion:
+            qs = qs.filter(s_ubicacion__iexact=ubicacion)
+        return qs
+
+
+class DisponibilidadAPI(_Lectura):
+    """Ocupación por mesa ('1' = ocupada) de cada día entre `desde` y `hasta`."""
+    nombre = 'disponibilidad'
+
+    def version(self, request):
+        # El índice de ocupación se recorta cada día: la fecha es parte de la versión.
+        return f"{versions.current('disponibilidad')}:{catalogo.version()}:{timezone.now().date()}"
+
+    def datos(self, request):
+        try:
+            desde = datetime.strptime(request.query_params.get('desde', ''), '%Y-%m-%d').date()
+            hasta = datetime.strptime(request.query_params.get('hasta', ''), '%Y-%m-%d').date()
+        except ValueError:
+            raise exceptions.ValidationError({'fecha': 'Formato de fecha inválido (YYYY-MM-DD).'})
+        if hasta < desde or (hasta - desde).days + 1 > disponibilidad.MAX_DIAS:
+            raise exceptions.ValidationError({
+                'fecha': f'Rango inválido (máximo {disponibilidad.MAX_DIAS} días).'
+            })
+
+        mesas = catalogo.actual().mesas_activas
+        ubicacion = request.query_params.get('ubicacion', '').strip().lower()
+        if ubicacion:
+            mesas = [m for m in mesas if (m.s_ubicacion or '').lower() == ubicacion]
+        ocupacion = disponibilidad.matriz([m.id_mesa for m in mesas], desde, hasta)
+        return {
+            'desde': desde.isoformat(),
+            'hasta': hasta.isoformat(),
+            'fechas': [(desde + timedelta(days=n)).isoformat() for n in range((hasta - desde).days + 1)],
+            'mesas': [{'id': m.id_mesa, 'ocupacion': ocupacion[m.id_mesa]} for m in mesas],
+        }
+
+
+class ReservasAPI(_Listado):
+    """Reservas activas del cliente de la sesión, las más nuevas primero."""
+    permission_classes = [EsCliente]
+    nombre = 'reservas'
+    orden = '-id_reserva'
+    campos = {
+        'id': 'id_reserva',
+        'fecha': 'd_fechainicio',
+        'total': 'i_totalreserva',
+        'estado': 'd_fechainicio',
+        'mesa': None,
+        'menus': None,
+    }
+
+    def version(self, request):
+        cliente_id = request.user.pk
+        return f'{cliente_id}:{reservas.version_cliente(cliente_id)}:{timezone.now().date()}'
+
+    def get_queryset(self, request):
+        return TblReserva.objects.filter(fk_id_cliente_id=request.user.pk, b_activo=True)
+
+    def completar(self, resultados, filas, campos):
+        hoy = timezone.now().date()
+        ids = [fila['id_reserva'] for fila in filas]
+        mesas = {}
+        if 'mesa' in campos and ids:
+            # Primera mesa activa por id, como `hidratar_reservas`.
+            for rid, mesa_id, nombre in (
+                TblReservamesa.objects.filter(fk_id_reserva_id__in=ids, b_activo=True)
+                .order_by('-id_reservamesa')
+                .values_list('fk_id_reserva_id', 'fk_id_mesa_id', 'fk_id_mesa__s_nombremesa')
+            ):
+                mesas[rid] = {'id': mesa_id, 'nombre': nombre}
+        menus = {}
+        if 'menus' in campos and ids:
+            for rid, menu_id, titulo, precio in (
+                TblReservamenu.objects.filter(fk_id_reserva_id__in=ids, b_activo=True, fk_id_menu__isnull=False)
+                .order_by('id_reservamenu')
+                .values_list('fk_id_reserva_id', 'fk_id_menu_id', 'fk_id_menu__s_titulomenu', 'fk_id_menu__i_precio')
+            ):
+                menus.setdefault(rid, []).append({'id': menu_id, 'titulo': titulo, 'precio': precio})
+
+        for resultado, fila in zip(resultados, filas):
+            rid = fila['id_reserva']
+            if 'estado' in campos:
+                resultado['estado'] = reservas.estado(True, fila['d_fechainicio'], hoy)
+            if 'mesa' in campos:
+                resultado['mesa'] = mesas.get(rid)
+            if 'menus' in campos:
+                resultado['menus'] = menus.get(rid, [])
@@ -0,0 +1,11 @@
+from django.urls import path
+from . import api
+
+app_name = 'api_v1'
+
+urlpatterns = [
+    path('menus/', api.MenusAPI.as_view(), name='menus'),
+    path('mesas/', api.MesasAPI.as_view(), name='mesas'),
+    path('disponibilidad/', api.DisponibilidadAPI.as_view(), name='disponibilidad'),
+    path('reservas/', api.ReservasAPI.as_view(), name='reservas'),
+]
@@ -0,0 +1,172 @@
+"""Instantánea en memoria del catálogo (menús y mesas).
+
+Las vistas de clientes, cocina y reservas leen el catálogo en cada request.
+`actual()` devuelve una instantánea por proceso construida con dos consultas
+(menús y mesas) a registros compactos con `__slots__`, ya ordenados y
+agrupados por categoría. Se reconstruye cuando cambia la versión compartida
+`catalogo`, que incrementan las escrituras de menús y mesas (`signals.py` y
+las acciones masivas del admin), así que en estado estable leer el catálogo
+no consulta la base de datos.
+
+La categoría de cada menú es la columna canónica `s_categoria` (calculada al
+guardar, ver `TblMenu.save`), así que la carta del cliente y la vista por
+categorías de cocina agrupan igual.
+
+Los registros son de solo lectura y exponen los mismos nombres de atributo que
+los modelos, para que las plantillas los usen sin cambios. Para escribir o
+asignar claves foráneas se sigue usando el ORM.
+"""
+import threading
+
+from django.db import transaction
+
+from . import versions
+from .models import CATEGORIAS_MENU, TblMenu, TblMesa
+
+_VERSION = 'catalogo'
+
+_lock = threading.Lock()
+_snapshot = None
+
+# Variable de contexto de la carta del cliente (menu.html) para cada categoría.
+SECCIONES_CLIENTE = {
+    'entrada': 'frio',
+    'rapida': 'caliente',
+    'almuerzo': 'almuerzos',
+    'bebida': 'bebidas',
+}
+_ETIQUETAS = dict(CATEGORIAS_MENU)
+
+
+class Imagen:
+    """Sustituto liviano de FieldFile: `{% if x.s_imagen %}` y `.url`."""
+    __slots__ = ('name', 'url')
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+
+    def __bool__(self):
+        return bool(self.name)
+
+    def __str__(self):
+        return self.name or ''
+
+
+class Menu:
+    __slots__ = (
+        'id_menu', 's_titulomenu', 's_descripcionmenu', 's_tipomenu',
+        'i_precio', 's_imagen', 'b_activo', 's_categoria',
+    )
+
+    def __init__(self, m):
+        self.id_menu = m.id_menu
+        self.s_titulomenu = m.s_titulomenu
+        self.s_descripcionmenu = m.s_descripcionmenu
+        self.s_tipomenu = m.s_tipomenu
+        self.i_precio = m.i_precio
+        self.s_imagen = Imagen(m.s_imagen.name, m.s_imagen.url if m.s_imagen else None)
+        self.b_activo = bool(m.b_activo)
+        self.s_categoria = m.s_categoria
+
+    @property
+    def pk(self):
+        return self.id_menu
+
+    def __str__(self):
+        return self.s_titulomenu if self.s_titulomenu else f"Menu {self.id_menu}"
+
+
+class Mesa:
+    __slots__ = (
+        'id_mesa', 's_nombremesa', 's_descripcionmesa', 's_ubicacion',
+        'b_ocupado', 'b_activo',
+    )
+
+    def __init__(self, m):
+        self.id_mesa = m.id_mesa
+        self.s_nombremesa = m.s_nombremesa
+        self.s_descripcionmesa = m.s_descripcionmesa
+        self.s_ubicacion = m.s_ubicacion
+        self.b_ocupado = m.b_ocupado
+        self.b_activo = bool(m.b_activo)
+
+    @property
+    def pk(self):
+        return self.id_mesa
+
+    def __str__(self):
+        return f'{self.id_mesa} {self.s_nombremesa} {self.s_descripcionmesa}'
+
+
+class Catalogo:
+    """Listas inmutables (tuplas) ordenadas como las consultas que reemplazan."""
+    __slots__ = (
+        'version', 'menus', 'menus_activos', 'menus_inactivos', 'menu_por_id',
+        'menus_por_categoria', 'menus_por_titulo', 'menus_cliente', 'mesas', 'mesas_activas',
+    )
+
+    def __init__(self, version, menus, mesas):
+        self.version = version
+        # Orden de gestión de cocina: tipo y título.
+        menus = sorted(menus, key=lambda m: (m.s_tipomenu or '', m.s_titulomenu or ''))
+        self.menus = tuple(menus)
+        self.menus_activos = tuple(m for m in menus if m.b_activo)
+        self.menus_inactivos = tuple(m for m in menus if not m.b_activo)
+        self.menu_por_id = {m.id_menu: m for m in menus}
+
+        # Vista por categorías de cocina: {etiqueta: menús}, en el orden de CATEGORIAS_MENU.
+        por_categoria = {codigo: [] for codigo, _ in CATEGORIAS_MENU}
+        for m in menus:
+            por_categoria.setdefault(m.s_categoria, []).append(m)
+        self.menus_por_categoria = {
+            _ETIQUETAS.get(codigo, codigo): tuple(lista) for codigo, lista in por_categoria.items() if lista
+        }
+
+        # Carta del cliente y formularios de reserva: activos por título.
+        self.menus_por_titulo = tuple(sorted(self.menus_activos, key=lambda m: m.s_titulomenu or ''))
+        cliente = {seccion: [] for seccion in SECCIONES_CLIENTE.values()}
+        for m in self.menus_por_titulo:
+            cliente[SECCIONES_CLIENTE.get(m.s_categoria, 'caliente')].append(m)
+        self.menus_cliente = {seccion: tuple(lista) for seccion, lista in cliente.items()}
+
+        mesas = sorted(mesas, key=lambda m: m.s_nombremesa or '')
+        self.mesas = tuple(mesas)
+        self.mesas_activas = tuple(m for m in mesas if m.b_activo)
+
+
+def _construir(version):
+    return Catalogo(
+        version,
+        [Menu(m) for m in TblMenu.objects.all()],
+        [Mesa(m) for m in TblMesa.objects.all()],
+    )
+
+
+def actual():
+    """Instantánea vigente del catálogo (se reconstruye si cambió la versión)."""
+    global _snapshot
+    version = versions.current(_VERSION)
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    snapshot = _construir(version)
+    with _lock:
+        if _snapshot is None or _snapshot.version <= version:
+            _snapshot = snapshot
+    return snapshot
+
+
+def version():
+    """Versión vigente (sin construir la instantánea): para ETags."""
+    return versions.current(_VERSION)
+
+
+def modificado():
+    """Epoch del último cambio del catálogo, o None si no se conoce."""
+    return versions.modificado(_VERSION)
+
+
+def invalidar():
+    """Descarta la instantánea en todos los procesos tras el commit."""
+    transaction.on_commit(lambda: versions.bump(_VERSION))
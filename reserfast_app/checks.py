@@ -0,0 +1,43 @@
+"""System checks de la configuración de despliegue.
+
+Los contadores de `versions.py` invalidan los cachés de cada proceso
+(principales, catálogo, disponibilidad, fragmentos, API...) y viven en
+`CACHES['default']`. Con un caché por proceso (`LocMemCache`) y varios
+procesos web, una escritura solo se ve en el proceso que la atendió: una
+desactivación podría seguir aceptándose en los demás hasta que venza el TTL.
+Por eso se exige un caché compartido cuando `WEB_PROCESSES` (variable
+`WEB_CONCURRENCY`, la misma que usa gunicorn) es mayor que 1.
+
+gunicorn/uwsgi no corren los system checks, así que `wsgi.py` y `asgi.py`
+llaman a `verificar_al_iniciar()`.
+"""
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+# Backends cuyo contenido es propio de cada proceso.
+_CACHES_POR_PROCESO = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@checks.register(checks.Tags.caches)
+def cache_compartida(app_configs=None, **kwargs):
+    procesos = getattr(settings, 'WEB_PROCESSES', 1)
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if procesos > 1 and backend in _CACHES_POR_PROCESO:
+        return [checks.Error(
+            f"CACHES['default'] usa {backend.rsplit('.', 1)[-1]} con WEB_PROCESSES={procesos}.",
+            hint=(
+                'Los contadores de versión que invalidan principales y cachés deben ser '
+                'compartidos entre procesos: configura CACHE_BACKEND/CACHE_LOCATION '
+                '(Redis o Memcached) o usa un solo proceso.'
+            ),
+            id='reserfast_app.E001',
+        )]
+    return []
+
+
+def verificar_al_iniciar():
+    """Lanza ImproperlyConfigured si la configuración de caché no es segura."""
+    errores = [e for e in cache_compartida() if e.is_serious()]
+    if errores:
+        raise ImproperlyConfigured(f'{errores[0].msg} {errores[0].hint}')
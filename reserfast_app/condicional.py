@@ -0,0 +1,111 @@
+"""GET condicional (ETag / Last-Modified) para el catálogo y la disponibilidad.
+
+Las funciones de este módulo se usan con `django.views.decorators.http.condition`
+y solo leen contadores de versión (caché) o el índice en memoria de
+`disponibilidad`, así que un navegador o una tablet de cocina que revalida una
+página sin cambios recibe un 304 sin que la vista consulte ni renderice nada.
+
+- Páginas HTML del catálogo: versión del catálogo y de las derivadas de
+  imágenes, más la identidad del request (principal y su versión, por la
+  barra de navegación, y la cookie CSRF que va en los formularios).
+- JSON de un menú: versión del catálogo y id del menú.
+- Disponibilidad de una mesa: ocupación de esa mesa en esa fecha
+  (`disponibilidad.sello`), no una versión global de reservas.
+
+`revalidable()` aplica `condition` y marca la respuesta `private, no-cache`
+(el navegador siempre revalida). Los mensajes (`messages`) no forman parte
+del ETag: si hay mensajes pendientes la vista se ejecuta sin GET condicional
+(un 304 los dejaría en cola para la página siguiente), y si la página los
+mostró se quitan los validadores: ese HTML se ve una sola vez y no debe
+revalidarse como si fuera la misma página.
+"""
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from . import catalogo, disponibilidad, imagenes
+from .identity import principal_version
+
+
+def _etag(*partes):
+    return hashlib.md5(repr(partes).encode(), usedforsecurity=False).hexdigest()
+
+
+def _es_lectura(request):
+    return request.method in ('GET', 'HEAD')
+
+
+def revalidable(etag_func, last_modified_func=None):
+    """Decorador de vista: GET condicional con `etag_func` / `last_modified_func`."""
+    def decorator(view_func):
+        vista = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            mensajes = get_messages(request)
+            # len() no marca los mensajes como leídos (iterarlos sí).
+            if mensajes is not None and len(mensajes):
+                response = view_func(request, *args, **kwargs)
+            else:
+                response = vista(request, *args, **kwargs)
+            if getattr(mensajes, 'used', False):
+                del response['ETag']
+                del response['Last-Modified']
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def _identidad(request):
+    """Partes del ETag que dependen de quién pide la página."""
+    cliente_id = request.session.get('cliente_id')
+    usuario_id = request.session.get('id_usuario')
+    return (
+        cliente_id and principal_version('cliente', cliente_id),
+        usuario_id and principal_version('usuario', usuario_id),
+        cliente_id, usuario_id, request.session.get('perfil_usuario'),
+        request.META.get('CSRF_COOKIE'),
+    )
+
+
+def catalogo_etag(request, *args, **kwargs):
+    """ETag de las páginas del cliente que muestran menús o mesas."""
+    if not _es_lectura(request):
+        return None
+    return _etag(
+        'catalogo', request.resolver_match.view_name,
+        catalogo.version(), imagenes.version(), _identidad(request),
+    )
+
+
+def catalogo_last_modified(request, *args, **kwargs):
+    if not _es_lectura(request):
+        return None
+    ts = catalogo.modificado()
+    return datetime.fromtimestamp(ts, tz=dt_timezone.utc) if ts else None
+
+
+def menu_etag(request, menu_id):
+    """ETag del JSON de un menú (GET de `editar_menu_cocina`)."""
+    if not _es_lectura(request):
+        return None
+    return _etag('menu', menu_id, catalogo.version(), request.session.get('perfil_usuario'))
+
+
+def disponibilidad_etag(request, mesa_id):
+    """ETag de `verificar_disponibilidad_mesa` para la mesa y fecha pedidas."""
+    if not _es_lectura(request):
+        return None
+    try:
+        fecha = datetime.strptime(request.GET.get('fecha', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return None
+    return _etag(
+        'disponibilidad', mesa_id, fecha.isoformat(), request.GET.get('exclude_reserva_id'),
+        disponibilidad.sello(mesa_id, fecha), catalogo.version(),
+    )
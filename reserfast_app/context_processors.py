@@ -1,9 +1,20 @@
-from .models import TblCliente, TblUsuario
+from django.utils.functional import SimpleLazyObject
+
+from .identity import get_cliente, get_usuario
 
 def session_info(request):
     """Inyecta información de sesión (cliente/empleado) en todos los templates.
 
-    Provides `current_session` with keys:
+    `current_session` es perezoso: la sesión y el principal se leen recién
+    cuando la plantilla accede a la variable (una vez por request), así que las
+    páginas que no muestran la identidad no consultan nada. El principal sale
+    del memo del request (`get_cliente` / `get_usuario`), compartido con el
+    middleware y las vistas.
+    """
+    return {'current_session': SimpleLazyObject(lambda: _datos_sesion(request))}
+
+def _datos_sesion(request):
+    """Provides the `current_session` dict with keys:
     - is_authenticated: bool
     - type: 'cliente' | 'empleado' | None
     - perfil: 'cliente' | 'admin' | 'cocinero' | 'garzon' | None
@@ -24,8 +35,8 @@ def session_info(request):
     try:
         cid = request.session.get('cliente_id')
         if cid:
-            try:
-                c = TblCliente.objects.get(id_cliente=cid, b_activo=True)
+            c = get_cliente(request)
+            if c is not None:
                 data.update({
                     'is_authenticated': True,
                     'type': 'cliente',
@@ -34,9 +45,7 @@ def session_info(request):
                     'panel_url_name': 'reserfast:index_cliente',
                     'logout_url_name': 'reserfast:logout_cliente',
                 })
-                return {'current_session': data}
-            except Exception:
-                pass
+                return data
     except Exception:
         pass
 
@@ -46,7 +55,7 @@ def session_info(request):
         if uid:
             perfil = (request.session.get('perfil_usuario') or '').strip().lower() or 'admin'
             try:
-                u = TblUsuario.objects.get(id_usuario=uid, b_activo=True)
+                u = get_usuario(request)
                 nombre = (u.s_nombreusuario or u.s_usuario or '').strip() or 'Usuario'
             except Exception:
                 nombre = 'Usuario'
@@ -68,4 +77,4 @@ def session_info(request):
     except Exception:
         pass
 
-    return {'current_session': data}
+    return data
@@ -0,0 +1,73 @@
+"""Contadores del panel de administración.
+
+`estadisticas()` calcula todos los totales con agregación condicional en dos
+consultas (empleados por rol / en servicio, y conteos del resto de tablas) y
+guarda el resultado en caché con un TTL corto (`DASHBOARD_STATS_TTL`). Las
+escrituras relevantes llaman a `invalidar()` (ver `signals.py` y `servicio`),
+así que el TTL solo acota lo que no pasa por esos caminos.
+
+La usan tanto `index_admin` como el endpoint JSON `ajax_admin_estadisticas`.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+
+from . import perfiles, versions
+from .models import TblEstadoEmpleado, TblUsuario
+
+_VERSION = 'dashboard'
+
+# Conteos de tablas sin relación entre sí: una sola sentencia con subconsultas
+# escalares, válida en SQLite y MySQL.
+_SQL_TOTALES = """
+    SELECT
+        (SELECT COUNT(*) FROM tbl_cliente WHERE b_activo = 1),
+        (SELECT COUNT(*) FROM tbl_mesa WHERE b_activo = 1),
+        (SELECT COUNT(*) FROM tbl_menu WHERE b_activo = 1),
+        (SELECT COUNT(*) FROM tbl_reserva WHERE b_activo = 1)
+"""
+
+
+def _ttl():
+    return getattr(settings, 'DASHBOARD_STATS_TTL', 30)
+
+
+def _calcular():
+    en_servicio = Q(Exists(
+        TblEstadoEmpleado.objects.filter(id_usuario=OuterRef('id_usuario'), en_servicio=True)
+    ))
+    garzon = Q(fk_id_perfil_id__in=perfiles.ids('garzon'))
+    cocinero = Q(fk_id_perfil_id__in=perfiles.ids('cocinero'))
+    stats = TblUsuario.objects.aggregate(
+        total_garzones=Count('id_usuario', filter=garzon & Q(b_activo=True)),
+        total_cocineros=Count('id_usuario', filter=cocinero & Q(b_activo=True)),
+        garzones_en_servicio=Count('id_usuario', filter=garzon & en_servicio),
+        cocineros_en_servicio=Count('id_usuario', filter=cocinero & en_servicio),
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(_SQL_TOTALES)
+        clientes, mesas, menus, reservas = cursor.fetchone()
+    stats.update({
+        'total_clientes': clientes or 0,
+        'total_mesas': mesas or 0,
+        'total_menus': menus or 0,
+        'total_reservas': reservas or 0,
+    })
+    return stats
+
+
+def estadisticas():
+    """Diccionario con los contadores del panel (cacheado)."""
+    key = f'reserfast:dashboard:{versions.current(_VERSION)}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = _calcular()
+        cache.set(key, stats, _ttl())
+    return stats
+
+
+def invalidar():
+    """Descarta los contadores cacheados tras el commit de una escritura."""
+    transaction.on_commit(lambda: versions.bump(_VERSION))
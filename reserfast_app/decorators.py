@@ -2,7 +2,7 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from django.http import HttpResponse
 from functools import wraps
-from .models import TblCliente, TblUsuario
+from .identity import get_cliente, get_usuario
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,17 +21,17 @@ def cliente_login_required(view_func):
             return redirect('reserfast:login_clientes')
         
         try:
-            cliente = TblCliente.objects.get(id_cliente=cliente_id, b_activo=True)
-            request.cliente = cliente
-            return view_func(request, *args, **kwargs)
-        except TblCliente.DoesNotExist:
-            request.session.flush()
-            messages.error(request, 'Su sesión ha expirado. Por favor, inicie sesión nuevamente.')
-            return redirect('reserfast:login_clientes')
+            cliente = get_cliente(request)
         except Exception as e:
             logger.error(f"Error en cliente_login_required: {e}")
             messages.error(request, 'Error interno del servidor.')
             return redirect('reserfast:login_clientes')
+
+        if cliente is None:
+            request.session.flush()
+            messages.error(request, 'Su sesión ha expirado. Por favor, inicie sesión nuevamente.')
+            return redirect('reserfast:login_clientes')
+        return view_func(request, *args, **kwargs)
     
     return wrapper
 
@@ -49,17 +49,17 @@ def usuario_login_required(view_func):
             return redirect('reserfast:login_admin')
         
         try:
-            usuario = TblUsuario.objects.get(id_usuario=usuario_id, b_activo=True)
-            request.usuario = usuario
-            return view_func(request, *args, **kwargs)
-        except TblUsuario.DoesNotExist:
-            request.session.flush()
-            messages.error(request, 'Su sesión ha expirado. Por favor, inicie sesión nuevamente.')
-            return redirect('reserfast:login_admin')
+            usuario = get_usuario(request)
         except Exception as e:
             logger.error(f"Error en usuario_login_required: {e}")
             messages.error(request, 'Error interno del servidor.')
             return redirect('reserfast:login_admin')
+
+        if usuario is None:
+            request.session.flush()
+            messages.error(request, 'Su sesión ha expirado. Por favor, inicie sesión nuevamente.')
+            return redirect('reserfast:login_admin')
+        return view_func(request, *args, **kwargs)
     
     return wrapper
 
@@ -85,17 +85,17 @@ def perfil_required(perfiles_permitidos):
                 return redirect('reserfast:index_admin')
             
             try:
-                usuario = TblUsuario.objects.get(id_usuario=usuario_id, b_activo=True)
-                request.usuario = usuario
-                return view_func(request, *args, **kwargs)
-            except TblUsuario.DoesNotExist:
-                request.session.flush()
-                messages.error(request, 'Su sesión ha expirado. Por favor, inicie sesión nuevamente.')
-                return redirect('reserfast:login_admin')
+                usuario = get_usuario(request)
             except Exception as e:
                 logger.error(f"Error en perfil_required: {e}")
                 messages.error(request, 'Error interno del servidor.')
                 return redirect('reserfast:login_admin')
+
+            if usuario is None:
+                request.session.flush()
+                messages.error(request, 'Su sesión ha expirado. Por favor, inicie sesión nuevamente.')
+                return redirect('reserfast:login_admin')
+            return view_func(request, *args, **kwargs)
         
         return wrapper
     return decorator
@@ -115,10 +115,7 @@ def ajax_login_required(user_type='cliente'):
                 if not cliente_id:
                     return HttpResponse('No autorizado', status=401)
                 
-                try:
-                    cliente = TblCliente.objects.get(id_cliente=cliente_id, b_activo=True)
-                    request.cliente = cliente
-                except TblCliente.DoesNotExist:
+                if get_cliente(request) is None:
                     request.session.flush()
                     return HttpResponse('Sesión expirada', status=401)
                     
@@ -127,10 +124,7 @@ def ajax_login_required(user_type='cliente'):
                 if not usuario_id:
                     return HttpResponse('No autorizado', status=401)
                 
-                try:
-                    usuario = TblUsuario.objects.get(id_usuario=usuario_id, b_activo=True)
-                    request.usuario = usuario
-                except TblUsuario.DoesNotExist:
+                if get_usuario(request) is None:
                     request.session.flush()
                     return HttpResponse('Sesión expirada', status=401)
             
@@ -0,0 +1,229 @@
+"""Índice en memoria de ocupación de mesas por fecha.
+
+Responde "¿está libre la mesa M el día D?" y "¿qué días está ocupada la mesa M
+en el rango R?" sin consultar la base de datos en estado estable:
+
+- `ocupacion[fecha][mesa_id]` -> ids de reservas activas (lookup O(1)).
+- `fechas[mesa_id]` -> fechas ocupadas ordenadas (búsqueda O(log n) por rango).
+
+El índice se construye con una sola consulta (reservas desde ayer en adelante;
+para fechas anteriores se consulta la base de datos) y se mantiene al crear,
+editar o cancelar reservas a través de `reserva_modificada` / `mesas_modificadas`,
+que se invocan desde `signals.py` tras el commit. La versión compartida
+(`versions`) hace que los demás procesos reconstruyan su copia.
+"""
+import bisect
+import threading
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import versions
+from .models import TblMesa, TblReservamesa
+
+_VERSION = 'disponibilidad'
+
+# Rango máximo (en días) que aceptan las consultas de disponibilidad en bloque
+# (`matriz`, desde la vista AJAX y la API).
+MAX_DIAS = 62
+
+_lock = threading.Lock()
+_indice = None
+
+
+class _Indice:
+    __slots__ = ('version', 'desde', 'mesas', 'ocupacion', 'fechas', 'por_reserva')
+
+    def __init__(self, version, desde, mesas):
+        self.version = version
+        self.desde = desde
+        self.mesas = mesas
+        self.ocupacion = {}
+        self.fechas = {}
+        self.por_reserva = {}
+
+    def agregar(self, reserva_id, mesa_id, fecha):
+        if fecha is None or mesa_id is None or fecha < self.desde:
+            return
+        reservas = self.ocupacion.setdefault(fecha, {}).setdefault(mesa_id, set())
+        if not reservas:
+            bisect.insort(self.fechas.setdefault(mesa_id, []), fecha)
+        reservas.add(reserva_id)
+        self.por_reserva.setdefault(reserva_id, set()).add((mesa_id, fecha))
+
+    def quitar_reserva(self, reserva_id):
+        for mesa_id, fecha in self.por_reserva.pop(reserva_id, ()):
+            por_mesa = self.ocupacion.get(fecha, {})
+            reservas = por_mesa.get(mesa_id)
+            if reservas is None:
+                continue
+            reservas.discard(reserva_id)
+            if not reservas:
+                del por_mesa[mesa_id]
+                if not por_mesa:
+                    del self.ocupacion[fecha]
+                fechas = self.fechas.get(mesa_id, [])
+                i = bisect.bisect_left(fechas, fecha)
+                if i < len(fechas) and fechas[i] == fecha:
+                    del fechas[i]
+
+
+def _filas_activas(desde, reserva_id=None):
+    qs = TblReservamesa.objects.filter(
+        b_activo=True,
+        fk_id_reserva__b_activo=True,
+        fk_id_reserva__d_fechainicio__gte=desde,
+    )
+    if reserva_id is not None:
+        qs = qs.filter(fk_id_reserva_id=reserva_id)
+    return qs.values_list('fk_id_reserva_id', 'fk_id_mesa_id', 'fk_id_reserva__d_fechainicio')
+
+
+def _construir(version):
+    desde = timezone.now().date() - timedelta(days=1)
+    mesas = tuple(
+        TblMesa.objects.filter(b_activo=True).order_by('s_nombremesa').values_list('id_mesa', flat=True)
+    )
+    indice = _Indice(version, desde, mesas)
+    for reserva_id, mesa_id, fecha in _filas_activas(desde):
+        indice.agregar(reserva_id, mesa_id, fecha)
+    return indice
+
+
+def _actual():
+    """Devuelve el índice vigente, reconstruyéndolo si cambió la versión."""
+    global _indice
+    version = versions.current(_VERSION)
+    indice = _indice
+    if indice is not None and indice.version == version and indice.desde >= timezone.now().date() - timedelta(days=1):
+        return indice
+    indice = _construir(version)
+    with _lock:
+        _indice = indice
+    return indice
+
+
+def _ocupada_en_bd(mesa_id, fecha, excluir_reserva_id=None):
+    qs = TblReservamesa.objects.filter(
+        fk_id_mesa_id=mesa_id,
+        fk_id_reserva__d_fechainicio=fecha,
+        fk_id_reserva__b_activo=True,
+        b_activo=True,
+    )
+    if excluir_reserva_id is not None:
+        qs = qs.exclude(fk_id_reserva_id=excluir_reserva_id)
+    return qs.exists()
+
+
+def mesa_disponible(mesa_id, fecha, excluir_reserva_id=None):
+    """True si la mesa no tiene reservas activas en `fecha`.
+
+    `excluir_reserva_id` permite ignorar la reserva que se está editando.
+    """
+    indice = _actual()
+    if fecha < indice.desde:
+        return not _ocupada_en_bd(mesa_id, fecha, excluir_reserva_id)
+    reservas = indice.ocupacion.get(fecha, {}).get(mesa_id)
+    if not reservas:
+        return True
+    return reservas == {excluir_reserva_id}
+
+
+def sello(mesa_id, fecha):
+    """Valor que cambia cuando cambian las reservas de la mesa en `fecha`.
+
+    Para fechas del índice son los ids de las reservas que la ocupan (sin
+    consultar la base de datos); para fechas anteriores, la versión global.
+    """
+    indice = _actual()
+    if fecha < indice.desde:
+        return f'v{indice.version}'
+    return ','.join(str(r) for r in sorted(indice.ocupacion.get(fecha, {}).get(mesa_id, ())))
+
+
+def _fechas_indice(indice, mesa_id, desde, hasta):
+    """Fechas ocupadas de la mesa según el índice (solo desde `indice.desde`)."""
+    fechas = indice.fechas.get(mesa_id, [])
+    i = bisect.bisect_left(fechas, max(desde, indice.desde))
+    j = bisect.bisect_right(fechas, hasta)
+    return fechas[i:j]
+
+
+def fechas_ocupadas(mesa_id, desde, hasta):
+    """Fechas ocupadas de la mesa entre `desde` y `hasta` (inclusive), ordenadas.
+
+    Las fechas anteriores al índice se consultan en la base de datos.
+    """
+    indice = _actual()
+    antiguas = []
+    if desde < indice.desde:
+        antiguas = sorted(set(
+            TblReservamesa.objects.filter(
+                fk_id_mesa_id=mesa_id,
+                b_activo=True,
+                fk_id_reserva__b_activo=True,
+                fk_id_reserva__d_fechainicio__gte=desde,
+                fk_id_reserva__d_fechainicio__lt=min(indice.desde, hasta + timedelta(days=1)),
+            ).values_list('fk_id_reserva__d_fechainicio', flat=True)
+        ))
+    return antiguas + _fechas_indice(indice, mesa_id, desde, hasta)
+
+
+def _aplicar(reserva_id):
+    global _indice
+    version = versions.bump(_VERSION)
+    with _lock:
+        indice = _indice
+        if indice is None or indice.version != version - 1 or reserva_id is None:
+            # Cambió algo más entre medio (u otras mesas): reconstruir al leer.
+            _indice = None
+            return
+        indice.quitar_reserva(reserva_id)
+        for rid, mesa_id, fecha in _filas_activas(indice.desde, reserva_id):
+            indice.agregar(rid, mesa_id, fecha)
+        indice.version = version
+
+
+def reserva_modificada(reserva_id):
+    """Actualiza el índice tras crear, editar o cancelar `reserva_id`."""
+    transaction.on_commit(lambda: _aplicar(reserva_id))
+
+
+def mesas_modificadas():
+    """Invalida el índice tras altas/bajas de mesas."""
+    transaction.on_commit(lambda: _aplicar(None))
+
+
+def matriz(mesa_ids, desde, hasta, excluir_reserva_id=None):
+    """Ocupación de `mesa_ids` entre `desde` y `hasta` (inclusive).
+
+    Devuelve {mesa_id: '0101...'} con un carácter por día ('1' = ocupada).
+    Los días cubiertos por el índice se resuelven en memoria; los anteriores
+    con una única consulta agregada.
+    """
+    indice = _actual()
+    dias = (hasta - desde).days + 1
+    filas = {m: ['0'] * dias for m in mesa_ids}
+
+    if desde < indice.desde:
+        antiguas = (
+            TblReservamesa.objects.filter(
+                fk_id_mesa_id__in=mesa_ids,
+                b_activo=True,
+                fk_id_reserva__b_activo=True,
+                fk_id_reserva__d_fechainicio__gte=desde,
+                fk_id_reserva__d_fechainicio__lt=min(indice.desde, hasta + timedelta(days=1)),
+            )
+        )
+        if excluir_reserva_id is not None:
+            antiguas = antiguas.exclude(fk_id_reserva_id=excluir_reserva_id)
+        for mesa_id, fecha in antiguas.values_list('fk_id_mesa_id', 'fk_id_reserva__d_fechainicio').distinct():
+            filas[mesa_id][(fecha - desde).days] = '1'
+
+    for mesa_id in mesa_ids:
+        for fecha in _fechas_indice(indice, mesa_id, desde, hasta):
+            reservas = indice.ocupacion.get(fecha, {}).get(mesa_id, ())
+            if reservas and reservas != {excluir_reserva_id}:
+                filas[mesa_id][(fecha - desde).days] = '1'
+    return {m: ''.join(f) for m, f in filas.items()}
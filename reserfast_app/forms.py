@@ -1,7 +1,7 @@
 from django import forms
 from django.utils import timezone
 from .models import TblCliente, TblUsuario, TblMesa, TblMenu, TblReserva, TblGenero
-import bcrypt
+from . import passwords
 
 class ClienteLoginForm(forms.Form):
     email = forms.EmailField(
@@ -109,10 +109,7 @@ class ClienteForm(forms.ModelForm):
     def save(self, commit=True):
         cliente = super().save(commit=False)
         contrasena = self.cleaned_data['s_contrasena']
-        cliente.s_contrasena = bcrypt.hashpw(
-            contrasena.encode('utf-8'), 
-            bcrypt.gensalt()
-        ).decode('utf-8')
+        cliente.s_contrasena = passwords.hash_password(contrasena)
         if commit:
             cliente.save()
         return cliente
@@ -211,10 +208,7 @@ class UsuarioForm(forms.ModelForm):
     def save(self, commit=True):
         usuario = super().save(commit=False)
         contrasena = self.cleaned_data['s_contrasenausuario']
-        usuario.s_contrasenausuario = bcrypt.hashpw(
-            contrasena.encode('utf-8'), 
-            bcrypt.gensalt()
-        ).decode('utf-8')
+        usuario.s_contrasenausuario = passwords.hash_password(contrasena)
         if commit:
             usuario.save()
         return usuario
@@ -249,12 +243,20 @@ class CrearReservaForm(forms.Form):
     def __init__(self, *args, **kwargs):
         mesas = kwargs.pop('mesas', None)
         menus = kwargs.pop('menus', None)
+        catalogo = kwargs.pop('catalogo', None)
         super(CrearReservaForm, self).__init__(*args, **kwargs)
         
         if mesas is not None:
             self.fields['mesa'].queryset = mesas
         if menus is not None:
             self.fields['menus'].queryset = menus
+        if catalogo is not None:
+            # Opciones desde la instantánea del catálogo: renderizar el formulario
+            # no consulta la BD; la validación sigue usando los querysets.
+            self.fields['mesa'].choices = [('', self.fields['mesa'].empty_label)] + [
+                (m.id_mesa, str(m)) for m in catalogo.mesas_activas
+            ]
+            self.fields['menus'].choices = [(m.id_menu, str(m)) for m in catalogo.menus_por_titulo]
 
     def clean_fecha_reserva(self):
         fecha = self.cleaned_data.get('fecha_reserva')
@@ -427,7 +429,7 @@ class EditarPerfilForm(forms.ModelForm):
                 raise forms.ValidationError("La nueva contraseña debe tener al menos 6 caracteres.")
             
             if self.user:
-                if not bcrypt.checkpw(contrasena_actual.encode('utf-8'), self.user.s_contrasena.encode('utf-8')):
+                if not passwords.check_password(contrasena_actual, self.user.s_contrasena):
                     raise forms.ValidationError("La contraseña actual es incorrecta.")
         
         return cleaned_data
@@ -437,10 +439,7 @@ class EditarPerfilForm(forms.ModelForm):
         nueva_contrasena = self.cleaned_data.get('nueva_contrasena')
         
         if nueva_contrasena:
-            cliente.s_contrasena = bcrypt.hashpw(
-                nueva_contrasena.encode('utf-8'), 
-                bcrypt.gensalt()
-            ).decode('utf-8')
+            cliente.s_contrasena = passwords.hash_password(nueva_contrasena)
         
         if commit:
             cliente.save()
@@ -496,7 +495,7 @@ class EditarPerfilEmpleadoForm(forms.ModelForm):
                 raise forms.ValidationError('Las nuevas contraseñas no coinciden.')
             if nueva and len(nueva) < 6:
                 raise forms.ValidationError('La nueva contraseña debe tener al menos 6 caracteres.')
-            if self.usuario_obj and not bcrypt.checkpw(actual.encode('utf-8'), self.usuario_obj.s_contrasenausuario.encode('utf-8')):
+            if self.usuario_obj and not passwords.check_password(actual, self.usuario_obj.s_contrasenausuario):
                 raise forms.ValidationError('La contraseña actual es incorrecta.')
         return cleaned
 
@@ -504,7 +503,7 @@ class EditarPerfilEmpleadoForm(forms.ModelForm):
         usuario = super().save(commit=False)
         nueva = self.cleaned_data.get('nueva_contrasena')
         if nueva:
-            usuario.s_contrasenausuario = bcrypt.hashpw(nueva.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            usuario.s_contrasenausuario = passwords.hash_password(nueva)
         if commit:
             usuario.save()
         return usuario
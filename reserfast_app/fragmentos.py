@@ -0,0 +1,91 @@
+"""Caché de fragmentos de plantilla por objeto (tarjetas y filas de menús/mesas).
+
+La carta del cliente, la gestión de cocina y las pestañas del panel renderizan
+las mismas tarjetas para cada visitante. El tag `{% fragmento %}`
+(templatetags/fragmentos.py) guarda el HTML de cada una en el caché con una
+clave por objeto:
+
+    reserfast:frag:<nombre>:<pk>:<sello>
+
+donde el sello resume los valores del objeto (los campos del modelo o de los
+registros del catálogo, más las derivadas disponibles de sus imágenes). Al
+editar un menú o una mesa cambia solo su sello, así que se vuelve a renderizar
+solo esa tarjeta y las demás siguen saliendo del caché; no hace falta
+invalidar nada (las claves viejas expiran con `FRAGMENT_CACHE_TIMEOUT`).
+
+`contadores()` devuelve aciertos y fallos por fragmento (por proceso).
+"""
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Model
+
+from . import imagenes
+
+_PREFIX = 'reserfast:frag:'
+
+_lock = threading.Lock()
+_contadores = {}
+
+
+def _timeout():
+    return getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 3600)
+
+
+def _valores(obj):
+    if isinstance(obj, Model):
+        return [getattr(obj, f.attname) for f in obj._meta.concrete_fields]
+    return [getattr(obj, s) for s in getattr(type(obj), '__slots__', ())]
+
+
+def sello(obj, *extra):
+    """Huella de los valores de `obj` (y de `extra`) que cambia con cada edición."""
+    partes = []
+    for valor in [*_valores(obj), *extra]:
+        # FieldFile o catalogo.Imagen (sin evaluar `.url`, que falla si está vacío)
+        if getattr(type(valor), 'url', None) is not None:
+            name = valor.name or ''
+            # La salida de {% imagen %} depende de las derivadas ya generadas.
+            partes.append((name, imagenes.disponibles(name)))
+        else:
+            partes.append(valor)
+    return hashlib.md5(repr(partes).encode(), usedforsecurity=False).hexdigest()
+
+
+def clave(nombre, obj, *extra):
+    return f'{_PREFIX}{nombre}:{obj.pk}:{sello(obj, *extra)}'
+
+
+def _contar(nombre, acierto):
+    with _lock:
+        par = _contadores.setdefault(nombre, [0, 0])
+        par[0 if acierto else 1] += 1
+
+
+def obtener(key, nombre):
+    """HTML cacheado de `key` (o None), registrando el acierto o fallo."""
+    try:
+        html = cache.get(key)
+    except Exception:
+        html = None
+    _contar(nombre, html is not None)
+    return html
+
+
+def guardar(key, html):
+    try:
+        cache.set(key, html, _timeout())
+    except Exception:
+        pass
+
+
+def contadores():
+    """{nombre: {'aciertos', 'fallos', 'tasa'}} de este proceso."""
+    with _lock:
+        datos = {n: tuple(par) for n, par in _contadores.items()}
+    return {
+        n: {'aciertos': a, 'fallos': f, 'tasa': round(a / (a + f), 3) if a + f else 0.0}
+        for n, (a, f) in sorted(datos.items())
+    }
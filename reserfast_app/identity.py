@@ -0,0 +1,153 @@
+"""Resolución de la identidad (cliente / empleado) asociada a un request.
+
+El middleware, los decoradores, el context processor y las vistas necesitan el
+mismo `TblCliente` o `TblUsuario` de la sesión. Estas funciones lo cargan una
+sola vez por request y lo dejan disponible en `request.cliente` /
+`request.usuario` para el resto de capas.
+
+Entre requests los principales se guardan en un caché de dos niveles (memoria
+del proceso + caché compartido), validado por un contador de versión por
+principal. `invalidate_principal` incrementa ese contador en cada escritura,
+así que una desactivación o un cambio de contraseña se ven de inmediato en
+todos los procesos (siempre que el caché sea compartido; ver `checks.py`).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import versions
+from .models import TblCliente, TblUsuario
+
+_CACHE_ATTR = '_reserfast_identity'
+
+_LOCAL_MAX_ENTRIES = 2048
+_local = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _ttl():
+    return getattr(settings, 'PRINCIPAL_CACHE_TTL', 300)
+
+
+def _load_cliente(pk):
+    return TblCliente.objects.filter(id_cliente=pk, b_activo=True).first()
+
+
+def _load_usuario(pk):
+    return (
+        TblUsuario.objects.select_related('fk_id_perfil')
+        .filter(id_usuario=pk, b_activo=True)
+        .first()
+    )
+
+
+_LOADERS = {
+    'cliente': _load_cliente,
+    'usuario': _load_usuario,
+}
+
+
+def _version_name(kind, pk):
+    return f'principal:{kind}:{pk}'
+
+
+def _local_get(key, version):
+    with _local_lock:
+        entry = _local.get(key)
+        if entry is None:
+            return None
+        entry_version, expires, obj = entry
+        if entry_version != version or expires < time.monotonic():
+            del _local[key]
+            return None
+        _local.move_to_end(key)
+        return obj
+
+
+def _local_set(key, version, obj):
+    with _local_lock:
+        _local[key] = (version, time.monotonic() + _ttl(), obj)
+        _local.move_to_end(key)
+        while len(_local) > _LOCAL_MAX_ENTRIES:
+            _local.popitem(last=False)
+
+
+def _cached_principal(kind, pk):
+    """Principal activo `kind`/`pk` o None, usando el caché versionado.
+
+    Solo se cachean principales activos; cada llamada devuelve una copia para
+    que las vistas puedan modificarla sin tocar la entrada compartida.
+    """
+    version = versions.current(_version_name(kind, pk))
+    key = (kind, pk)
+    obj = _local_get(key, version)
+    if obj is None:
+        shared_key = f'reserfast:principal:{kind}:{pk}:{version}'
+        obj = cache.get(shared_key)
+        if obj is None:
+            obj = _LOADERS[kind](pk)
+            if obj is None:
+                return None
+            cache.set(shared_key, obj, _ttl())
+        _local_set(key, version, obj)
+    return copy.copy(obj)
+
+
+def principal_version(kind, pk):
+    """Versión actual del principal `kind`/`pk` (cambia con cada escritura)."""
+    return versions.current(_version_name(kind, pk))
+
+
+def invalidate_principal(kind, pk):
+    """Invalida el principal cacheado ('cliente' | 'usuario') de `pk`."""
+    if pk is None:
+        return
+    versions.bump(_version_name(kind, pk))
+    with _local_lock:
+        _local.pop((kind, pk), None)
+
+
+def _request_memo(request):
+    memo = getattr(request, _CACHE_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(request, _CACHE_ATTR, memo)
+    return memo
+
+
+def get_cliente(request):
+    """Devuelve el cliente activo de la sesión o None.
+
+    El resultado (incluido None) se memoriza en el request, de modo que las
+    llamadas siguientes no generan consultas.
+    """
+    cliente_id = request.session.get('cliente_id')
+    if not cliente_id:
+        return None
+    memo = _request_memo(request)
+    key = ('cliente', cliente_id)
+    if key not in memo:
+        cliente = _cached_principal('cliente', cliente_id)
+        memo[key] = cliente
+        if cliente is not None:
+            request.cliente = cliente
+    return memo[key]
+
+
+def get_usuario(request):
+    """Devuelve el empleado activo de la sesión (con su perfil) o None."""
+    usuario_id = request.session.get('id_usuario')
+    if not usuario_id:
+        return None
+    memo = _request_memo(request)
+    key = ('usuario', usuario_id)
+    if key not in memo:
+        usuario = _cached_principal('usuario', usuario_id)
+        memo[key] = usuario
+        if usuario is not None:
+            request.usuario = usuario
+    return memo[key]
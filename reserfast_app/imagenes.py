@@ -0,0 +1,169 @@
+"""Derivadas redimensionadas (JPEG/PNG y WebP) de las fotos subidas.
+
+Las fotos de menús (`TblMenu.s_imagen`) y de perfil (`TblCliente.s_foto_perfil`)
+se guardan tal como se suben (hasta 5 MB). Tras el commit de cada guardado
+(`signals.py`) se encola su procesamiento en un pool de hilos acotado
+(`IMAGE_DERIVATIVE_WORKERS`), que genera con Pillow una copia por cada ancho de
+`IMAGE_DERIVATIVE_WIDTHS` en el formato original y en WebP:
+
+    menu_img/foto.jpg -> derivadas/menu_img/foto-320.jpg, .../foto-320.webp, ...
+
+`disponibles(name)` devuelve los anchos ya generados (cacheado), y el tag
+`{% imagen %}` (templatetags/imagenes.py) arma un `<picture>` con `srcset`;
+mientras no existan derivadas se usa la imagen original. El comando
+`generar_derivadas` procesa las fotos ya existentes.
+"""
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from . import versions
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = 'derivadas'
+_VERSION = 'imagenes'
+
+_executor = None
+_executor_lock = threading.Lock()
+_pendientes = set()
+
+
+def anchos():
+    return tuple(sorted(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', (320, 640, 1024))))
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = getattr(settings, 'IMAGE_DERIVATIVE_WORKERS', 1) or 1
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='imagenes')
+    return _executor
+
+
+def _cache_key(name):
+    return f'reserfast:imagen:{name}'
+
+
+def ruta(name, ancho, formato):
+    """Nombre en el storage de la derivada de `name` con `ancho` px ('webp' | 'jpg' | 'png')."""
+    base, _ = posixpath.splitext(name)
+    return f'{_PREFIX}/{base}-{ancho}.{formato}'
+
+
+def formato_base(name):
+    """Formato de la derivada no-WebP: PNG conserva transparencia, el resto JPEG."""
+    return 'png' if name.lower().endswith(('.png', '.gif')) else 'jpg'
+
+
+def disponibles(name):
+    """Anchos con derivadas generadas para `name` (tupla, posiblemente vacía)."""
+    if not name:
+        return ()
+    key = _cache_key(name)
+    generados = cache.get(key)
+    if generados is None:
+        generados = tuple(
+            a for a in anchos() if default_storage.exists(ruta(name, a, 'webp'))
+        )
+        # Sin derivadas aún (worker en curso): se vuelve a mirar pronto.
+        cache.set(key, generados, None if generados else 60)
+    return generados
+
+
+def olvidar(name):
+    """Descarta los anchos cacheados de `name` (p. ej. tras borrar sus derivadas)."""
+    cache.delete(_cache_key(name))
+
+
+def generar(name, forzar=False):
+    """Genera (de forma síncrona) las derivadas de `name`; devuelve los anchos."""
+    from PIL import Image, ImageOps
+
+    with default_storage.open(name, 'rb') as f:
+        original = Image.open(f)
+        original.load()
+    original = ImageOps.exif_transpose(original)
+    formato = formato_base(name)
+    generados = []
+    for ancho in anchos():
+        if not forzar and default_storage.exists(ruta(name, ancho, 'webp')):
+            generados.append(ancho)
+            if ancho >= original.width:
+                break
+            continue
+        img = original.copy()
+        if img.width > ancho:
+            img.thumbnail((ancho, ancho * 10), Image.LANCZOS)
+
+        for fmt in (formato, 'webp'):
+            destino = ruta(name, ancho, fmt)
+            buffer = BytesIO()
+            if fmt == 'jpg':
+                salida = img.convert('RGB') if img.mode not in ('RGB', 'L') else img
+                salida.save(buffer, 'JPEG', quality=getattr(settings, 'IMAGE_JPEG_QUALITY', 82), optimize=True, progressive=True)
+            elif fmt == 'png':
+                img.save(buffer, 'PNG', optimize=True)
+            else:
+                salida = img if img.mode in ('RGB', 'RGBA') else img.convert('RGBA')
+                salida.save(buffer, 'WEBP', quality=getattr(settings, 'IMAGE_WEBP_QUALITY', 80), method=4)
+            if default_storage.exists(destino):
+                default_storage.delete(destino)
+            default_storage.save(destino, ContentFile(buffer.getvalue()))
+        generados.append(ancho)
+        if ancho >= original.width:
+            # No se agranda: los anchos siguientes serían copias de esta.
+            break
+
+    cache.set(_cache_key(name), tuple(generados), None)
+    return tuple(generados)
+
+
+def _procesar(name):
+    try:
+        generar(name)
+        # Las páginas que muestran la foto cambian (srcset): ver condicional.py.
+        versions.bump(_VERSION)
+    except Exception as e:
+        logger.error(f"Error generando derivadas de {name}: {e}")
+    finally:
+        with _executor_lock:
+            _pendientes.discard(name)
+
+
+def encolar(name):
+    """Programa la generación de derivadas de `name` tras el commit actual."""
+    if not name or disponibles(name):
+        return
+
+    def _enviar():
+        with _executor_lock:
+            if name in _pendientes:
+                return
+            _pendientes.add(name)
+        _pool().submit(_procesar, name)
+
+    transaction.on_commit(_enviar)
+
+
+def version():
+    """Cambia cada vez que se generan derivadas nuevas."""
+    return versions.current(_VERSION)
+
+
+def srcset(name, formato):
+    """`srcset` de las derivadas disponibles de `name` en `formato`, o ''."""
+    return ', '.join(
+        f'{default_storage.url(ruta(name, a, formato))} {a}w' for a in disponibles(name)
+    )
+
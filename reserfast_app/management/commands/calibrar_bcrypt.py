@@ -0,0 +1,73 @@
+import re
+import statistics
+import time
+from pathlib import Path
+
+import bcrypt
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Mide bcrypt en este equipo y elige el costo (BCRYPT_ROUNDS) para una latencia objetivo de verificación'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--objetivo-ms', type=float, default=250.0,
+                            help='Latencia objetivo de una verificación en milisegundos (por defecto 250)')
+        parser.add_argument('--minimo', type=int, default=10,
+                            help='Costo mínimo aceptable aunque supere el objetivo (por defecto 10)')
+        parser.add_argument('--maximo', type=int, default=16,
+                            help='Costo máximo a probar (por defecto 16)')
+        parser.add_argument('--muestras', type=int, default=3,
+                            help='Verificaciones por costo; se usa la mediana (por defecto 3)')
+        parser.add_argument('--write', action='store_true',
+                            help='Guarda el resultado en reserfast/local_settings.py')
+
+    def _medir(self, costo, muestras):
+        hashed = bcrypt.hashpw(b'calibracion-reserfast', bcrypt.gensalt(costo))
+        tiempos = []
+        for _ in range(muestras):
+            inicio = time.perf_counter()
+            bcrypt.checkpw(b'calibracion-reserfast', hashed)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tiempos)
+
+    def handle(self, *args, **options):
+        objetivo = options['objetivo_ms']
+        minimo, maximo = options['minimo'], options['maximo']
+        if not 4 <= minimo <= maximo <= 31:
+            raise CommandError('Se requiere 4 <= --minimo <= --maximo <= 31.')
+
+        elegido = minimo
+        medidas = {}
+        for costo in range(minimo, maximo + 1):
+            ms = medidas[costo] = self._medir(costo, max(1, options['muestras']))
+            self.stdout.write(f'  costo {costo:2d}: {ms:8.1f} ms')
+            if ms > objetivo:
+                break
+            elegido = costo
+            if ms * 2 > objetivo:
+                # Cada punto de costo duplica el tiempo: el siguiente ya se pasa.
+                break
+
+        actual = getattr(settings, 'BCRYPT_ROUNDS', 12)
+        self.stdout.write(self.style.SUCCESS(
+            f'Costo recomendado: {elegido} (objetivo {objetivo:.0f} ms, actual {actual})'
+        ))
+        if medidas[minimo] > objetivo:
+            self.stdout.write(self.style.WARNING(
+                f'Incluso el costo mínimo ({minimo}) supera el objetivo en este equipo.'
+            ))
+
+        if options['write']:
+            ruta = Path(settings.BASE_DIR) / 'reserfast' / 'local_settings.py'
+            linea = f'BCRYPT_ROUNDS = {elegido}'
+            contenido = ruta.read_text(encoding='utf-8') if ruta.exists() else ''
+            if re.search(r'^BCRYPT_ROUNDS\s*=.*$', contenido, flags=re.M):
+                contenido = re.sub(r'^BCRYPT_ROUNDS\s*=.*$', linea, contenido, flags=re.M)
+            else:
+                if contenido and not contenido.endswith('\n'):
+                    contenido += '\n'
+                contenido += f'\n# Calibrado con `manage.py calibrar_bcrypt`\n{linea}\n'
+            ruta.write_text(contenido, encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'Guardado en {ruta}'))
@@ -5,7 +5,7 @@ from reserfast_app.models import (
     TblReserva, TblReservamesa, TblReservamenu
 )
 from datetime import date, timedelta
-import bcrypt
+from reserfast_app import passwords
 
 class Command(BaseCommand):
     help = 'Crear datos de prueba para el sistema de reservas'
@@ -21,7 +21,7 @@ class Command(BaseCommand):
         
         # Crear cliente de prueba
         password = 'test123'
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = passwords.hash_password(password)
         
         cliente, created = TblCliente.objects.get_or_create(
             s_email='cliente@test.com',
@@ -0,0 +1,116 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+
+from reserfast_app.models import TblCliente, TblMenu, TblReserva, TblReservamenu, TblReservamesa, TblUsuario
+
+
+def consultas():
+    """Formas de consulta de las rutas más usadas y los índices que deben usar."""
+    hoy = date.today()
+    return [
+        (
+            'Login de cliente',
+            TblCliente.objects.filter(s_email='cliente@ejemplo.cl', b_activo=True),
+            ('ix_cliente_email',),
+        ),
+        (
+            'Login de empleado',
+            TblUsuario.objects.filter(s_usuario='garzon1', b_activo=True),
+            ('ix_usuario_login',),
+        ),
+        (
+            'Empleados por perfil',
+            TblUsuario.objects.filter(fk_id_perfil_id__in=[2, 4], b_activo=True),
+            ('ix_usuario_perfil',),
+        ),
+        (
+            'Menús por categoría',
+            TblMenu.objects.filter(s_categoria='entrada', b_activo=True),
+            ('ix_menu_categoria',),
+        ),
+        (
+            'Mis reservas',
+            TblReserva.objects.filter(fk_id_cliente_id=1).order_by('-d_fechainicio'),
+            ('ix_reserva_cliente_fecha',),
+        ),
+        (
+            'Reservas del día (panel garzón)',
+            TblReserva.objects.filter(b_activo=True, d_fechainicio=hoy),
+            ('ix_reserva_activa_fecha',),
+        ),
+        (
+            'Mesas de reservas (prefetch)',
+            TblReservamesa.objects.filter(b_activo=True, fk_id_reserva__in=[1, 2, 3]),
+            ('ix_reservamesa_reserva',),
+        ),
+        (
+            'Menús de reservas (prefetch)',
+            TblReservamenu.objects.filter(b_activo=True, fk_id_reserva__in=[1, 2, 3]),
+            ('ix_reservamenu_reserva',),
+        ),
+        (
+            'Ocupación de una mesa en una fecha',
+            TblReservamesa.objects.filter(
+                fk_id_mesa_id=1,
+                fk_id_reserva__d_fechainicio=hoy,
+                fk_id_reserva__b_activo=True,
+                b_activo=True,
+            ),
+            ('ix_reservamesa_mesa', 'ix_reserva_activa_fecha'),
+        ),
+        (
+            'Índice de disponibilidad',
+            TblReservamesa.objects.filter(
+                b_activo=True,
+                fk_id_reserva__b_activo=True,
+                fk_id_reserva__d_fechainicio__gte=hoy,
+            ).values_list('fk_id_reserva_id', 'fk_id_mesa_id', 'fk_id_reserva__d_fechainicio'),
+            ('ix_reserva_activa_fecha', 'ix_reservamesa_reserva'),
+        ),
+        (
+            'Pestaña de reservas del panel (página siguiente)',
+            TblReserva.objects.select_related('fk_id_cliente')
+            .filter(d_fechainicio__isnull=False, d_fechainicio__lte=hoy)
+            .filter(Q(d_fechainicio__lt=hoy) | Q(id_reserva__lt=1000))
+            .order_by('-d_fechainicio', '-id_reserva')[:26],
+            ('ix_reserva_fecha_id',),
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Muestra el plan de ejecución (EXPLAIN) de las consultas frecuentes y verifica el uso de índices'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Termina con error si alguna consulta no usa el índice esperado (para CI)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'mysql'):
+            raise CommandError(f'Motor no soportado: {connection.vendor}')
+
+        fallidas = []
+        for nombre, qs, indices in consultas():
+            plan = qs.explain()
+            usa_indice = any(ix in plan for ix in indices)
+            estilo = self.style.SUCCESS if usa_indice else self.style.ERROR
+            marca = '✅' if usa_indice else '❌'
+            self.stdout.write(estilo(f'{marca} {nombre} (esperado: {" | ".join(indices)})'))
+            for linea in plan.splitlines():
+                self.stdout.write(f'    {linea}')
+            if not usa_indice:
+                fallidas.append(nombre)
+
+        if fallidas:
+            mensaje = f'{len(fallidas)} consulta(s) sin el índice esperado: {", ".join(fallidas)}'
+            if options['strict']:
+                raise CommandError(mensaje)
+            self.stdout.write(self.style.WARNING(mensaje))
+        else:
+            self.stdout.write(self.style.SUCCESS('Todas las consultas usan sus índices.'))
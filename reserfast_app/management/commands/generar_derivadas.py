@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from reserfast_app import imagenes
+from reserfast_app.models import TblCliente, TblMenu
+
+
+class Command(BaseCommand):
+    help = 'Genera las derivadas redimensionadas (JPEG/PNG y WebP) de las fotos de menús y perfiles ya subidas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forzar', action='store_true',
+                            help='Regenera también las derivadas que ya existen')
+
+    def handle(self, *args, **options):
+        nombres = set()
+        nombres.update(TblMenu.objects.exclude(s_imagen='').exclude(s_imagen__isnull=True).values_list('s_imagen', flat=True))
+        nombres.update(TblCliente.objects.exclude(s_foto_perfil='').exclude(s_foto_perfil__isnull=True).values_list('s_foto_perfil', flat=True))
+
+        ok = errores = 0
+        for name in sorted(nombres):
+            try:
+                anchos = imagenes.generar(name, forzar=options['forzar'])
+                ok += 1
+                self.stdout.write(f'  {name}: {", ".join(str(a) for a in anchos)}')
+            except Exception as e:
+                errores += 1
+                self.stdout.write(self.style.WARNING(f'  {name}: {e}'))
+
+        self.stdout.write(self.style.SUCCESS(f'Derivadas listas para {ok} imagen(es); {errores} con error.'))
@@ -0,0 +1,100 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reserfast_app import imagenes, storage
+from reserfast_app.models import TblCliente, TblMenu
+
+# (modelo, campo) que pueden referenciar archivos de media.
+REFERENCIAS = (
+    (TblMenu, 's_imagen'),
+    (TblCliente, 's_foto_perfil'),
+)
+
+
+def _lotes(nombres, tamano):
+    for i in range(0, len(nombres), tamano):
+        yield nombres[i:i + tamano]
+
+
+class Command(BaseCommand):
+    help = 'Busca (y con --borrar elimina) fotos de menús y perfiles que ya no referencia ninguna fila, y sus derivadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--borrar', action='store_true',
+                            help='Elimina los archivos huérfanos (por defecto solo los lista)')
+        parser.add_argument('--minutos', type=int, default=60,
+                            help='Ignora archivos más recientes (subidas aún sin guardar en la BD)')
+        parser.add_argument('--lote', type=int, default=500,
+                            help='Archivos que se consultan por query')
+
+    def handle(self, *args, **options):
+        self.borrar = options['borrar']
+        self.limite = timezone.now() - timedelta(minutes=options['minutos'])
+        self.huerfanos = self.bytes = 0
+
+        for prefijo in storage.prefijos():
+            directorio = prefijo.rstrip('/')
+            nombres, temporales = self._listar(directorio)
+            for name in temporales:
+                self._eliminar(name)
+
+            # Se consulta por lotes de nombres, sin cargar todas las filas.
+            vivos = set()
+            for lote in _lotes(nombres, max(options['lote'], 1)):
+                referenciados = set()
+                for modelo, campo in REFERENCIAS:
+                    referenciados.update(
+                        modelo.objects.filter(**{f'{campo}__in': lote}).values_list(campo, flat=True)
+                    )
+                for name in lote:
+                    if name in referenciados or not self._eliminar(name):
+                        vivos.add(posixpath.splitext(name)[0])
+                    else:
+                        imagenes.olvidar(name)
+
+            # Derivadas: derivadas/<prefijo>/<base>-<ancho>.<fmt> sin original vivo.
+            derivadas, temporales = self._listar(posixpath.join('derivadas', directorio))
+            for name in derivadas + temporales:
+                base = posixpath.join(directorio, posixpath.basename(name).rsplit('-', 1)[0])
+                if base not in vivos:
+                    self._eliminar(name)
+
+        for name in self._listar('.uploads')[0]:
+            self._eliminar(name)
+
+        accion = 'Eliminados' if self.borrar else 'Huérfanos (use --borrar para eliminarlos)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{accion}: {self.huerfanos} archivo(s), {self.bytes / (1024 * 1024):.1f} MB.'
+        ))
+
+    def _listar(self, directorio):
+        """(archivos, temporales a medio escribir) de `directorio`, ordenados."""
+        try:
+            _, archivos = default_storage.listdir(directorio)
+        except FileNotFoundError:
+            return [], []
+        archivos = sorted(archivos)
+        return (
+            [posixpath.join(directorio, a) for a in archivos if not a.startswith('.')],
+            [posixpath.join(directorio, a) for a in archivos if a.startswith('.tmp-')],
+        )
+
+    def _eliminar(self, name):
+        """Cuenta (y borra con --borrar) `name` si es más antiguo que el margen."""
+        try:
+            if default_storage.get_modified_time(name) > self.limite:
+                return False
+            tamano = default_storage.size(name)
+        except FileNotFoundError:
+            return False
+        self.huerfanos += 1
+        self.bytes += tamano
+        if self.borrar:
+            default_storage.delete(name)
+        else:
+            self.stdout.write(f'  {name}')
+        return True
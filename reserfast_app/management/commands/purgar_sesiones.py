@@ -0,0 +1,36 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Elimina las sesiones vencidas en lotes pequeños (sin bloquear django_session)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500,
+                            help='Sesiones eliminadas por DELETE')
+        parser.add_argument('--pausa', type=float, default=0.05,
+                            help='Segundos de espera entre lotes para dejar pasar otras escrituras')
+
+    def handle(self, *args, **options):
+        lote = max(options['lote'], 1)
+        ahora = timezone.now()
+        total = 0
+        while True:
+            # Usa el índice de expire_date; cada DELETE es una transacción corta.
+            claves = list(
+                Session.objects.filter(expire_date__lt=ahora)
+                .order_by('expire_date')
+                .values_list('session_key', flat=True)[:lote]
+            )
+            if not claves:
+                break
+            total += Session.objects.filter(session_key__in=claves, expire_date__lt=ahora).delete()[0]
+            if len(claves) < lote:
+                break
+            if options['pausa']:
+                time.sleep(options['pausa'])
+
+        self.stdout.write(self.style.SUCCESS(f'Sesiones vencidas eliminadas: {total}.'))
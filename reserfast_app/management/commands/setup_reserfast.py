@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
-import bcrypt
+from reserfast_app import passwords
 from reserfast_app.models import TblUsuario, TblCliente, TblPerfil, TblGenero
 
 class Command(BaseCommand):
@@ -57,13 +57,13 @@ class Command(BaseCommand):
         for usuario_data in usuarios_ejemplo:
             if not TblUsuario.objects.filter(s_usuario=usuario_data['usuario']).exists():
                 perfil = TblPerfil.objects.get(s_nombreperfil=usuario_data['perfil'])
-                password_hash = bcrypt.hashpw(usuario_data['password'].encode('utf-8'), bcrypt.gensalt())
+                password_hash = passwords.hash_password(usuario_data['password'])
                 
                 TblUsuario.objects.create(
                     s_usuario=usuario_data['usuario'],
                     s_nombreusuario=usuario_data['nombre'],
                     s_primerapellidousuario=usuario_data['apellido'],
-                    s_contrasenausuario=password_hash.decode('utf-8'),
+                    s_contrasenausuario=password_hash,
                     fk_id_perfil=perfil,
                     b_activo=True
                 )
@@ -73,14 +73,14 @@ class Command(BaseCommand):
         
         if not TblCliente.objects.filter(s_email='cliente@ejemplo.com').exists():
             genero = TblGenero.objects.get(s_nombregenero='Masculino')
-            password_hash = bcrypt.hashpw('cliente123'.encode('utf-8'), bcrypt.gensalt())
+            password_hash = passwords.hash_password('cliente123')
             
             TblCliente.objects.create(
                 s_primernombrecliente='Carlos',
                 s_primerapellidocliente='Rodríguez',
                 s_email='cliente@ejemplo.com',
                 s_rut='12345678-9',
-                s_contrasena=password_hash.decode('utf-8'),
+                s_contrasena=password_hash,
                 fk_id_genero=genero,
                 s_telefono='+56912345678',
                 b_activo=True
@@ -1,124 +1,220 @@
 from django.utils.deprecation import MiddlewareMixin
 from django.shortcuts import redirect
 from django.contrib import messages
-from django.urls import reverse
-from .models import TblCliente, TblUsuario
+from django.core.exceptions import ImproperlyConfigured
+from django.http import JsonResponse
+from django.urls import get_resolver
+from .identity import get_cliente, get_usuario
+from . import urls as app_urls
 import logging
 
 logger = logging.getLogger(__name__)
 
+PUBLICO = 'publico'
+CLIENTE = 'cliente'
+EMPLEADO = 'empleado'
+
+ADMIN = ('admin',)
+COCINA = ('cocinero', 'admin')
+
+
+class Regla:
+    """Acceso requerido por una ruta: tipo de sesión, perfiles y si responde JSON."""
+    __slots__ = ('acceso', 'perfiles', 'ajax')
+
+    def __init__(self, acceso, perfiles=None, ajax=False):
+        self.acceso = acceso
+        self.perfiles = perfiles
+        self.ajax = ajax
+
+
+_PUBLICA = Regla(PUBLICO)
+_CLIENTE = Regla(CLIENTE)
+_CLIENTE_AJAX = Regla(CLIENTE, ajax=True)
+_EMPLEADO = Regla(EMPLEADO)
+
+# Permisos por nombre de URL (reserfast_app/urls.py). Toda ruta con nombre debe
+# figurar aquí: el middleware falla al iniciar si falta alguna o sobra un nombre.
+RUTAS = {
+    # Públicas (las de admin_password usan staff_member_required de Django)
+    'index': _PUBLICA,
+    'login_admin': _PUBLICA,
+    'login_clientes': _PUBLICA,
+    'logout_empleado': _PUBLICA,
+    'logout_cliente': _PUBLICA,
+    'create_clientes': _PUBLICA,
+    'crear_exito': _PUBLICA,
+    'password_reset': _PUBLICA,
+    'password_reset_done': _PUBLICA,
+    'password_reset_confirm': _PUBLICA,
+    'password_reset_complete': _PUBLICA,
+    'change_usuario_password': _PUBLICA,
+    'change_cliente_password': _PUBLICA,
+
+    # Cliente
+    'index_cliente': _CLIENTE,
+    'menu_cliente': _CLIENTE,
+    'mesas': _CLIENTE,
+    'perfil_cliente': _CLIENTE,
+    'editar_perfil_cliente': _CLIENTE,
+    'crear_venta': _CLIENTE,
+    'crear_reserva': _CLIENTE,
+    'mis_reservas': _CLIENTE,
+    'editar_reserva': _CLIENTE,
+    'eliminar_reserva': _CLIENTE,
+    'verificar_disponibilidad_mesa': _CLIENTE_AJAX,
+    'disponibilidad_mesas': _CLIENTE_AJAX,
+    'detalle_reserva_ajax': _CLIENTE_AJAX,
+
+    # Empleado (cualquier perfil)
+    'cambiar_password_empleado': _EMPLEADO,
+    'editar_perfil_empleado': _EMPLEADO,
+    'editar_mesa': _EMPLEADO,
+    'eliminar_mesa': _EMPLEADO,
+    'ajax_toggle_empleado_servicio': Regla(EMPLEADO, ('garzon', 'cocinero'), ajax=True),
+
+    # Empleado con perfil
+    'index_admin': Regla(EMPLEADO, ADMIN),
+    'panel_garzon': Regla(EMPLEADO, ('garzon',)),
+    'gestion_cocina': Regla(EMPLEADO, ('cocinero',)),
+    'toggle_menu_cocina': Regla(EMPLEADO, ('cocinero',)),
+    'admin_garzones': Regla(EMPLEADO, ADMIN),
+    'agregar_garzones': Regla(EMPLEADO, ADMIN),
+    'eliminar_garzones': Regla(EMPLEADO, ADMIN),
+    'actualizar_garzones': Regla(EMPLEADO, ADMIN),
+    'admin_cocina': Regla(EMPLEADO, ADMIN),
+    'crear_usuarios_cocina': Regla(EMPLEADO, ADMIN),
+    'eliminar_usuarios_cocina': Regla(EMPLEADO, ADMIN),
+    'actualizar_usuarios_cocina': Regla(EMPLEADO, ADMIN),
+    'ajax_admin_estadisticas': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_admin_tab': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_crear_garzon': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_editar_garzon': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_eliminar_garzon': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_crear_cocinero': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_editar_cocinero': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_eliminar_cocinero': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_crear_mesa': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_editar_mesa': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_eliminar_mesa': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_crear_usuario': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_editar_usuario': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_eliminar_usuario': Regla(EMPLEADO, ADMIN, ajax=True),
+    'ajax_crear_menu': Regla(EMPLEADO, COCINA, ajax=True),
+    'ajax_editar_menu_cocina': Regla(EMPLEADO, COCINA, ajax=True),
+    'ajax_toggle_menu_cocina': Regla(EMPLEADO, COCINA, ajax=True),
+    'ajax_eliminar_menu_cocina': Regla(EMPLEADO, COCINA, ajax=True),
+}
+
+
+def compilar_permisos():
+    """{view_name: Regla} para las rutas del namespace de la app.
+
+    Recorre las rutas registradas en el resolver (no una lista de prefijos), así
+    que las URLs con parámetros y los cambios de ruta quedan cubiertos.
+    """
+    namespace = app_urls.app_name
+    try:
+        _, resolver = get_resolver().namespace_dict[namespace]
+    except KeyError:
+        raise ImproperlyConfigured(f"El namespace '{namespace}' no está incluido en ROOT_URLCONF.")
+
+    nombres = {p.name for p in resolver.url_patterns if getattr(p, 'name', None)}
+    faltantes = nombres - RUTAS.keys()
+    if faltantes:
+        raise ImproperlyConfigured(f"Rutas sin permiso en RUTAS: {', '.join(sorted(faltantes))}")
+    sobrantes = RUTAS.keys() - nombres
+    if sobrantes:
+        raise ImproperlyConfigured(f"RUTAS menciona rutas inexistentes: {', '.join(sorted(sobrantes))}")
+    return {f'{namespace}:{nombre}': RUTAS[nombre] for nombre in nombres}
+
+
 class SessionValidationMiddleware(MiddlewareMixin):
-    def process_request(self, request):
-    # Rutas públicas (no requieren autenticación)
-        public_paths = [
-            '/reserfast/',
-            '/reserfast/login_admin/',
-            '/reserfast/login_clientes/',
-            '/reserfast/logout_empleado/',
-            '/reserfast/logout_cliente/',
-            '/reserfast/crear_cliente/',
-            '/reserfast/crear_exito/',
-            '/admin/',
-            '/static/',
-            '/media/',
-            '/password_reset/',
-            '/',  # Página principal
-        ]
-        
-    # Rutas de cliente (requieren sesión de cliente)
-        cliente_paths = [
-            '/reserfast/index_cliente/',
-            '/reserfast/crear_reserva/',
-            '/reserfast/mis_reservas/',
-            '/reserfast/editar_reserva/',
-            '/reserfast/eliminar_reserva/',
-            '/reserfast/perfil/',
-            '/reserfast/editar_perfil/',
-            '/reserfast/menu/',
-            '/reserfast/mesas/',
-            '/reserfast/crear_venta/',
-            '/reserfast/verificar_disponibilidad_mesa/',
-            '/reserfast/detalle_reserva_ajax/',
-        ]
-        
-    # Rutas de empleado (requieren sesión de empleado)
-        empleado_paths = [
-            '/reserfast/index_admin/',
-            '/reserfast/panel_garzon/',
-            '/reserfast/cambiar_password/',
-            '/reserfast/admin_garzones/',
-            '/reserfast/crear_garzones/',
-            '/reserfast/eliminar_garzones/',
-            '/reserfast/actualizar_garzones/',
-            '/reserfast/gestion_cocina/',
-            '/reserfast/admin_cocina/',
-            '/reserfast/crear_usuarios_cocina/',
-            '/reserfast/eliminar_usuarios_cocina/',
-            '/reserfast/actualizar_usuarios_cocina/',
-            '/reserfast/editar_mesa/',
-            '/reserfast/eliminar_mesa/',
-        ]
-        
-        current_path = request.path
-        
-    # Permitir acceso si la ruta es pública
-        if any(current_path.startswith(path) for path in public_paths):
+    """Valida la sesión según la ruta resuelta, con una tabla compilada al iniciar.
+
+    Cada request cuesta un lookup en `permisos` por `view_name`; las rutas que no
+    son de la app (admin, static, media...) no se tocan. El principal se carga
+    una sola vez (`get_cliente` / `get_usuario` lo memorizan en el request), así
+    que los decoradores de las vistas no vuelven a consultarlo.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.permisos = compilar_permisos()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        regla = self.permisos.get(match.view_name) if match else None
+        if regla is None or regla.acceso == PUBLICO:
             return None
-        
-    # Datos de sesión
+
+        # Datos de sesión
         cliente_id = request.session.get('cliente_id')
         usuario_id = request.session.get('id_usuario')
-        
-    # ¿Ruta de cliente?
-        is_cliente_path = any(current_path.startswith(path) for path in cliente_paths)
-        
-    # ¿Ruta de empleado?
-        is_empleado_path = any(current_path.startswith(path) for path in empleado_paths)
-        
+
         # Si tiene ambas sesiones activas (conflicto), limpiar y redirigir
         if cliente_id and usuario_id:
             request.session.flush()
             messages.warning(request, 'Se detectaron sesiones conflictivas. Por favor, inicia sesión nuevamente.')
             return redirect('reserfast:index')
-        
-        # Manejo de rutas de cliente
-        if is_cliente_path:
-            if not cliente_id:
-                messages.info(request, 'Necesitas iniciar sesión como cliente para acceder a esta página.')
-                return redirect('reserfast:login_clientes')
-            
-            # Validar que el cliente existe y está activo
-            try:
-                cliente = TblCliente.objects.get(id_cliente=cliente_id, b_activo=True)
-                # Agregar información del cliente al request para uso en las vistas
-                request.cliente = cliente
-            except TblCliente.DoesNotExist:
-                request.session.flush()
-                messages.error(request, 'Su sesión de cliente ha expirado o el usuario no existe.')
-                return redirect('reserfast:login_clientes')
-            except Exception as e:
-                logger.error(f"Error validando cliente: {e}")
-                messages.error(request, 'Error interno del servidor.')
-                return redirect('reserfast:login_clientes')
-        
-        # Manejo de rutas de empleado
-        if is_empleado_path:
-            if not usuario_id:
-                messages.info(request, 'Necesitas iniciar sesión como empleado para acceder a esta página.')
-                return redirect('reserfast:login_admin')
-            
-            # Validar que el usuario existe y está activo
-            try:
-                usuario = TblUsuario.objects.get(id_usuario=usuario_id, b_activo=True)
-                # Agregar información del usuario al request para uso en las vistas
-                request.usuario = usuario
-            except TblUsuario.DoesNotExist:
-                request.session.flush()
-                messages.error(request, 'Su sesión de empleado ha expirado o el usuario no existe.')
-                return redirect('reserfast:login_admin')
-            except Exception as e:
-                logger.error(f"Error validando usuario: {e}")
-                messages.error(request, 'Error interno del servidor.')
-                return redirect('reserfast:login_admin')
-        
+
+        if regla.acceso == CLIENTE:
+            return self._validar_cliente(request, regla, cliente_id)
+        return self._validar_empleado(request, regla, usuario_id)
+
+    def _validar_cliente(self, request, regla, cliente_id):
+        if not cliente_id:
+            if regla.ajax:
+                return JsonResponse({'success': False, 'mensaje': 'No autorizado.'}, status=401)
+            messages.info(request, 'Necesitas iniciar sesión como cliente para acceder a esta página.')
+            return redirect('reserfast:login_clientes')
+
+        # Validar que el cliente existe y está activo
+        # (queda memorizado en request.cliente para decoradores y vistas)
+        try:
+            cliente = get_cliente(request)
+        except Exception as e:
+            logger.error(f"Error validando cliente: {e}")
+            if regla.ajax:
+                return JsonResponse({'success': False, 'mensaje': 'Error interno del servidor.'}, status=500)
+            messages.error(request, 'Error interno del servidor.')
+            return redirect('reserfast:login_clientes')
+        if cliente is None:
+            request.session.flush()
+            if regla.ajax:
+                return JsonResponse({'success': False, 'mensaje': 'Sesión expirada.'}, status=401)
+            messages.error(request, 'Su sesión de cliente ha expirado o el usuario no existe.')
+            return redirect('reserfast:login_clientes')
+        return None
+
+    def _validar_empleado(self, request, regla, usuario_id):
+        if not usuario_id:
+            if regla.ajax:
+                return JsonResponse({'success': False, 'mensaje': 'No autorizado.'}, status=401)
+            messages.info(request, 'Necesitas iniciar sesión como empleado para acceder a esta página.')
+            return redirect('reserfast:login_admin')
+
+        # El perfil está en la sesión: se rechaza antes de tocar la base de datos.
+        if regla.perfiles and request.session.get('perfil_usuario') not in regla.perfiles:
+            if regla.ajax:
+                return JsonResponse({'success': False, 'mensaje': 'Permisos insuficientes.'}, status=403)
+            messages.error(request, 'No tienes permisos para acceder a esta página.')
+            return redirect('reserfast:index')
+
+        # Validar que el usuario existe y está activo
+        # (queda memorizado en request.usuario para decoradores y vistas)
+        try:
+            usuario = get_usuario(request)
+        except Exception as e:
+            logger.error(f"Error validando usuario: {e}")
+            if regla.ajax:
+                return JsonResponse({'success': False, 'mensaje': 'Error interno del servidor.'}, status=500)
+            messages.error(request, 'Error interno del servidor.')
+            return redirect('reserfast:login_admin')
+        if usuario is None:
+            request.session.flush()
+            if regla.ajax:
+                return JsonResponse({'success': False, 'mensaje': 'Sesión expirada.'}, status=401)
+            messages.error(request, 'Su sesión de empleado ha expirado o el usuario no existe.')
+            return redirect('reserfast:login_admin')
         return None
@@ -0,0 +1,73 @@
+from django.db import migrations, connection
+
+
+# (nombre, tabla, columnas, condición parcial)
+# La condición se usa solo en SQLite (índices parciales). Se escribe como
+# `b_activo` a secas porque es lo que genera el ORM para filter(b_activo=True);
+# SQLite solo usa un índice parcial si la consulta contiene el mismo término.
+# En MySQL la columna b_activo se agrega al final del índice compuesto.
+INDEXES = [
+    ('ix_reserva_cliente_fecha', 'tbl_reserva', ['fk_id_cliente', 'd_fechaInicio'], None),
+    ('ix_reserva_activa_fecha', 'tbl_reserva', ['d_fechaInicio'], 'b_activo'),
+    ('ix_reservamesa_reserva', 'tbl_reservaMesa', ['fk_id_reserva', 'fk_id_mesa'], 'b_activo'),
+    ('ix_reservamesa_mesa', 'tbl_reservaMesa', ['fk_id_mesa', 'fk_id_reserva'], 'b_activo'),
+    ('ix_reservamenu_reserva', 'tbl_reservaMenu', ['fk_id_reserva', 'fk_id_menu'], 'b_activo'),
+    ('ix_cliente_email', 'tbl_cliente', ['s_email', 'b_activo'], None),
+    ('ix_usuario_login', 'tbl_usuario', ['s_usuario', 'b_activo'], None),
+    ('ix_usuario_perfil', 'tbl_usuario', ['fk_id_perfil', 'b_activo'], None),
+]
+
+
+def _mysql_index_exists(cursor, table, name):
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """,
+        [table, name],
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def create_indexes(apps, schema_editor):
+    vendor = connection.vendor
+    if vendor not in ('sqlite', 'mysql'):
+        return
+
+    with connection.cursor() as cursor:
+        for name, table, columns, where in INDEXES:
+            if vendor == 'sqlite':
+                stmt = f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({", ".join(columns)})'
+                if where:
+                    stmt += f' WHERE {where}'
+                cursor.execute(stmt)
+            else:
+                if _mysql_index_exists(cursor, table, name):
+                    continue
+                if where and where not in columns:
+                    columns = columns + [where]
+                cursor.execute(f'CREATE INDEX {name} ON `{table}` ({", ".join(columns)})')
+
+
+def drop_indexes(apps, schema_editor):
+    vendor = connection.vendor
+    if vendor not in ('sqlite', 'mysql'):
+        return
+
+    with connection.cursor() as cursor:
+        for name, table, columns, where in INDEXES:
+            if vendor == 'sqlite':
+                cursor.execute(f'DROP INDEX IF EXISTS {name}')
+            elif _mysql_index_exists(cursor, table, name):
+                cursor.execute(f'DROP INDEX {name} ON `{table}`')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reserfast_app', '0011_update_menu_images'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:40
+
+from django.db import migrations, models, connection
+
+
+def create_estado_empleado(apps, schema_editor):
+    # Antes la tabla la creaban las vistas en cada request (solo SQLite).
+    if connection.vendor == 'sqlite':
+        ddl = """
+            CREATE TABLE IF NOT EXISTS tbl_estado_empleado (
+                id_usuario INTEGER PRIMARY KEY,
+                rol TEXT NOT NULL,
+                en_servicio INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+    elif connection.vendor == 'mysql':
+        ddl = """
+            CREATE TABLE IF NOT EXISTS tbl_estado_empleado (
+                id_usuario INT NOT NULL PRIMARY KEY,
+                rol VARCHAR(20) NOT NULL,
+                en_servicio TINYINT(1) NOT NULL DEFAULT 0,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+    else:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(ddl)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reserfast_app', '0012_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TblEstadoEmpleado',
+            fields=[
+                ('id_usuario', models.IntegerField(primary_key=True, serialize=False)),
+                ('rol', models.CharField(max_length=20)),
+                ('en_servicio', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Estado de empleado',
+                'db_table': 'tbl_estado_empleado',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_estado_empleado, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,104 @@
+import unicodedata
+
+from django.db import migrations, models, connection
+
+
+# Copia congelada de models.normalizar / models.categoria_menu al momento de
+# esta migración: el backfill no debe cambiar si el clasificador evoluciona.
+def _normalizar(s):
+    return ''.join(c for c in unicodedata.normalize('NFKD', s or '') if not unicodedata.combining(c)).lower().strip()
+
+
+def _categoria(tipo):
+    tipo = _normalizar(tipo)
+    if 'entrada' in tipo:
+        return 'entrada'
+    if 'rapid' in tipo:
+        return 'rapida'
+    if 'almuerzo' in tipo:
+        return 'almuerzo'
+    if 'bebida' in tipo:
+        return 'bebida'
+    return 'rapida'
+
+
+def _columna_existe(cursor, vendor):
+    if vendor == 'sqlite':
+        cursor.execute('PRAGMA table_info("tbl_menu")')
+        return any(row[1] == 's_categoriaMenu' for row in cursor.fetchall())
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'tbl_menu' AND column_name = 's_categoriaMenu'
+        """
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def _indice_existe(cursor, vendor):
+    if vendor == 'sqlite':
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ix_menu_categoria'")
+        return cursor.fetchone() is not None
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'tbl_menu' AND index_name = 'ix_menu_categoria'
+        """
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def add_categoria(apps, schema_editor):
+    vendor = connection.vendor
+    if vendor not in ('sqlite', 'mysql'):
+        return
+
+    with connection.cursor() as cursor:
+        if not _columna_existe(cursor, vendor):
+            if vendor == 'sqlite':
+                cursor.execute('ALTER TABLE "tbl_menu" ADD COLUMN s_categoriaMenu VARCHAR(20) NOT NULL DEFAULT \'rapida\'')
+            else:
+                cursor.execute("ALTER TABLE `tbl_menu` ADD COLUMN s_categoriaMenu VARCHAR(20) NOT NULL DEFAULT 'rapida'")
+
+        # Backfill con la clasificación que aplicaba TblMenu.save() en esta versión.
+        cursor.execute('SELECT id_menu, s_tipoMenu FROM tbl_menu')
+        filas = [(_categoria(tipo), id_menu) for id_menu, tipo in cursor.fetchall()]
+        if filas:
+            cursor.executemany('UPDATE tbl_menu SET s_categoriaMenu = %s WHERE id_menu = %s', filas)
+
+        if not _indice_existe(cursor, vendor):
+            cursor.execute('CREATE INDEX ix_menu_categoria ON tbl_menu (s_categoriaMenu, b_activo)')
+
+
+def drop_categoria(apps, schema_editor):
+    vendor = connection.vendor
+    if vendor not in ('sqlite', 'mysql'):
+        return
+
+    with connection.cursor() as cursor:
+        if _indice_existe(cursor, vendor):
+            if vendor == 'sqlite':
+                cursor.execute('DROP INDEX ix_menu_categoria')
+            else:
+                cursor.execute('DROP INDEX ix_menu_categoria ON `tbl_menu`')
+        if _columna_existe(cursor, vendor):
+            cursor.execute('ALTER TABLE tbl_menu DROP COLUMN s_categoriaMenu')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reserfast_app', '0013_estado_empleado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tblmenu',
+            name='s_categoria',
+            field=models.CharField(
+                choices=[('entrada', 'Entradas'), ('rapida', 'Comida Rápida'), ('almuerzo', 'Almuerzos'), ('bebida', 'Bebidas')],
+                db_column='s_categoriaMenu', db_index=True, editable=False, max_length=20,
+            ),
+        ),
+        migrations.RunPython(add_categoria, drop_categoria),
+    ]
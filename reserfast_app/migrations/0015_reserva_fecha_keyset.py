@@ -0,0 +1,56 @@
+from django.db import migrations, connection
+
+
+# Orden de la pestaña de reservas del panel (paginacion.pagina_keyset):
+# ORDER BY d_fechaInicio DESC, id_reserva DESC sobre todas las reservas, sin
+# filtrar por b_activo, así que el índice parcial ix_reserva_activa_fecha no
+# sirve.
+NAME = 'ix_reserva_fecha_id'
+TABLE = 'tbl_reserva'
+COLUMNS = ['d_fechaInicio', 'id_reserva']
+
+
+def _mysql_index_exists(cursor):
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """,
+        [TABLE, NAME],
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def create_index(apps, schema_editor):
+    vendor = connection.vendor
+    if vendor not in ('sqlite', 'mysql'):
+        return
+
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {NAME} ON "{TABLE}" ({", ".join(COLUMNS)})')
+        elif not _mysql_index_exists(cursor):
+            cursor.execute(f'CREATE INDEX {NAME} ON `{TABLE}` ({", ".join(COLUMNS)})')
+
+
+def drop_index(apps, schema_editor):
+    vendor = connection.vendor
+    if vendor not in ('sqlite', 'mysql'):
+        return
+
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(f'DROP INDEX IF EXISTS {NAME}')
+        elif _mysql_index_exists(cursor):
+            cursor.execute(f'DROP INDEX {NAME} ON `{TABLE}`')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reserfast_app', '0014_menu_categoria'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
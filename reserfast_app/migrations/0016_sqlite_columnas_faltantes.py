@@ -0,0 +1,45 @@
+from django.db import migrations, connection
+
+
+# Columnas de los modelos que la DDL de 0010 no crea. Sin ellas una base
+# SQLite recién migrada falla en cualquier consulta sobre clientes o menús
+# (p. ej. `explicar_consultas --strict` en CI).
+COLUMNAS = [
+    ('tbl_cliente', 's_foto_perfil', 'VARCHAR(100)'),
+    ('tbl_cliente', 's_telefono', 'VARCHAR(15)'),
+    ('tbl_cliente', 'd_fecha_nacimiento', 'DATE'),
+    ('tbl_menu', 's_imagen', 'VARCHAR(100)'),
+]
+
+
+def _columnas(cursor, tabla):
+    cursor.execute(f'PRAGMA table_info("{tabla}")')
+    return {row[1].lower() for row in cursor.fetchall()}
+
+
+def add_columnas(apps, schema_editor):
+    # Solo la base de demo SQLite sale de 0010; las demás ya traen el esquema completo.
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        for tabla, columna, tipo in COLUMNAS:
+            if columna.lower() not in _columnas(cursor, tabla):
+                cursor.execute(f'ALTER TABLE "{tabla}" ADD COLUMN {columna} {tipo}')
+
+        # El seed de 0010 (y 0011) guarda la imagen de cada menú en s_notas.
+        cursor.execute(
+            "UPDATE tbl_menu SET s_imagen = s_notas "
+            "WHERE (s_imagen IS NULL OR s_imagen = '') AND s_notas LIKE 'menu_img/%'"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reserfast_app', '0015_reserva_fecha_keyset'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_columnas, migrations.RunPython.noop),
+    ]
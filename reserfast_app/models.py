@@ -1,5 +1,36 @@
+import unicodedata
+
 from django.db import models
 
+
+def normalizar(s):
+    """Minúsculas, sin tildes ni espacios en los extremos ('Rápida ' -> 'rapida')."""
+    return ''.join(c for c in unicodedata.normalize('NFKD', s or '') if not unicodedata.combining(c)).lower().strip()
+
+
+# Categoría canónica de un menú (`s_categoria`), derivada de `s_tipomenu` al guardar.
+CATEGORIAS_MENU = [
+    ('entrada', 'Entradas'),
+    ('rapida', 'Comida Rápida'),
+    ('almuerzo', 'Almuerzos'),
+    ('bebida', 'Bebidas'),
+]
+
+
+def categoria_menu(tipo):
+    """Clasifica un `s_tipomenu` libre; lo que no calza va a 'rapida'."""
+    tipo = normalizar(tipo)
+    if 'entrada' in tipo:
+        return 'entrada'
+    if 'rapid' in tipo:
+        return 'rapida'
+    if 'almuerzo' in tipo:
+        return 'almuerzo'
+    if 'bebida' in tipo:
+        return 'bebida'
+    return 'rapida'
+
+
 class TblGenero(models.Model):
     id_genero = models.AutoField(primary_key=True)
     s_nombregenero = models.CharField(db_column='s_nombreGenero', max_length=50, blank=True, null=True)
@@ -39,6 +70,18 @@ class TblUsuario(models.Model):
     def __str__(self):
         return f'{self.s_nombreusuario} {self.s_primerapellidousuario}'
 
+class TblEstadoEmpleado(models.Model):
+    id_usuario = models.IntegerField(primary_key=True)
+    rol = models.CharField(max_length=20)
+    en_servicio = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(blank=True, null=True)
+    class Meta:
+        managed = False
+        db_table = 'tbl_estado_empleado'
+        verbose_name = "Estado de empleado"
+    def __str__(self):
+        return f'{self.id_usuario} {self.rol} {"en servicio" if self.en_servicio else "fuera de servicio"}'
+
 class TblCliente(models.Model):
     id_cliente = models.AutoField(primary_key=True)
     s_primernombrecliente = models.CharField(db_column='s_primerNombreCliente', max_length=80, blank=True, null=True)
@@ -75,6 +118,7 @@ class TblMenu(models.Model):
     s_titulomenu = models.CharField(db_column='s_tituloMenu', max_length=50, blank=True, null=True)
     s_descripcionmenu = models.CharField(db_column='s_descripcionMenu', max_length=1000, blank=True, null=True)
     s_tipomenu = models.CharField(db_column='s_tipoMenu', max_length=80, blank=False, null=False)
+    s_categoria = models.CharField(db_column='s_categoriaMenu', max_length=20, choices=CATEGORIAS_MENU, editable=False, db_index=True)
     i_precio = models.IntegerField(blank=True, null=True)
     s_imagen = models.ImageField(upload_to='menu_img/', blank=True, null=True, help_text='Imagen del menú')
     b_activo = models.BooleanField(default=True)
@@ -84,6 +128,12 @@ class TblMenu(models.Model):
         verbose_name = "Menu"
     def __str__(self):
         return self.s_titulomenu if self.s_titulomenu else f"Menu {self.id_menu}"
+    def save(self, *args, **kwargs):
+        self.s_categoria = categoria_menu(self.s_tipomenu)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 's_tipomenu' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 's_categoria'}
+        super().save(*args, **kwargs)
 
 class TblMenuingrediente(models.Model):
     id_menuingrediente = models.AutoField(db_column='id_menuIngrediente', primary_key=True)
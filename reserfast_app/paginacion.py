@@ -0,0 +1,61 @@
+"""Paginación por keyset (cursor) para los listados del panel de administración.
+
+En lugar de OFFSET, cada página continúa desde el último (valor de orden, pk)
+de la anterior. El filtro y el ORDER BY usan la columna tal cual (sin
+COALESCE ni expresiones), así que con un índice sobre (campo, pk) cada página
+es una búsqueda en el índice y no crece con el historial. Las filas con el
+campo en NULL van al final, en un segundo tramo ordenado solo por pk. El
+cursor es opaco para el cliente (JSON en base64).
+"""
+import base64
+import json
+
+from django.db.models import Q
+
+
+def _codificar(valor, pk):
+    crudo = json.dumps([valor, pk], default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii')
+
+
+def _decodificar(cursor):
+    try:
+        valor, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return valor, int(pk)
+    except Exception:
+        raise ValueError('Cursor inválido.')
+
+
+def pagina_keyset(qs, campo, cursor=None, limite=25, descendente=False):
+    """Devuelve `(filas, siguiente_cursor)` de `qs` ordenado por `campo` y pk.
+
+    Primero las filas con `campo` no NULL y después las NULL (por pk).
+    `siguiente_cursor` es None en la última página. Lanza ValueError si el
+    cursor no es válido.
+    """
+    pk = qs.model._meta.pk.name
+    signo, op = ('-', 'lt') if descendente else ('', 'gt')
+    valor, ultimo = _decodificar(cursor) if cursor else (None, None)
+
+    filas = []
+    # Tramo con valor: `campo <= v AND (campo < v OR pk < u)` (en descendente)
+    # deja a la base de datos buscar el rango en el índice.
+    if ultimo is None or valor is not None:
+        tramo = qs.filter(**{f'{campo}__isnull': False})
+        if ultimo is not None:
+            tramo = tramo.filter(**{f'{campo}__{op}e': valor}).filter(
+                Q(**{f'{campo}__{op}': valor}) | Q(**{f'{pk}__{op}': ultimo})
+            )
+        filas = list(tramo.order_by(f'{signo}{campo}', f'{signo}{pk}')[:limite + 1])
+
+    if len(filas) <= limite:
+        tramo = qs.filter(**{f'{campo}__isnull': True})
+        if ultimo is not None and valor is None:
+            tramo = tramo.filter(**{f'{pk}__{op}': ultimo})
+        filas += list(tramo.order_by(f'{signo}{pk}')[:limite + 1 - len(filas)])
+
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = _codificar(getattr(filas[-1], campo), filas[-1].pk)
+    return filas, siguiente
@@ -0,0 +1,84 @@
+"""Hash y verificación de contraseñas (bcrypt) en un pool acotado.
+
+bcrypt libera el GIL, así que un pool de hilos acotado
+(`PASSWORD_HASHER_WORKERS`) limita cuántos hashes corren a la vez en el
+proceso: en un pico de logins los requests esperan turno en la cola en vez de
+competir todos por CPU con el resto del sitio.
+
+- `hash_password` / `check_password`: envían el trabajo al pool y esperan el
+  resultado. Bajo WSGI el hilo del request queda esperando: el pool acota la
+  concurrencia de bcrypt, no libera workers.
+- `ahash_password` / `acheck_password`: para las vistas asíncronas que se
+  usan con ASGI (`alogin_admin` / `alogin_clientes`); el event loop sigue
+  atendiendo otros requests mientras bcrypt trabaja.
+
+El costo de bcrypt sale de `BCRYPT_ROUNDS` (ver el comando
+`calibrar_bcrypt`). `needs_rehash` indica si un hash guardado usa otro costo,
+para migrarlo en el siguiente login correcto.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from django.conf import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = getattr(settings, 'PASSWORD_HASHER_WORKERS', None) or min(4, os.cpu_count() or 1)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+    return _executor
+
+
+def rounds():
+    """Costo (log2 de iteraciones) configurado para hashes nuevos."""
+    return getattr(settings, 'BCRYPT_ROUNDS', 12)
+
+
+def _hash(raw):
+    return bcrypt.hashpw(raw.encode('utf-8'), bcrypt.gensalt(rounds())).decode('utf-8')
+
+
+def _check(raw, hashed):
+    if not raw or not hashed:
+        return False
+    try:
+        return bcrypt.checkpw(raw.encode('utf-8'), hashed.encode('utf-8'))
+    except ValueError:
+        # Hash vacío o con formato inválido en la base de datos.
+        return False
+
+
+def needs_rehash(hashed):
+    """True si `hashed` fue generado con un costo distinto de `rounds()`."""
+    try:
+        # Formato: $2b$<costo>$<salt+hash>
+        return int(hashed.split('$')[2]) != rounds()
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+
+def hash_password(raw):
+    """Devuelve el hash bcrypt (str) de `raw`."""
+    return _pool().submit(_hash, raw).result()
+
+
+def check_password(raw, hashed):
+    """True si `raw` corresponde al hash bcrypt `hashed`."""
+    return _pool().submit(_check, raw, hashed).result()
+
+
+async def ahash_password(raw):
+    return await asyncio.wrap_future(_pool().submit(_hash, raw))
+
+
+async def acheck_password(raw, hashed):
+    return await asyncio.wrap_future(_pool().submit(_check, raw, hashed))
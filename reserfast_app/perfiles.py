@@ -0,0 +1,118 @@
+"""Resolución de perfiles (roles) por alias, memoizada por proceso.
+
+`TblPerfil` es una tabla chica que casi nunca cambia, pero los nombres no son
+fijos ('Garzon', 'Garzón', 'Mesero', 'Cocina', 'Jefe cocina'...). En vez de
+probar alias contra la base de datos en cada request, se lee la tabla una vez
+(por versión) y se resuelve en memoria:
+
+- `resolver(alias)` -> id del perfil que corresponde al alias (o None);
+  `perfil(alias)` devuelve la instancia para asignarla como FK.
+- `ids(alias)` -> ids de todos los perfiles de ese rol, para filtrar usuarios
+  por `fk_id_perfil_id__in` (índice) en vez de `LIKE` sobre el nombre.
+
+Los cambios de `TblPerfil` incrementan la versión `perfiles` (ver
+`signals.py`), así que todos los procesos recargan el mapa.
+"""
+import threading
+
+from django.db import transaction
+
+from . import versions
+from .models import TblPerfil, normalizar
+
+_VERSION = 'perfiles'
+
+# Nombres aceptados para cada rol, en orden de preferencia.
+ALIAS = {
+    'admin': ['administrador', 'administradora', 'admin'],
+    'garzon': ['garzon', 'garzón', 'encargado garzones', 'jefe garzon', 'jefe garzón', 'mesero', 'mozo'],
+    'cocinero': ['cocinero', 'chef', 'cocina', 'jefe cocina'],
+}
+
+_lock = threading.Lock()
+_mapa = None
+
+
+class _Mapa:
+    __slots__ = ('version', 'perfiles', 'resueltos', 'por_rol')
+
+    def __init__(self, version, perfiles):
+        self.version = version
+        # [(id, nombre normalizado, nombre)] en orden de id, como `.first()` sin orden.
+        self.perfiles = perfiles
+        self.resueltos = {}
+        self.por_rol = {}
+
+    def resolver(self, clave):
+        if clave in self.resueltos:
+            return self.resueltos[clave]
+        candidatos = [normalizar(a) for a in ALIAS.get(clave, [clave])]
+        encontrado = None
+        # Primero nombre exacto (sin tildes ni mayúsculas), luego contenido.
+        for a in candidatos:
+            encontrado = next((pid for pid, nombre, _ in self.perfiles if nombre == a), None)
+            if encontrado:
+                break
+        if encontrado is None:
+            for a in candidatos:
+                encontrado = next((pid for pid, nombre, _ in self.perfiles if a and a in nombre), None)
+                if encontrado:
+                    break
+        if encontrado is not None or clave in ALIAS:
+            self.resueltos[clave] = encontrado
+        return encontrado
+
+    def ids(self, clave):
+        if clave not in self.por_rol:
+            candidatos = [normalizar(a) for a in ALIAS.get(clave, [clave])]
+            self.por_rol[clave] = tuple(
+                pid for pid, nombre, _ in self.perfiles if any(a and a in nombre for a in candidatos)
+            )
+        return self.por_rol[clave]
+
+
+def _actual():
+    global _mapa
+    version = versions.current(_VERSION)
+    mapa = _mapa
+    if mapa is not None and mapa.version == version:
+        return mapa
+    mapa = _Mapa(version, [
+        (pid, normalizar(nombre), nombre)
+        for pid, nombre in TblPerfil.objects.order_by('id_perfil').values_list('id_perfil', 's_nombreperfil')
+    ])
+    with _lock:
+        _mapa = mapa
+    return mapa
+
+
+def resolver(alias):
+    """Id del perfil para un alias ('admin' | 'garzon' | 'cocinero' u otro nombre)."""
+    clave = normalizar(alias)
+    if not clave:
+        return None
+    return _actual().resolver(clave)
+
+
+def perfil(alias):
+    """`TblPerfil` (sin consultar la BD) para asignar como FK, o None."""
+    clave = normalizar(alias)
+    mapa = _actual()
+    pid = mapa.resolver(clave) if clave else None
+    if pid is None:
+        return None
+    nombre = next(n for i, _, n in mapa.perfiles if i == pid)
+    return TblPerfil(id_perfil=pid, s_nombreperfil=nombre)
+
+
+def ids(alias):
+    """Ids de todos los perfiles cuyo nombre corresponde al rol `alias`."""
+    clave = normalizar(alias)
+    if not clave:
+        return ()
+    return _actual().ids(clave)
+
+
+def invalidar():
+    """Recarga el mapa en todos los procesos tras el commit."""
+    transaction.on_commit(lambda: versions.bump(_VERSION))
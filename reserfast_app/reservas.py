@@ -0,0 +1,99 @@
+"""Carga en lote del detalle de reservas (mesa, menús, cliente).
+
+`hidratar_reservas` recibe un queryset de `TblReserva` y resuelve la mesa y
+los menús activos de todas las reservas con un número constante de consultas
+(reservas + mesas + menús), en lugar de dos consultas por reserva.
+
+`version_cliente(cliente_id)` cambia con cada escritura de una reserva del
+cliente (o de sus mesas/menús, ver `signals.py`); la usa el caché de
+respuestas de la API.
+"""
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from . import versions
+from .models import TblReserva, TblReservamenu, TblReservamesa
+
+
+@dataclass(slots=True)
+class ReservaDetalle:
+    reserva: object
+    cliente: object = None
+    mesa: object = None
+    menus: list = field(default_factory=list)
+    estado: str = 'Activa'
+
+
+def estado(activo, fecha, hoy):
+    if not activo:
+        return 'Cancelada'
+    if fecha and fecha < hoy:
+        return 'Pasada'
+    return 'Activa'
+
+
+def _version_name(cliente_id):
+    return f'reservas:cliente:{cliente_id}'
+
+
+def version_cliente(cliente_id):
+    """Versión de las reservas de `cliente_id`."""
+    return versions.current(_version_name(cliente_id))
+
+
+def invalidar_cliente(cliente_id):
+    """Incrementa la versión de las reservas de `cliente_id` tras el commit."""
+    if cliente_id is not None:
+        transaction.on_commit(lambda: versions.bump(_version_name(cliente_id)))
+
+
+def invalidar_reserva(reserva_id):
+    """Como `invalidar_cliente`, para el cliente dueño de `reserva_id`."""
+    def _bump():
+        for cliente_id in TblReserva.objects.filter(pk=reserva_id).values_list('fk_id_cliente_id', flat=True):
+            if cliente_id is not None:
+                versions.bump(_version_name(cliente_id))
+
+    if reserva_id is not None:
+        transaction.on_commit(_bump)
+
+
+def hidratar_reservas(reservas, hoy=None):
+    """Devuelve una lista de `ReservaDetalle` para el queryset `reservas`.
+
+    Se respeta el orden del queryset. Solo se consideran los vínculos
+    `tbl_reservaMesa` / `tbl_reservaMenu` activos; si una reserva tuviera más
+    de una mesa activa se usa la primera por id, como hacían las vistas.
+    """
+    hoy = hoy or timezone.now().date()
+    qs = reservas.select_related('fk_id_cliente').prefetch_related(
+        Prefetch(
+            'tblreservamesa_set',
+            queryset=TblReservamesa.objects.filter(b_activo=True)
+            .select_related('fk_id_mesa')
+            .order_by('id_reservamesa'),
+            to_attr='mesas_activas',
+        ),
+        Prefetch(
+            'tblreservamenu_set',
+            queryset=TblReservamenu.objects.filter(b_activo=True)
+            .select_related('fk_id_menu')
+            .order_by('id_reservamenu'),
+            to_attr='menus_activos',
+        ),
+    )
+
+    detalles = []
+    for r in qs:
+        mesa_rm = r.mesas_activas[0] if r.mesas_activas else None
+        detalles.append(ReservaDetalle(
+            reserva=r,
+            cliente=r.fk_id_cliente,
+            mesa=mesa_rm.fk_id_mesa if mesa_rm else None,
+            menus=[rm.fk_id_menu for rm in r.menus_activos if rm.fk_id_menu],
+            estado=estado(r.b_activo, r.d_fechainicio, hoy),
+        ))
+    return detalles
@@ -0,0 +1,137 @@
+"""Estado "en servicio" de garzones y cocineros (`tbl_estado_empleado`).
+
+Los paneles (admin, garzón, cocina) leen el mapa `{id_usuario: en_servicio}`
+desde memoria del proceso / caché compartido. Cada escritura actualiza la
+base de datos, incrementa la versión y publica el mapa nuevo en el caché
+(write-through), así que las lecturas no tocan la base de datos en estado
+estable. Las escrituras son un único upsert atómico (ver `_SQL`).
+"""
+import threading
+
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from . import dashboard, versions
+from .models import TblEstadoEmpleado
+
+_VERSION = 'servicio'
+
+_lock = threading.Lock()
+_local = None  # (version, {id_usuario: en_servicio})
+
+
+def _cache_key(version):
+    return f'reserfast:servicio:{version}'
+
+
+def _cargar():
+    return {
+        uid: bool(en_servicio)
+        for uid, en_servicio in TblEstadoEmpleado.objects.values_list('id_usuario', 'en_servicio')
+    }
+
+
+def _guardar_local(version, estados):
+    global _local
+    with _lock:
+        if _local is None or _local[0] <= version:
+            _local = (version, estados)
+
+
+def estados():
+    """Mapa `{id_usuario: en_servicio}` de todos los empleados con estado."""
+    version = versions.current(_VERSION)
+    local = _local
+    if local is not None and local[0] == version:
+        return local[1]
+    datos = cache.get(_cache_key(version))
+    if datos is None:
+        datos = _cargar()
+        cache.set(_cache_key(version), datos, None)
+    _guardar_local(version, datos)
+    return datos
+
+
+def en_servicio(id_usuario):
+    """True si el empleado `id_usuario` está marcado en servicio."""
+    if not id_usuario:
+        return False
+    return estados().get(int(id_usuario), False)
+
+
+def _publicar():
+    version = versions.bump(_VERSION)
+    datos = _cargar()
+    cache.set(_cache_key(version), datos, None)
+    _guardar_local(version, datos)
+    dashboard.invalidar()
+
+
+# Una sola sentencia por escritura: el upsert es atómico en la base de datos,
+# así que dos toques seguidos del mismo empleado no pueden pisarse.
+_SQL = {
+    'sqlite': {
+        'alternar': """
+            INSERT INTO tbl_estado_empleado (id_usuario, rol, en_servicio, updated_at)
+            VALUES (%s, %s, 1, CURRENT_TIMESTAMP)
+            ON CONFLICT (id_usuario) DO UPDATE SET
+                en_servicio = 1 - en_servicio,
+                rol = excluded.rol,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING en_servicio
+        """,
+        'establecer': """
+            INSERT INTO tbl_estado_empleado (id_usuario, rol, en_servicio, updated_at)
+            VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (id_usuario) DO UPDATE SET
+                en_servicio = excluded.en_servicio,
+                rol = excluded.rol,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING en_servicio
+        """,
+    },
+    # MySQL no tiene RETURNING: LAST_INSERT_ID(expr) deja el valor nuevo en
+    # el paquete OK de la misma sentencia (cursor.lastrowid).
+    'mysql': {
+        'alternar': """
+            INSERT INTO tbl_estado_empleado (id_usuario, rol, en_servicio, updated_at)
+            VALUES (%s, %s, LAST_INSERT_ID(1), CURRENT_TIMESTAMP)
+            ON DUPLICATE KEY UPDATE
+                en_servicio = LAST_INSERT_ID(1 - en_servicio),
+                rol = VALUES(rol),
+                updated_at = CURRENT_TIMESTAMP
+        """,
+        'establecer': """
+            INSERT INTO tbl_estado_empleado (id_usuario, rol, en_servicio, updated_at)
+            VALUES (%s, %s, LAST_INSERT_ID(%s), CURRENT_TIMESTAMP)
+            ON DUPLICATE KEY UPDATE
+                en_servicio = LAST_INSERT_ID(VALUES(en_servicio)),
+                rol = VALUES(rol),
+                updated_at = CURRENT_TIMESTAMP
+        """,
+    },
+}
+
+
+def _upsert(operacion, params):
+    conn = connections[TblEstadoEmpleado.objects.db]
+    sql = _SQL[conn.vendor][operacion]
+    with conn.cursor() as cursor:
+        cursor.execute(sql, params)
+        if conn.vendor == 'mysql':
+            nuevo = cursor.lastrowid
+        else:
+            nuevo = cursor.fetchone()[0]
+    # Fuera de una transacción se publica de inmediato.
+    transaction.on_commit(_publicar, using=conn.alias)
+    return bool(nuevo)
+
+
+def alternar(id_usuario, rol):
+    """Invierte el estado de servicio del empleado y devuelve el nuevo valor."""
+    return _upsert('alternar', [id_usuario, rol])
+
+
+def establecer(id_usuario, rol, en_servicio):
+    """Fija el estado de servicio (idempotente) y devuelve el valor guardado."""
+    return _upsert('establecer', [id_usuario, rol, 1 if en_servicio else 0])
@@ -0,0 +1,111 @@
+"""Backend de sesiones con caché que agrupa las escrituras a la base de datos.
+
+Con `SESSION_SAVE_EVERY_REQUEST = True` cada página renueva la expiración, y
+con el backend `db` eso es un UPDATE sobre `django_session` por request (en
+SQLite serializa a todos los escritores). Este backend (estilo `cached_db`)
+lee la sesión del caché y solo escribe en la base de datos cuando:
+
+- cambian los datos de la sesión (se comparan serializados con los cargados,
+  no basta con asignar el mismo valor), o
+- la expiración guardada quedó atrasada más de `SESSION_WRITE_STALE_FRACTION`
+  de `SESSION_COOKIE_AGE` respecto de la que correspondería ahora.
+
+En el peor caso una sesión inactiva expira esa fracción antes que la cookie.
+Las sesiones vencidas se borran por lotes con `manage.py purgar_sesiones`.
+
+Como `cached_db`, requiere que `SESSION_CACHE_ALIAS` apunte a un caché
+compartido cuando hay varios procesos.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'reserfast.sesion'
+
+
+def _fraccion():
+    return getattr(settings, 'SESSION_WRITE_STALE_FRACTION', 0.2)
+
+
+class SessionStore(cached_db.SessionStore):
+    # En caché se guarda {'datos': ..., 'expira': datetime}; prefijo propio
+    # para no mezclarse con entradas de `cached_db`.
+    cache_key_prefix = KEY_PREFIX
+
+    def _serializar(self, datos):
+        return self.serializer().dumps(datos)
+
+    def _recordar(self, datos, expira):
+        self._expira_guardada = expira
+        self._firma = self._serializar(datos)
+
+    def _payload_db(self, s):
+        if s is None:
+            return {'datos': {}, 'expira': None}
+        return {'datos': self.decode(s.session_data), 'expira': s.expire_date}
+
+    def load(self):
+        try:
+            payload = self._cache.get(self.cache_key)
+        except Exception:
+            payload = None
+        if payload is None:
+            s = self._get_session_from_db()
+            payload = self._payload_db(s)
+            if s:
+                self._cache.set(self.cache_key, payload, self.get_expiry_age(expiry=s.expire_date))
+        self._recordar(payload['datos'], payload['expira'])
+        return payload['datos']
+
+    async def aload(self):
+        try:
+            payload = await self._cache.aget(await self.acache_key())
+        except Exception:
+            payload = None
+        if payload is None:
+            s = await self._aget_session_from_db()
+            payload = self._payload_db(s)
+            if s:
+                await self._cache.aset(
+                    await self.acache_key(), payload, await self.aget_expiry_age(expiry=s.expire_date)
+                )
+        self._recordar(payload['datos'], payload['expira'])
+        return payload['datos']
+
+    def _puede_omitir(self, datos, expira, edad):
+        guardada = getattr(self, '_expira_guardada', None)
+        if self.session_key is None or guardada is None:
+            return False
+        if self._serializar(datos) != self._firma:
+            return False
+        return (expira - guardada).total_seconds() < _fraccion() * edad
+
+    def save(self, must_create=False):
+        datos = self._get_session(no_load=must_create)
+        expira = self.get_expiry_date()
+        if not must_create and self._puede_omitir(datos, expira, self.get_expiry_age()):
+            return
+        DBStore.save(self, must_create)
+        payload = {'datos': self._session, 'expira': expira}
+        try:
+            self._cache.set(self.cache_key, payload, self.get_expiry_age())
+        except Exception:
+            logger.exception("Error saving to cache (%s)", self._cache)
+        self._recordar(payload['datos'], expira)
+
+    async def asave(self, must_create=False):
+        datos = await self._aget_session(no_load=must_create)
+        expira = await self.aget_expiry_date()
+        if not must_create and self._puede_omitir(datos, expira, await self.aget_expiry_age()):
+            return
+        await DBStore.asave(self, must_create)
+        payload = {'datos': self._session, 'expira': expira}
+        try:
+            await self._cache.aset(await self.acache_key(), payload, await self.aget_expiry_age())
+        except Exception:
+            logger.exception("Error saving to cache (%s)", self._cache)
+        self._recordar(payload['datos'], expira)
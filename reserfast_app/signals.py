@@ -0,0 +1,99 @@
+"""Invalidación de cachés ante escrituras de modelos.
+
+Cubre todos los caminos que guardan con `.save()` / `.delete()` (vistas,
+formularios y admin). Las escrituras con `QuerySet.update()` deben invalidar
+explícitamente.
+
+Las derivadas de una foto (`imagenes`) solo se encolan cuando el guardado
+cambió el archivo: se compara contra el nombre cargado con la instancia.
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import catalogo, dashboard, disponibilidad, imagenes, perfiles, reservas
+from .identity import invalidate_principal
+from .models import (
+    TblCliente, TblMenu, TblMesa, TblPerfil, TblReserva, TblReservamenu, TblReservamesa, TblUsuario,
+)
+
+_CAMPO_IMAGEN = {TblCliente: 's_foto_perfil', TblMenu: 's_imagen'}
+
+
+def _nombre_imagen(instance):
+    # Lee __dict__ y no el descriptor: el campo puede venir diferido (.only()).
+    valor = instance.__dict__.get(_CAMPO_IMAGEN[type(instance)])
+    return getattr(valor, 'name', valor) or ''
+
+
+@receiver(post_init, sender=TblCliente)
+@receiver(post_init, sender=TblMenu)
+def _recordar_imagen(sender, instance, **kwargs):
+    if _CAMPO_IMAGEN[sender] in instance.__dict__:
+        instance._imagen_guardada = _nombre_imagen(instance)
+
+
+def _imagen_cambiada(instance, **kwargs):
+    """True si este post_save dejó en la instancia un archivo distinto al cargado."""
+    campo = _CAMPO_IMAGEN[type(instance)]
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and campo not in update_fields:
+        return False
+    if campo not in instance.__dict__:
+        return False
+    nombre = _nombre_imagen(instance)
+    anterior = getattr(instance, '_imagen_guardada', None)
+    instance._imagen_guardada = nombre
+    return bool(nombre) and (kwargs.get('created') or nombre != anterior)
+
+
+@receiver([post_save, post_delete], sender=TblCliente)
+def _cliente_changed(sender, instance, **kwargs):
+    invalidate_principal('cliente', instance.pk)
+    dashboard.invalidar()
+    if kwargs.get('signal') is post_save and _imagen_cambiada(instance, **kwargs):
+        imagenes.encolar(instance.s_foto_perfil.name)
+
+
+@receiver([post_save, post_delete], sender=TblUsuario)
+def _usuario_changed(sender, instance, **kwargs):
+    invalidate_principal('usuario', instance.pk)
+    dashboard.invalidar()
+
+
+@receiver([post_save, post_delete], sender=TblReserva)
+def _reserva_changed(sender, instance, **kwargs):
+    disponibilidad.reserva_modificada(instance.pk)
+    reservas.invalidar_cliente(instance.fk_id_cliente_id)
+    dashboard.invalidar()
+
+
+@receiver([post_save, post_delete], sender=TblReservamesa)
+def _reservamesa_changed(sender, instance, **kwargs):
+    disponibilidad.reserva_modificada(instance.fk_id_reserva_id)
+    reservas.invalidar_reserva(instance.fk_id_reserva_id)
+
+
+@receiver([post_save, post_delete], sender=TblReservamenu)
+def _reservamenu_changed(sender, instance, **kwargs):
+    reservas.invalidar_reserva(instance.fk_id_reserva_id)
+
+
+@receiver([post_save, post_delete], sender=TblMesa)
+def _mesa_changed(sender, instance, **kwargs):
+    disponibilidad.mesas_modificadas()
+    catalogo.invalidar()
+    dashboard.invalidar()
+
+
+@receiver([post_save, post_delete], sender=TblMenu)
+def _menu_changed(sender, instance, **kwargs):
+    catalogo.invalidar()
+    dashboard.invalidar()
+    if kwargs.get('signal') is post_save and _imagen_cambiada(instance, **kwargs):
+        imagenes.encolar(instance.s_imagen.name)
+
+
+@receiver([post_save, post_delete], sender=TblPerfil)
+def _perfil_changed(sender, instance, **kwargs):
+    perfiles.invalidar()
+    dashboard.invalidar()
@@ -0,0 +1,107 @@
+"""Storage de media con nombres por contenido para las fotos subidas.
+
+Los archivos de `CONTENT_ADDRESSED_PREFIXES` (`menu_img/`, `perfil_img/`) se
+guardan como `<prefijo>/<sha256>.<ext>` en vez del nombre que trae el
+navegador:
+
+- Subir dos veces la misma foto no crea copias con sufijo
+  (`foto_kiaVAkX.jpg`): el segundo guardado encuentra el archivo y solo
+  devuelve su nombre, y las derivadas (`imagenes.py`) ya generadas se reusan.
+- Un mismo archivo puede quedar referenciado por varias filas, así que nunca
+  se borra al reemplazar una foto; los que ya nadie referencia los elimina el
+  comando `limpiar_media`.
+
+El hash lo calcula `ImagenUploadHandler` mientras recibe el archivo
+(`sha256`); para otros contenidos se lee aquí por chunks. El resto de rutas
+(derivadas, etc.) se guarda igual que con `FileSystemStorage`.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+
+def prefijos():
+    return tuple(getattr(settings, 'CONTENT_ADDRESSED_PREFIXES', ('menu_img/', 'perfil_img/')))
+
+
+def es_direccionable(name):
+    return str(name).replace('\\', '/').startswith(prefijos())
+
+
+def hash_contenido(content):
+    """sha256 (hex) de `content`, leyendo por chunks y rebobinando."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    h = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        h.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return h.hexdigest()
+
+
+class ContenidoStorage(FileSystemStorage):
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if es_direccionable(name):
+            directorio, archivo = posixpath.split(str(name).replace('\\', '/'))
+            ext = os.path.splitext(archivo)[1].lower()
+            name = posixpath.join(directorio, hash_contenido(content) + ext)
+        return super().save(name, content, max_length=max_length)
+
+    def get_available_name(self, name, max_length=None):
+        if es_direccionable(name):
+            # Mismo nombre = mismo contenido: no se agrega sufijo.
+            return name
+        return super().get_available_name(name, max_length=max_length)
+
+    def _save(self, name, content):
+        if not es_direccionable(name):
+            return super()._save(name, content)
+        if self.exists(name):
+            return name
+
+        full_path = self.path(name)
+        directorio = os.path.dirname(full_path)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directorio, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directorio, exist_ok=True)
+
+        # Se escribe aparte y se reemplaza de forma atómica: si otro request
+        # guarda el mismo contenido a la vez, el resultado es idéntico.
+        movido = False
+        if hasattr(content, 'temporary_file_path'):
+            try:
+                os.replace(content.temporary_file_path(), full_path)
+                movido = True
+            except OSError:
+                # Otro sistema de archivos (FILE_UPLOAD_TEMP_DIR fuera de MEDIA_ROOT).
+                pass
+        if not movido:
+            fd, tmp_path = tempfile.mkstemp(dir=directorio, prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    for chunk in content.chunks():
+                        f.write(chunk)
+                os.replace(tmp_path, full_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return str(name).replace('\\', '/')
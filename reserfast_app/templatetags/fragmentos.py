@@ -0,0 +1,48 @@
+from django import template
+
+from reserfast_app import fragmentos
+
+register = template.Library()
+
+
+class FragmentoNode(template.Node):
+    def __init__(self, nodelist, nombre, objeto, extra):
+        self.nodelist = nodelist
+        self.nombre = nombre
+        self.objeto = objeto
+        self.extra = extra
+
+    def render(self, context):
+        nombre = self.nombre.resolve(context)
+        obj = self.objeto.resolve(context)
+        if obj is None or getattr(obj, 'pk', None) is None:
+            return self.nodelist.render(context)
+        key = fragmentos.clave(nombre, obj, *(e.resolve(context) for e in self.extra))
+        html = fragmentos.obtener(key, nombre)
+        if html is None:
+            html = self.nodelist.render(context)
+            fragmentos.guardar(key, html)
+        return html
+
+
+@register.tag
+def fragmento(parser, token):
+    """Cachea el bloque por objeto: se re-renderiza solo si el objeto cambió.
+
+        {% load fragmentos %}
+        {% fragmento "menu_cliente" card %} ... {% endfragmento %}
+
+    Valores adicionales de los que dependa el bloque (y que no sean campos del
+    objeto) se pasan después: `{% fragmento "mesa" item.mesa item.disponible %}`.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' requiere un nombre y un objeto.")
+    nodelist = parser.parse(('endfragmento',))
+    parser.delete_first_token()
+    return FragmentoNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(b) for b in bits[3:]],
+    )
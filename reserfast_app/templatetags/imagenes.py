@@ -0,0 +1,33 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from reserfast_app import imagenes
+
+register = template.Library()
+
+
+@register.simple_tag
+def imagen(archivo, sizes='100vw', **attrs):
+    """`<picture>` con derivadas WebP y JPEG/PNG (`srcset`) de una foto subida.
+
+    `archivo` es un FieldFile (o el `Imagen` del catálogo). Sin derivadas
+    generadas todavía, cae a un `<img>` con la imagen original. El resto de
+    argumentos se copian como atributos del `<img>` (alt, class, style...).
+
+        {% load imagenes %}
+        {% imagen menu.s_imagen sizes="60px" alt=menu.s_titulomenu class="card-img-top" %}
+    """
+    name = getattr(archivo, 'name', None)
+    if not name:
+        return ''
+    attrs.setdefault('loading', 'lazy')
+    webp = imagenes.srcset(name, 'webp')
+    if not webp:
+        return format_html('<img src="{}"{}>', archivo.url, flatatt(attrs))
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        webp, sizes,
+        archivo.url, imagenes.srcset(name, imagenes.formato_base(name)), sizes, flatatt(attrs),
+    )
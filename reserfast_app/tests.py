@@ -0,0 +1,636 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import BytesIO
+from unittest import mock
+
+import bcrypt
+from PIL import Image
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from django.utils import timezone
+
+from . import disponibilidad, fragmentos, imagenes, reservas, servicio, throttle, uploads, versions, views
+from .models import TblCliente, TblEstadoEmpleado, TblMesa, TblReserva, TblReservamesa, TblUsuario
+from .paginacion import pagina_keyset
+from .sesiones import SessionStore
+
+# Login con las vistas asíncronas, como las enruta reserfast_app.urls bajo ASGI.
+urlpatterns = [
+    path('reserfast/login_admin/', views.alogin_admin),
+    path('reserfast/login_clientes/', views.alogin_clientes),
+    path('', include('reserfast.urls')),
+]
+
+
+class CacheLimpioMixin:
+    """Cada test parte sin contadores de versión ni copias en memoria del proceso."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        disponibilidad._indice = None
+        servicio._local = None
+        throttle._local.clear()
+        throttle._local_contadores.update(dict.fromkeys(throttle._CONTADORES, 0))
+        throttle._compartido = None
+
+
+class IndiceDisponibilidadTests(CacheLimpioMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.hoy = timezone.now().date()
+        self.mesa = TblMesa.objects.create(s_nombremesa='Mesa T', b_ocupado=0, b_activo=True)
+
+    def reservar(self, fecha, mesa=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            reserva = TblReserva.objects.create(d_fechainicio=fecha, i_totalreserva=0, b_activo=True)
+            TblReservamesa.objects.create(fk_id_reserva=reserva, fk_id_mesa=mesa or self.mesa, b_activo=True)
+        return reserva
+
+    def test_parche_incremental_sin_reconstruir(self):
+        fecha = self.hoy + timedelta(days=3)
+        indice = disponibilidad._actual()
+        self.assertTrue(disponibilidad.mesa_disponible(self.mesa.id_mesa, fecha))
+
+        reserva = self.reservar(fecha)
+
+        # Misma instancia (parcheada), versión al día y sin consultas al leer.
+        self.assertIs(disponibilidad._indice, indice)
+        self.assertEqual(indice.version, versions.current('disponibilidad'))
+        with self.assertNumQueries(0):
+            self.assertFalse(disponibilidad.mesa_disponible(self.mesa.id_mesa, fecha))
+            self.assertTrue(disponibilidad.mesa_disponible(self.mesa.id_mesa, fecha, reserva.id_reserva))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reserva.b_activo = False
+            reserva.save()
+        self.assertIs(disponibilidad._indice, indice)
+        self.assertTrue(disponibilidad.mesa_disponible(self.mesa.id_mesa, fecha))
+        self.assertEqual(disponibilidad.fechas_ocupadas(self.mesa.id_mesa, self.hoy, fecha), [])
+
+    def test_reconstruye_si_la_version_salta(self):
+        fecha = self.hoy + timedelta(days=2)
+        indice = disponibilidad._actual()
+        # Otro proceso aplicó un cambio que este no vio.
+        versions.bump('disponibilidad')
+
+        self.reservar(fecha)
+
+        self.assertIsNone(disponibilidad._indice)
+        self.assertFalse(disponibilidad.mesa_disponible(self.mesa.id_mesa, fecha))
+        self.assertIsNot(disponibilidad._indice, indice)
+        self.assertEqual(disponibilidad._indice.version, versions.current('disponibilidad'))
+
+    def test_reconstruye_si_cambio_la_version_compartida(self):
+        indice = disponibilidad._actual()
+        versions.bump('disponibilidad')
+        self.assertIsNot(disponibilidad._actual(), indice)
+
+    def test_alta_de_mesa_invalida_el_indice(self):
+        disponibilidad._actual()
+        with self.captureOnCommitCallbacks(execute=True):
+            otra = TblMesa.objects.create(s_nombremesa='Mesa U', b_ocupado=0, b_activo=True)
+        self.assertIsNone(disponibilidad._indice)
+        self.assertIn(otra.id_mesa, disponibilidad._actual().mesas)
+
+    def test_cambio_de_dia_reconstruye(self):
+        fecha = self.hoy + timedelta(days=1)
+        self.reservar(fecha)
+        indice = disponibilidad._actual()
+
+        manana = timezone.now() + timedelta(days=3)
+        with mock.patch('reserfast_app.disponibilidad.timezone.now', return_value=manana):
+            nuevo = disponibilidad._actual()
+            self.assertIsNot(nuevo, indice)
+            self.assertEqual(nuevo.desde, manana.date() - timedelta(days=1))
+            # `fecha` quedó antes del índice: se responde desde la base de datos.
+            self.assertLess(fecha, nuevo.desde)
+            self.assertFalse(disponibilidad.mesa_disponible(self.mesa.id_mesa, fecha))
+
+    def test_matriz(self):
+        self.reservar(self.hoy + timedelta(days=1))
+        ocupacion = disponibilidad.matriz([self.mesa.id_mesa], self.hoy, self.hoy + timedelta(days=2))
+        self.assertEqual(ocupacion, {self.mesa.id_mesa: '010'})
+
+    def test_fechas_anteriores_al_indice_salen_de_la_base_de_datos(self):
+        pasada = self.hoy - timedelta(days=5)
+        futura = self.hoy + timedelta(days=2)
+        self.reservar(pasada)
+        self.reservar(futura)
+        indice = disponibilidad._actual()
+        self.assertLess(pasada, indice.desde)
+
+        desde = self.hoy - timedelta(days=7)
+        self.assertEqual(disponibilidad.fechas_ocupadas(self.mesa.id_mesa, desde, futura), [pasada, futura])
+        self.assertEqual(disponibilidad.fechas_ocupadas(self.mesa.id_mesa, desde, pasada), [pasada])
+        self.assertFalse(disponibilidad.mesa_disponible(self.mesa.id_mesa, pasada))
+        ocupacion = disponibilidad.matriz([self.mesa.id_mesa], desde, futura)[self.mesa.id_mesa]
+        self.assertEqual([desde + timedelta(days=i) for i, c in enumerate(ocupacion) if c == '1'], [pasada, futura])
+
+
+class ServicioUpsertTests(CacheLimpioMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.usuario = TblUsuario.objects.create(s_usuario='garzon_t', s_contrasenausuario='x', b_activo=True)
+
+    def alternar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return servicio.alternar(self.usuario.id_usuario, 'garzon')
+
+    def test_alternar_crea_e_invierte(self):
+        self.assertFalse(servicio.en_servicio(self.usuario.id_usuario))
+        self.assertTrue(self.alternar())
+        self.assertTrue(servicio.en_servicio(self.usuario.id_usuario))
+        self.assertFalse(self.alternar())
+        self.assertFalse(servicio.en_servicio(self.usuario.id_usuario))
+        self.assertTrue(self.alternar())
+        self.assertEqual(TblEstadoEmpleado.objects.filter(id_usuario=self.usuario.id_usuario).count(), 1)
+
+    def test_alternar_es_una_sola_sentencia(self):
+        with CaptureQueriesContext(connection) as consultas:
+            servicio.alternar(self.usuario.id_usuario, 'garzon')
+        self.assertEqual(len(consultas.captured_queries), 1)
+
+    def test_establecer_es_idempotente(self):
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertTrue(servicio.establecer(self.usuario.id_usuario, 'garzon', True))
+        self.assertTrue(servicio.en_servicio(self.usuario.id_usuario))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertFalse(servicio.establecer(self.usuario.id_usuario, 'cocinero', False))
+        estado = TblEstadoEmpleado.objects.get(id_usuario=self.usuario.id_usuario)
+        self.assertEqual((estado.rol, bool(estado.en_servicio)), ('cocinero', False))
+
+    def test_lectura_estable_sin_consultas(self):
+        self.alternar()
+        servicio.estados()
+        with self.assertNumQueries(0):
+            self.assertTrue(servicio.en_servicio(self.usuario.id_usuario))
+
+
+@override_settings(SESSION_COOKIE_AGE=3600, SESSION_WRITE_STALE_FRACTION=0.2)
+class SesionesTests(CacheLimpioMixin, TestCase):
+
+    def crear(self):
+        store = SessionStore()
+        store['cliente_id'] = 7
+        store.save(must_create=True)
+        return store.session_key
+
+    def escrituras(self, store):
+        with CaptureQueriesContext(connection) as consultas:
+            store.save()
+        return [
+            q['sql'] for q in consultas.captured_queries
+            if 'django_session' in q['sql'] and not q['sql'].lstrip().upper().startswith('SELECT')
+        ]
+
+    def test_sin_cambios_no_escribe(self):
+        store = SessionStore(self.crear())
+        self.assertEqual(store['cliente_id'], 7)
+        with self.assertNumQueries(0):
+            store.save()
+
+    def test_asignar_el_mismo_valor_no_escribe(self):
+        store = SessionStore(self.crear())
+        store['cliente_id'] = 7
+        self.assertEqual(self.escrituras(store), [])
+
+    def test_cambio_de_datos_escribe(self):
+        store = SessionStore(self.crear())
+        store['cliente_id'] = 8
+        self.assertTrue(self.escrituras(store))
+        self.assertEqual(SessionStore(store.session_key)['cliente_id'], 8)
+        self.assertEqual(Session.objects.get(pk=store.session_key).get_decoded()['cliente_id'], 8)
+
+    def test_expiracion_atrasada_escribe(self):
+        store = SessionStore(self.crear())
+        store.load()
+        # Guardada hace más de 0.2 * 3600 s: hay que renovarla en la base de datos.
+        store._expira_guardada = store.get_expiry_date() - timedelta(seconds=0.25 * 3600)
+        self.assertTrue(self.escrituras(store))
+
+    def test_expiracion_reciente_no_escribe(self):
+        store = SessionStore(self.crear())
+        store.load()
+        store._expira_guardada = store.get_expiry_date() - timedelta(seconds=0.1 * 3600)
+        self.assertEqual(self.escrituras(store), [])
+
+    def test_lee_del_cache(self):
+        key = self.crear()
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(key)['cliente_id'], 7)
+
+
+class PaginaKeysetTests(TestCase):
+
+    def setUp(self):
+        dia = date(2026, 1, 10)
+        fechas = [dia, dia, None, dia + timedelta(days=1), None, dia, dia - timedelta(days=1), None]
+        self.reservas = [
+            TblReserva.objects.create(d_fechainicio=f, i_totalreserva=0, b_activo=True) for f in fechas
+        ]
+
+    def recorrer(self, limite, descendente):
+        ids, cursor, paginas = [], None, 0
+        while True:
+            filas, cursor = pagina_keyset(
+                TblReserva.objects.all(), 'd_fechainicio', cursor, limite, descendente=descendente
+            )
+            ids += [r.id_reserva for r in filas]
+            paginas += 1
+            if cursor is None:
+                return ids, paginas
+
+    def esperado(self, descendente):
+        con_fecha = sorted(
+            (r for r in self.reservas if r.d_fechainicio), key=lambda r: (r.d_fechainicio, r.id_reserva),
+            reverse=descendente,
+        )
+        sin_fecha = sorted((r for r in self.reservas if not r.d_fechainicio), key=lambda r: r.id_reserva,
+                           reverse=descendente)
+        return [r.id_reserva for r in con_fecha + sin_fecha]
+
+    def test_descendente_con_empates_y_nulos(self):
+        for limite in (1, 2, 3, 5, 8, 20):
+            ids, paginas = self.recorrer(limite, True)
+            self.assertEqual(ids, self.esperado(True), limite)
+            self.assertEqual(paginas, max(1, -(-len(ids) // limite)), limite)
+
+    def test_ascendente_con_empates_y_nulos(self):
+        for limite in (1, 2, 3, 8):
+            ids, _ = self.recorrer(limite, False)
+            self.assertEqual(ids, self.esperado(False), limite)
+
+    def test_cursor_invalido(self):
+        with self.assertRaises(ValueError):
+            pagina_keyset(TblReserva.objects.all(), 'd_fechainicio', 'no-es-un-cursor')
+
+
+@override_settings(BCRYPT_ROUNDS=5)
+class LoginTests(CacheLimpioMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Hash con otro costo: un login correcto lo migra a BCRYPT_ROUNDS.
+        hashed = bcrypt.hashpw(b'secreto1', bcrypt.gensalt(4)).decode()
+        self.cliente = TblCliente.objects.create(
+            s_primernombrecliente='Ana', s_email='ana@x.cl', s_contrasena=hashed, b_activo=True
+        )
+        self.usuario = TblUsuario.objects.create(
+            s_usuario='admin_t', s_nombreusuario='Admin', s_contrasenausuario=hashed, b_activo=True
+        )
+
+    def test_login_clientes_sincrono(self):
+        r = self.client.post('/reserfast/login_clientes/', {'email': 'ana@x.cl', 'contrasena': 'secreto1'})
+        self.assertRedirects(r, '/reserfast/index_cliente/', fetch_redirect_response=False)
+        self.assertEqual(self.client.session['cliente_id'], self.cliente.id_cliente)
+
+    @override_settings(ROOT_URLCONF='reserfast_app.tests')
+    async def test_login_clientes_asincrono(self):
+        r = await self.async_client.post('/reserfast/login_clientes/', {'email': 'ana@x.cl', 'contrasena': 'secreto1'})
+        self.assertEqual((r.status_code, r.url), (302, '/reserfast/index_cliente/'))
+        cliente = await TblCliente.objects.aget(pk=self.cliente.pk)
+        self.assertTrue(cliente.s_contrasena.startswith('$2b$05$'))
+
+        r = await self.async_client.post('/reserfast/login_clientes/', {'email': 'ana@x.cl', 'contrasena': 'otra'})
+        self.assertEqual(r.status_code, 200)
+        self.assertContains(r, 'Email o contraseña incorrectos.')
+
+    @override_settings(ROOT_URLCONF='reserfast_app.tests')
+    async def test_login_admin_asincrono(self):
+        r = await self.async_client.post('/reserfast/login_admin/', {'usuario': 'admin_t', 'contrasena': 'secreto1'})
+        self.assertEqual((r.status_code, r.url), (302, '/reserfast/index_admin/'))
+        usuario = await TblUsuario.objects.aget(pk=self.usuario.pk)
+        self.assertTrue(usuario.s_contrasenausuario.startswith('$2b$05$'))
+
+
+class EncolarImagenTests(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(imagenes, 'encolar')
+        self.encolar = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_solo_encola_si_cambia_la_foto(self):
+        cliente = TblCliente.objects.create(s_email='foto@x.cl', s_foto_perfil='perfil_img/a.jpg')
+        self.encolar.assert_called_once_with('perfil_img/a.jpg')
+
+        self.encolar.reset_mock()
+        cliente.s_telefono = '123'
+        cliente.save()
+        cliente = TblCliente.objects.get(pk=cliente.pk)
+        cliente.s_telefono = '456'
+        cliente.save()
+        cliente.s_foto_perfil = 'perfil_img/b.jpg'
+        cliente.save(update_fields=['s_telefono'])
+        TblCliente.objects.only('s_email').get(pk=cliente.pk).save()
+        self.encolar.assert_not_called()
+
+        cliente.s_foto_perfil = 'perfil_img/b.jpg'
+        cliente.save()
+        self.encolar.assert_called_once_with('perfil_img/b.jpg')
+
+    def test_sin_foto_no_encola(self):
+        TblCliente.objects.create(s_email='sinfoto@x.cl')
+        self.encolar.assert_not_called()
+
+
+class MesaClienteTests(CacheLimpioMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        cliente = TblCliente.objects.create(s_primernombrecliente='Ana', s_email='mesas@x.cl', b_activo=True)
+        session = self.client.session
+        session['cliente_id'] = cliente.id_cliente
+        session.save()
+
+    def test_renderiza_las_tarjetas_desde_el_cache(self):
+        antes = fragmentos.contadores().get('mesa_cliente', {'aciertos': 0, 'fallos': 0})
+        r = self.client.get('/reserfast/mesas/')
+        self.assertEqual(r.status_code, 200)
+        self.assertTemplateUsed(r, 'reserfast/clientes/sub_mesa.html')
+        for mesa in TblMesa.objects.filter(b_activo=True):
+            self.assertContains(r, f'?mesa={mesa.id_mesa}')
+
+        # La segunda vista sale del caché de fragmentos, una tarjeta por mesa.
+        self.client.get('/reserfast/mesas/')
+        despues = fragmentos.contadores()['mesa_cliente']
+        activas = TblMesa.objects.filter(b_activo=True).count()
+        self.assertEqual(despues['fallos'] - antes['fallos'], activas)
+        self.assertEqual(despues['aciertos'] - antes['aciertos'], activas)
+
+
+# Inicio común de las ventanas por IP (120 s) y por cuenta (150 s).
+AHORA = 600.0 * 1000
+
+
+@override_settings(LOGIN_THROTTLE_IP=(20, 10), LOGIN_THROTTLE_CUENTA=(5, 2))
+class ThrottleTests(CacheLimpioMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('reserfast_app.throttle.time.time', return_value=AHORA)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def intentos(self, n, ip, cuenta):
+        return [throttle.permitir(ip, cuenta) for _ in range(n)]
+
+    def test_bloqueo_por_cuenta_desde_varias_ips(self):
+        resultados = [throttle.permitir(f'10.0.0.{i}', 'Ana@x.cl ' if i % 2 else 'ana@x.cl') for i in range(6)]
+        self.assertEqual(resultados, [True] * 5 + [False])
+        self.assertTrue(throttle.permitir('10.0.0.9', 'otra@x.cl'))
+        self.assertEqual(throttle.contadores()['rechazados_cuenta'], 1)
+
+    def test_bloqueo_por_ip_con_varias_cuentas(self):
+        resultados = [throttle.permitir('10.0.0.1', f'c{i}@x.cl') for i in range(21)]
+        self.assertEqual(resultados, [True] * 20 + [False])
+        self.assertFalse(throttle.permitir('10.0.0.1', 'nueva@x.cl'))
+        self.assertTrue(throttle.permitir('10.0.0.2', 'nueva@x.cl'))
+        self.assertEqual(throttle.contadores()['rechazados_ip'], 2)
+
+    def test_la_ventana_anterior_pesa_lo_que_le_queda(self):
+        self.intentos(5, '10.0.0.1', 'ana@x.cl')
+        # A mitad de la ventana siguiente quedan 2.5 intentos de la anterior.
+        with mock.patch('reserfast_app.throttle.time.time', return_value=AHORA + 150 * 1.5):
+            self.assertEqual(self.intentos(3, '10.0.0.1', 'ana@x.cl'), [True, True, False])
+
+    def test_reiniciar_libera_la_cuenta(self):
+        self.assertEqual(self.intentos(6, '10.0.0.1', 'ana@x.cl'), [True] * 5 + [False])
+        throttle.reiniciar(' ANA@x.cl')
+        self.assertEqual(self.intentos(6, '10.0.0.1', 'ana@x.cl'), [True] * 5 + [False])
+
+    @override_settings(BCRYPT_ROUNDS=4)
+    def test_login_correcto_reinicia_la_cuenta(self):
+        hashed = bcrypt.hashpw(b'secreto1', bcrypt.gensalt(4)).decode()
+        TblCliente.objects.create(s_email='ana@x.cl', s_contrasena=hashed, b_activo=True)
+
+        def login(clave):
+            return self.client.post('/reserfast/login_clientes/', {'email': 'ana@x.cl', 'contrasena': clave})
+
+        for _ in range(4):
+            self.assertEqual(login('mala').status_code, 200)
+        self.assertEqual(login('secreto1').status_code, 302)
+        for _ in range(5):
+            self.assertEqual(login('mala').status_code, 200)
+        self.assertEqual(login('mala').status_code, 429)
+
+    def test_sin_cache_compartido_usa_contadores_locales(self):
+        with mock.patch.object(cache, 'set', side_effect=ConnectionError):
+            self.assertEqual(self.intentos(6, '10.0.0.1', 'ana@x.cl'), [True] * 5 + [False])
+            self.assertFalse(throttle._compartido)
+            self.assertEqual(throttle.contadores()['rechazados_cuenta'], 1)
+            throttle.reiniciar('ana@x.cl')
+            self.assertTrue(throttle.permitir('10.0.0.1', 'ana@x.cl'))
+
+    def test_falla_del_cache_a_mitad_de_camino(self):
+        self.intentos(2, '10.0.0.1', 'ana@x.cl')
+        self.assertTrue(throttle._compartido)
+        # El caché responde al sondeo pero deja de incrementar: se cuenta localmente.
+        with mock.patch.object(cache, 'incr', side_effect=ConnectionError):
+            self.assertEqual(self.intentos(6, '10.0.0.1', 'ana@x.cl'), [True] * 5 + [False])
+
+
+class ApiTests(CacheLimpioMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ana = TblCliente.objects.create(s_primernombrecliente='Ana', s_email='ana@x.cl', b_activo=True)
+        self.beto = TblCliente.objects.create(s_primernombrecliente='Beto', s_email='beto@x.cl', b_activo=True)
+        hoy = timezone.now().date()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reservas = {
+                cliente.pk: [
+                    TblReserva.objects.create(fk_id_cliente=cliente, d_fechainicio=hoy, i_totalreserva=n, b_activo=True)
+                    for n in range(3)
+                ]
+                for cliente in (self.ana, self.beto)
+            }
+
+    def entrar(self, clave, valor):
+        session = self.client.session
+        session[clave] = valor
+        session.save()
+
+    def ids(self, r):
+        self.assertEqual(r.status_code, 200, r.content)
+        return [fila['id'] for fila in r.json()['results']]
+
+    def claves_guardadas(self, url):
+        with mock.patch.object(cache, 'set', wraps=cache.set) as set_:
+            r = self.client.get(url)
+        return r, [c.args[0] for c in set_.call_args_list if c.args[0].startswith('reserfast:api:v1:')]
+
+    def test_sin_sesion_es_401(self):
+        self.assertEqual(self.client.get('/api/v1/menus/').status_code, 401)
+
+    def test_fields_desconocido_es_400(self):
+        self.entrar('cliente_id', self.ana.pk)
+        r = self.client.get('/api/v1/mesas/?fields=id,clave')
+        self.assertEqual(r.status_code, 400)
+        self.assertIn('clave', r.json()['fields'])
+        self.assertEqual(self.client.get('/api/v1/mesas/?fields=,').status_code, 400)
+
+        r = self.client.get('/api/v1/mesas/?fields=id,nombre')
+        self.assertEqual({tuple(fila) for fila in r.json()['results']}, {('id', 'nombre')})
+
+    def test_paginacion_por_cursor(self):
+        self.entrar('cliente_id', self.ana.pk)
+        esperados = sorted(TblMesa.objects.filter(b_activo=True).values_list('id_mesa', flat=True))
+        self.assertGreater(len(esperados), 2)
+
+        r = self.client.get('/api/v1/mesas/?limite=2')
+        vistos = self.ids(r)
+        self.assertIsNone(r.json()['previous'])
+        # Una mesa nueva entre páginas no repite ni salta filas ya vistas.
+        with self.captureOnCommitCallbacks(execute=True):
+            nueva = TblMesa.objects.create(s_nombremesa='Mesa Z', b_ocupado=0, b_activo=True)
+        siguiente = r.json()['next']
+        while siguiente:
+            r = self.client.get(siguiente)
+            vistos += self.ids(r)
+            self.assertLessEqual(len(r.json()['results']), 2)
+            siguiente = r.json()['next']
+        self.assertEqual(vistos, esperados + [nueva.id_mesa])
+
+    def test_reservas_solo_del_cliente_de_la_sesion(self):
+        self.entrar('cliente_id', self.ana.pk)
+        propias = sorted((r.id_reserva for r in self.reservas[self.ana.pk]), reverse=True)
+        self.assertEqual(self.ids(self.client.get('/api/v1/reservas/?fields=id')), propias)
+
+        self.client = self.client_class()
+        usuario = TblUsuario.objects.create(s_usuario='api_t', s_contrasenausuario='x', b_activo=True)
+        self.entrar('id_usuario', usuario.id_usuario)
+        self.assertEqual(self.client.get('/api/v1/reservas/').status_code, 403)
+        self.assertEqual(self.client.get('/api/v1/mesas/').status_code, 200)
+
+    def test_la_clave_cambia_con_la_version(self):
+        self.entrar('cliente_id', self.ana.pk)
+        url = '/api/v1/reservas/?fields=id'
+        r, [clave] = self.claves_guardadas(url)
+        antes = self.ids(r)
+
+        # Sin el bump (on_commit pendiente) la respuesta sigue saliendo del caché.
+        with self.captureOnCommitCallbacks() as callbacks:
+            nueva = TblReserva.objects.create(fk_id_cliente=self.ana, i_totalreserva=0, b_activo=True)
+        r, guardadas = self.claves_guardadas(url)
+        self.assertEqual((self.ids(r), guardadas), (antes, []))
+
+        for callback in callbacks:
+            callback()
+        r, [otra] = self.claves_guardadas(url)
+        self.assertNotEqual(otra, clave)
+        self.assertIn(str(reservas.version_cliente(self.ana.pk)), otra)
+        self.assertEqual(self.ids(r), [nueva.id_reserva] + antes)
+
+    @mock.patch.object(reservas, 'version_cliente', return_value=1)
+    def test_un_cliente_no_recibe_la_pagina_cacheada_de_otro(self, _):
+        # Misma URL y mismo contador de versión: la clave igual distingue al cliente.
+        url = '/api/v1/reservas/?fields=id,total'
+        self.entrar('cliente_id', self.ana.pk)
+        _, [clave_ana] = self.claves_guardadas(url)
+
+        self.client = self.client_class()
+        self.entrar('cliente_id', self.beto.pk)
+        r, [clave_beto] = self.claves_guardadas(url)
+        self.assertNotEqual(clave_beto, clave_ana)
+        self.assertEqual(
+            sorted(self.ids(r)), sorted(reserva.id_reserva for reserva in self.reservas[self.beto.pk])
+        )
+
+
+def imagen(formato, tamano=(20, 10)):
+    buffer = BytesIO()
+    Image.new('RGB', tamano, (200, 40, 40)).save(buffer, formato)
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_UPLOAD_MAX_BYTES=1024 * 1024, IMAGE_UPLOAD_MAX_PIXELS=40_000)
+class SubidaImagenTests(CacheLimpioMixin, TestCase):
+    """Subidas multipart reales a editar_perfil_cliente (ImagenUploadHandler)."""
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.temporales = os.path.join(media, '.uploads')
+        self.media = media
+
+        patcher = mock.patch.object(imagenes, 'encolar')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cliente = TblCliente.objects.create(
+            s_primernombrecliente='Ana', s_primerapellidocliente='Pérez', s_email='ana@x.cl', b_activo=True
+        )
+        session = self.client.session
+        session['cliente_id'] = self.cliente.id_cliente
+        session.save()
+
+    def subir(self, nombre, contenido, content_type):
+        r = self.client.post('/reserfast/editar_perfil/', {
+            's_primernombrecliente': 'Ana',
+            's_email': 'ana@x.cl',
+            's_foto_perfil': SimpleUploadedFile(nombre, contenido, content_type),
+        })
+        # Aceptada o no, no queda ningún temporal de la subida.
+        self.assertEqual(os.listdir(self.temporales) if os.path.isdir(self.temporales) else [], [])
+        return r
+
+    def assertRechazada(self, r, mensaje):
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(uploads.error(r.wsgi_request, 's_foto_perfil'), mensaje)
+        self.assertIn(mensaje, r.context['form'].errors['s_foto_perfil'])
+        self.cliente.refresh_from_db()
+        self.assertFalse(self.cliente.s_foto_perfil)
+
+    def assertGuardada(self, r, contenido, ext):
+        self.assertRedirects(r, '/reserfast/perfil/', fetch_redirect_response=False)
+        self.assertIsNone(uploads.error(r.wsgi_request, 's_foto_perfil'))
+        self.cliente.refresh_from_db()
+        nombre = f'perfil_img/{hashlib.sha256(contenido).hexdigest()}{ext}'
+        self.assertEqual(self.cliente.s_foto_perfil.name, nombre)
+        with open(os.path.join(self.media, nombre), 'rb') as f:
+            self.assertEqual(f.read(), contenido)
+
+    def test_png_valido(self):
+        contenido = imagen('PNG')
+        # La extensión sigue al contenido real, no al nombre enviado.
+        self.assertGuardada(self.subir('foto.jpg', contenido, 'image/jpeg'), contenido, '.png')
+
+    def test_jpeg_valido(self):
+        contenido = imagen('JPEG')
+        self.assertGuardada(self.subir('foto.jpg', contenido, 'image/jpeg'), contenido, '.jpg')
+
+    def test_tipo_falsificado(self):
+        r = self.subir('foto.png', b'<?php echo "hola"; ?>' * 10, 'image/png')
+        self.assertRechazada(r, 'Tipo de archivo no permitido. Use JPG, PNG, GIF o WebP.')
+
+    def test_demasiados_pixeles(self):
+        r = self.subir('grande.png', imagen('PNG', (300, 200)), 'image/png')
+        self.assertRechazada(r, 'La imagen tiene demasiados píxeles.')
+
+    def test_demasiados_bytes(self):
+        # Cabecera válida: se corta al superar el límite mientras se escribe el temporal.
+        contenido = imagen('PNG') + os.urandom(1024 * 1024)
+        self.assertRechazada(self.subir('pesada.png', contenido, 'image/png'), 'La imagen no puede ser mayor a 1MB.')
+        self.assertTrue(os.path.isdir(self.temporales))
+
+    def test_cabecera_truncada(self):
+        r = self.subir('cortada.png', imagen('PNG')[:20], 'image/png')
+        self.assertRechazada(r, 'El archivo no es una imagen válida.')
@@ -0,0 +1,159 @@
+"""Límite de intentos de login por IP y por cuenta.
+
+Cada intento fallido de login cuesta una verificación bcrypt completa, así que
+un script de credential stuffing puede ocupar todo el pool de `passwords`.
+`permitir()` se consulta antes de tocar la base de datos o bcrypt y rechaza el
+exceso con dos límites independientes:
+
+- por IP (`LOGIN_THROTTLE_IP`): frena a un origen que prueba muchas cuentas;
+- por cuenta (`LOGIN_THROTTLE_CUENTA`, email o usuario normalizado): frena
+  ataques distribuidos contra una misma cuenta.
+
+Cada ajuste es `(capacidad, intentos_por_minuto)`: se admiten `capacidad`
+intentos por ventana de `capacidad / intentos_por_minuto` minutos (el tiempo
+en que una cubeta vacía volvería a llenarse). Se usa una ventana deslizante
+aproximada: el contador de la ventana actual más la fracción que queda de la
+anterior.
+
+Los contadores viven en el caché compartido (`CACHES['default']`) y solo se
+modifican con `add` + `incr`, operaciones atómicas en Redis/Memcached: dos
+procesos que atienden intentos a la vez nunca leen el mismo saldo. Si el
+caché no guarda datos (DummyCache) o falla, se usa un diccionario local del
+proceso. `contadores()` devuelve los totales de intentos permitidos y
+rechazados para monitoreo.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+_PREFIX = 'reserfast:throttle:'
+_CONTADORES = ('permitidos', 'rechazados_ip', 'rechazados_cuenta')
+
+_lock = threading.Lock()
+_local = {}  # {base: {ventana: intentos}}
+_local_contadores = dict.fromkeys(_CONTADORES, 0)
+_compartido = None  # None = sin probar; True/False tras la primera consulta
+
+
+def _regla(nombre, defecto):
+    """(capacidad, segundos de la ventana)."""
+    capacidad, por_minuto = getattr(settings, nombre, defecto)
+    capacidad, por_minuto = float(capacidad), float(por_minuto)
+    return capacidad, (capacidad / por_minuto * 60.0) if por_minuto > 0 else None
+
+
+def _usar_compartido():
+    global _compartido
+    if _compartido is None:
+        try:
+            cache.set(_PREFIX + 'probe', 1, 60)
+            _compartido = cache.get(_PREFIX + 'probe') == 1
+        except Exception:
+            _compartido = False
+    return _compartido
+
+
+def _incrementar_local(base, ventana):
+    with _lock:
+        ventanas = _local.setdefault(base, {})
+        for n in [n for n in ventanas if n < ventana - 1]:
+            del ventanas[n]
+        ventanas[ventana] = ventanas.get(ventana, 0) + 1
+        return ventanas[ventana], ventanas.get(ventana - 1, 0)
+
+
+def _incrementar(base, ventana, segundos):
+    """Suma un intento a la ventana `ventana` de `base`; devuelve (actual, anterior)."""
+    if _usar_compartido():
+        key = f'{base}:{ventana}'
+        ttl = int(2 * segundos) + 1
+        try:
+            cache.add(key, 0, ttl)
+            try:
+                actual = cache.incr(key)
+            except ValueError:
+                # Expiró entre add e incr.
+                cache.add(key, 0, ttl)
+                actual = cache.incr(key)
+            anterior = cache.get(f'{base}:{ventana - 1}') or 0
+            return actual, anterior
+        except Exception:
+            pass
+    return _incrementar_local(base, ventana)
+
+
+def _tomar(base, capacidad, segundos, ahora):
+    """Registra un intento contra `base`; False si supera el límite."""
+    if segundos is None:
+        return True
+    ventana, resto = divmod(ahora, segundos)
+    actual, anterior = _incrementar(base, int(ventana), segundos)
+    return anterior * (1 - resto / segundos) + actual <= capacidad
+
+
+def _contar(nombre):
+    with _lock:
+        _local_contadores[nombre] += 1
+    if _usar_compartido():
+        key = _PREFIX + 'contador:' + nombre
+        try:
+            cache.add(key, 0, None)
+            cache.incr(key)
+        except Exception:
+            pass
+
+
+def _cuenta(identificador):
+    return (identificador or '').strip().lower()
+
+
+def permitir(ip, identificador):
+    """True si el intento de login desde `ip` para `identificador` puede seguir.
+
+    Siempre registra el intento (también los rechazados), así que debe
+    llamarse una vez por intento y antes de cualquier trabajo costoso.
+    """
+    ahora = time.time()
+    capacidad, segundos = _regla('LOGIN_THROTTLE_IP', (20, 10))
+    if not _tomar(f'{_PREFIX}ip:{ip or "-"}', capacidad, segundos, ahora):
+        motivo = 'rechazados_ip'
+    else:
+        capacidad, segundos = _regla('LOGIN_THROTTLE_CUENTA', (5, 2))
+        cuenta = _cuenta(identificador)
+        if cuenta and not _tomar(f'{_PREFIX}cuenta:{cuenta}', capacidad, segundos, ahora):
+            motivo = 'rechazados_cuenta'
+        else:
+            motivo = 'permitidos'
+    _contar(motivo)
+    return motivo == 'permitidos'
+
+
+def reiniciar(identificador):
+    """Borra los intentos de una cuenta tras un login correcto."""
+    cuenta = _cuenta(identificador)
+    if not cuenta:
+        return
+    base = f'{_PREFIX}cuenta:{cuenta}'
+    with _lock:
+        _local.pop(base, None)
+    _, segundos = _regla('LOGIN_THROTTLE_CUENTA', (5, 2))
+    if segundos and _usar_compartido():
+        ventana = int(time.time() // segundos)
+        try:
+            cache.delete_many([f'{base}:{ventana}', f'{base}:{ventana - 1}'])
+        except Exception:
+            pass
+
+
+def contadores():
+    """Totales de intentos permitidos/rechazados (compartidos si hay caché)."""
+    if _usar_compartido():
+        try:
+            datos = cache.get_many([_PREFIX + 'contador:' + n for n in _CONTADORES])
+            return {n: datos.get(_PREFIX + 'contador:' + n, 0) for n in _CONTADORES}
+        except Exception:
+            pass
+    with _lock:
+        return dict(_local_contadores)
@@ -0,0 +1,179 @@
+"""Validación en streaming de las fotos subidas (menús y perfiles).
+
+`ImagenUploadHandler` (primero en `FILE_UPLOAD_HANDLERS`) atiende solo los
+campos de `IMAGE_UPLOAD_FIELDS`. Con los primeros bytes de cada archivo
+comprueba la firma (JPEG, PNG, GIF o WebP, sin fiarse del `content_type` que
+envía el navegador) y las dimensiones leyendo la cabecera con Pillow; si la
+imagen no es válida, supera `IMAGE_UPLOAD_MAX_BYTES` o
+`IMAGE_UPLOAD_MAX_PIXELS`, corta la subida de ese archivo sin seguir
+guardándolo (`SkipFile`) y deja el motivo para la vista (`error()`).
+
+Los datos se escriben a medida que llegan en un temporal dentro de
+`MEDIA_ROOT` (mismo sistema de archivos que el destino), así que al guardar el
+modelo el storage lo mueve con un rename en vez de copiarlo, y nunca se
+mantiene el archivo completo en memoria. De paso se calcula el sha256 que usa
+`storage.ContenidoStorage` para nombrar el archivo sin volver a leerlo.
+"""
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+
+# Firma -> (content_type, extensión)
+_FIRMAS = (
+    (b'\xff\xd8\xff', 'image/jpeg', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png', '.png'),
+    (b'GIF87a', 'image/gif', '.gif'),
+    (b'GIF89a', 'image/gif', '.gif'),
+)
+
+# Bytes de cabecera que se acumulan como máximo para leer las dimensiones
+# (un JPEG con EXIF grande puede tener el marcador SOF más allá del primer chunk).
+_MAX_CABECERA = 256 * 1024
+
+
+def _max_bytes():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_BYTES', 5 * 1024 * 1024)
+
+
+def _campos():
+    return getattr(settings, 'IMAGE_UPLOAD_FIELDS', ('s_imagen', 's_foto_perfil'))
+
+
+def detectar_tipo(cabecera):
+    """(content_type, extensión) según los bytes mágicos, o None."""
+    for firma, content_type, ext in _FIRMAS:
+        if cabecera.startswith(firma):
+            return content_type, ext
+    if len(cabecera) >= 12 and cabecera[:4] == b'RIFF' and cabecera[8:12] == b'WEBP':
+        return 'image/webp', '.webp'
+    return None
+
+
+def _dimensiones(cabecera):
+    """(ancho, alto) leyendo solo la cabecera, o None si aún faltan bytes."""
+    from PIL import Image
+
+    try:
+        with Image.open(BytesIO(cabecera)) as img:
+            return img.size
+    except Exception:
+        return None
+
+
+def _directorio_temporal():
+    # Dentro de MEDIA_ROOT el paso al destino final es un rename, no una copia.
+    if isinstance(default_storage, FileSystemStorage):
+        ruta = os.path.join(default_storage.location, '.uploads')
+        os.makedirs(ruta, exist_ok=True)
+        return ruta
+    return settings.FILE_UPLOAD_TEMP_DIR
+
+
+class ImagenSubida(TemporaryUploadedFile):
+    """TemporaryUploadedFile creado junto al storage de destino."""
+    sha256 = None
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(suffix='.upload' + ext, dir=_directorio_temporal())
+        super(TemporaryUploadedFile, self).__init__(file, name, content_type, size, charset, content_type_extra)
+
+
+def error(request, campo):
+    """Motivo por el que se descartó la imagen del `campo`, o None."""
+    return getattr(request, 'upload_errors', {}).get(campo)
+
+
+class ImagenUploadHandler(FileUploadHandler):
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        self.activo = field_name in _campos()
+        self.validada = False
+        if not self.activo:
+            return
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.cabecera = b''
+        # Sin `file` hasta validar: el parser cierra `handler.file` al descartar.
+        self.__dict__.pop('file', None)
+        if content_length and content_length > _max_bytes():
+            self._rechazar(self._mensaje_tamano())
+        raise StopFutureHandlers()
+
+    def _mensaje_tamano(self):
+        return f'La imagen no puede ser mayor a {_max_bytes() // (1024 * 1024)}MB.'
+
+    def _rechazar(self, mensaje, final=False):
+        if self.request is not None:
+            if not hasattr(self.request, 'upload_errors'):
+                self.request.upload_errors = {}
+            self.request.upload_errors[self.field_name] = mensaje
+        self.activo = False
+        if not final:
+            # El parser descarta el resto del archivo sin guardarlo.
+            raise SkipFile()
+
+    def _validar_cabecera(self, final=False):
+        tipo = detectar_tipo(self.cabecera)
+        if tipo is None:
+            if len(self.cabecera) >= 12 or final:
+                self._rechazar('Tipo de archivo no permitido. Use JPG, PNG, GIF o WebP.', final)
+            return False
+        dimensiones = _dimensiones(self.cabecera)
+        if dimensiones is None:
+            if len(self.cabecera) >= _MAX_CABECERA or final:
+                self._rechazar('El archivo no es una imagen válida.', final)
+            return False
+        ancho, alto = dimensiones
+        if ancho * alto > getattr(settings, 'IMAGE_UPLOAD_MAX_PIXELS', 40_000_000):
+            self._rechazar('La imagen tiene demasiados píxeles.', final)
+            return False
+
+        self.content_type, ext = tipo
+        base, ext_actual = os.path.splitext(self.file_name)
+        if ext_actual.lower() not in (ext, '.jpeg' if ext == '.jpg' else ext):
+            # La extensión sigue al contenido real (la usan las derivadas).
+            self.file_name = base + ext
+        self.file = ImagenSubida(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.file.write(self.cabecera)
+        self.hash = hashlib.sha256(self.cabecera)
+        self.cabecera = b''
+        self.validada = True
+        return True
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.activo:
+            return raw_data
+        if start + len(raw_data) > _max_bytes():
+            self._rechazar(self._mensaje_tamano())
+        if self.validada:
+            self.file.write(raw_data)
+            self.hash.update(raw_data)
+        else:
+            self.cabecera += raw_data
+            self._validar_cabecera()
+        return None
+
+    def file_complete(self, file_size):
+        if not self.activo:
+            return None
+        if not self.validada and not self._validar_cabecera(final=True):
+            # Devolver None dejaría el archivo a los handlers siguientes, que no
+            # lo recibieron; se entrega uno vacío y la vista informa `error()`.
+            return SimpleUploadedFile(self.file_name, b'', 'application/octet-stream')
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.hash.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        if getattr(self, 'validada', False):
+            try:
+                self.file.close()
+            except FileNotFoundError:
+                pass
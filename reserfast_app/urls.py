@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from . import views
 from . import admin_views
@@ -5,12 +6,15 @@ from django.contrib.auth import views as auth_views
 
 app_name = 'reserfast'
 
+# Bajo ASGI el login espera bcrypt sin ocupar un worker (ver passwords.py).
+_ASGI = settings.SERVIDOR == 'asgi'
+
 urlpatterns = [
     path('', views.index, name='index'),
     path('index_admin/', views.index_admin, name='index_admin'),
     
-    path('login_admin/', views.login_admin, name='login_admin'),
-    path('login_clientes/', views.login_clientes, name='login_clientes'),
+    path('login_admin/', views.alogin_admin if _ASGI else views.login_admin, name='login_admin'),
+    path('login_clientes/', views.alogin_clientes if _ASGI else views.login_clientes, name='login_clientes'),
     path('logout_empleado/', views.logout_empleado, name='logout_empleado'),
     path('logout_cliente/', views.logout_cliente, name='logout_cliente'),
     path('panel_garzon/', views.panel_garzon, name='panel_garzon'),
@@ -45,9 +49,12 @@ urlpatterns = [
     path('editar_reserva/<int:reserva_id>/', views.editar_reserva, name='editar_reserva'),
     path('eliminar_reserva/<int:reserva_id>/', views.eliminar_reserva, name='eliminar_reserva'),
     path('verificar_disponibilidad_mesa/<int:mesa_id>/', views.verificar_disponibilidad_mesa, name='verificar_disponibilidad_mesa'),
+    path('disponibilidad_mesas/', views.disponibilidad_mesas, name='disponibilidad_mesas'),
     path('detalle_reserva_ajax/', views.detalle_reserva_ajax, name='detalle_reserva_ajax'),
     path('ajax/toggle_empleado_servicio/', views.ajax_toggle_empleado_servicio, name='ajax_toggle_empleado_servicio'),
     # AJAX admin endpoints used by index_admin
+    path('ajax/admin/estadisticas/', views.ajax_admin_estadisticas, name='ajax_admin_estadisticas'),
+    path('ajax/admin/tab/<str:tab>/', views.ajax_admin_tab, name='ajax_admin_tab'),
     path('ajax/crear_garzon/', views.ajax_crear_garzon, name='ajax_crear_garzon'),
     path('ajax/editar_garzon/<int:id_usuario>/', views.ajax_editar_garzon, name='ajax_editar_garzon'),
     path('ajax/eliminar_garzon/<int:id_usuario>/', views.ajax_eliminar_garzon, name='ajax_eliminar_garzon'),
@@ -0,0 +1,52 @@
+"""Contadores de versión compartidos entre procesos.
+
+Los cachés en memoria del proceso (principales, catálogo, disponibilidad...)
+guardan junto a cada entrada la versión con la que se construyeron. Cada
+escritura incrementa la versión en el caché compartido (`CACHES['default']`),
+por lo que todos los procesos detectan el cambio en su siguiente lectura
+(`checks.py` exige que ese caché sea compartido si hay varios procesos).
+`modificado()` devuelve además el momento del último incremento (para
+cabeceras Last-Modified).
+"""
+import time
+
+from django.core.cache import cache
+
+_PREFIX = 'reserfast:version:'
+
+
+def _seed():
+    # Semilla basada en el reloj: si el contador se pierde (reinicio del
+    # caché, eviction) nunca vuelve a un valor que un proceso tenga guardado.
+    return time.time_ns() // 1000
+
+
+def current(name):
+    """Versión actual de `name`; la inicializa si aún no existe."""
+    key = _PREFIX + name
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _seed(), timeout=None)
+        version = cache.get(key)
+        if version is None:
+            # Caché sin persistencia (DummyCache): una versión única por
+            # lectura desactiva en la práctica los cachés dependientes.
+            return _seed()
+    return version
+
+
+def bump(name):
+    """Incrementa la versión de `name` y devuelve el nuevo valor."""
+    key = _PREFIX + name
+    cache.set(key + ':ts', time.time(), timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _seed()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def modificado(name):
+    """Epoch del último `bump(name)` o None si no se registró (p. ej. tras reiniciar el caché)."""
+    return cache.get(_PREFIX + name + ':ts')
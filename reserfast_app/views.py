@@ -5,11 +5,15 @@ from django.views.decorators.http import require_POST
 from django.db import transaction
 from django.conf import settings
 from django.utils import timezone
+from django.template.loader import render_to_string
+from asgiref.sync import sync_to_async
 from .models import *
 from .forms import *
 from .decorators import cliente_login_required, usuario_login_required, perfil_required, ajax_login_required
-import bcrypt
-import sqlite3
+from .identity import get_cliente, get_usuario, invalidate_principal
+from .reservas import hidratar_reservas
+from .paginacion import pagina_keyset
+from . import catalogo, condicional, dashboard, disponibilidad, fragmentos, passwords, perfiles, servicio, throttle, uploads
 import logging
 import json
 
@@ -17,43 +21,17 @@ logger = logging.getLogger(__name__)
 
 # ===== Helpers =====
 def _normalize(s: str) -> str:
-    try:
-        import unicodedata
-        return ''.join(c for c in unicodedata.normalize('NFKD', s or '') if not unicodedata.combining(c)).lower().strip()
-    except Exception:
-        return (s or '').lower().strip()
+    return normalizar(s)
 
 def resolve_perfil(alias_key: str):
     """Resolve TblPerfil by friendly alias like 'admin'|'garzon'|'cocinero'.
-    Tries multiple names and accent variants; falls back to existing users' perfiles.
+    Uses the memoized alias map in `perfiles` (no queries in steady state).
     Raises TblPerfil.DoesNotExist if not found.
     """
-    key = _normalize(alias_key)
-    alias_map = {
-        'admin': ['administrador', 'administradora', 'admin'],
-        'garzon': ['garzon', 'garzón', 'encargado garzones', 'jefe garzon', 'jefe garzón', 'mesero', 'mozo'],
-        'cocinero': ['cocinero', 'chef', 'cocina', 'jefe cocina'],
-    }
-    candidates = alias_map.get(key, [alias_key])
-    for a in candidates:
-        obj = TblPerfil.objects.filter(s_nombreperfil__iexact=a).first()
-        if obj:
-            return obj
-    for a in candidates:
-        obj = TblPerfil.objects.filter(s_nombreperfil__icontains=a).first()
-        if obj:
-            return obj
-    for a in candidates:
-        u = TblUsuario.objects.filter(fk_id_perfil__s_nombreperfil__icontains=a).select_related('fk_id_perfil').first()
-        if u and u.fk_id_perfil:
-            return u.fk_id_perfil
-    try:
-        for p in TblPerfil.objects.all():
-            if _normalize(p.s_nombreperfil) in [_normalize(a) for a in candidates]:
-                return p
-    except Exception:
-        pass
-    raise TblPerfil.DoesNotExist(f'Perfil no encontrado para alias: {alias_key}')
+    perfil = perfiles.perfil(alias_key)
+    if perfil is None:
+        raise TblPerfil.DoesNotExist(f'Perfil no encontrado para alias: {alias_key}')
+    return perfil
 
 def index(request):
     """Página de inicio pública; muestra si hay una sesión activa (cliente o empleado)."""
@@ -67,9 +45,9 @@ def index(request):
     cliente_id = request.session.get('cliente_id')
     if cliente_id:
         try:
-            cliente = TblCliente.objects.get(id_cliente=cliente_id, b_activo=True)
-            session_type = 'cliente'
+            cliente = get_cliente(request)
             nombre = (cliente.s_primernombrecliente or '').strip() or 'Cliente'
+            session_type = 'cliente'
             perfil = 'cliente'
             panel_url = 'reserfast:index_cliente'
             logout_url = 'reserfast:logout_cliente'
@@ -80,7 +58,7 @@ def index(request):
     if session_type == 'none' and request.session.get('id_usuario'):
         perfil = (request.session.get('perfil_usuario') or '').strip().lower() or 'admin'
         try:
-            usuario = TblUsuario.objects.get(id_usuario=request.session.get('id_usuario'), b_activo=True)
+            usuario = get_usuario(request)
             nombre = (usuario.s_nombreusuario or usuario.s_usuario or '').strip() or 'Usuario'
         except Exception:
             nombre = 'Usuario'
@@ -108,94 +86,12 @@ def index_admin(request):
         messages.error(request, 'No tienes permisos para acceder a esta pgina.')
         return redirect('reserfast:index')
     
-    total_clientes = TblCliente.objects.filter(b_activo=True).count()
-    total_garzones = TblUsuario.objects.filter(fk_id_perfil__s_nombreperfil__icontains='garz', b_activo=True).count()
-    total_cocineros = TblUsuario.objects.filter(fk_id_perfil__s_nombreperfil__icontains='cocin', b_activo=True).count()
-    total_mesas = TblMesa.objects.filter(b_activo=True).count()
-    total_menus = TblMenu.objects.filter(b_activo=True).count()
-    total_reservas = TblReserva.objects.filter(b_activo=True).count() if 'TblReserva' in globals() else 0
-
-    garzones = TblUsuario.objects.filter(fk_id_perfil__s_nombreperfil__icontains='garz').order_by('s_nombreusuario')
-    cocineros = TblUsuario.objects.filter(fk_id_perfil__s_nombreperfil__icontains='cocin').order_by('s_nombreusuario')
-    mesas = TblMesa.objects.all().order_by('s_nombremesa')
-    menus = TblMenu.objects.all().order_by('s_titulomenu')
-    reservas = TblReserva.objects.all().order_by('-d_fechainicio') if 'TblReserva' in globals() else []
-    usuarios_all = TblUsuario.objects.all().select_related('fk_id_perfil').order_by('s_nombreusuario')
-
-    usuario = None
-    try:
-        usuario = TblUsuario.objects.get(id_usuario=request.session.get('id_usuario'))
-    except Exception:
-        pass
-    fecha = timezone.now()
-
-    ultimos_clientes = TblCliente.objects.filter(b_activo=True).order_by('-id_cliente')[:5]
-    ultimos_menus = TblMenu.objects.filter(b_activo=True).order_by('-id_menu')[:5]
-    perfiles = list(TblPerfil.objects.all())
-
-    # Cargar estado de servicio desde tabla auxiliar
-    service_status = {}
-    try:
-        db_path = settings.DATABASES['default']['NAME']
-        with sqlite3.connect(db_path) as conn:
-            cur = conn.cursor()
-            cur.execute('''
-                CREATE TABLE IF NOT EXISTS tbl_estado_empleado (
-                    id_usuario INTEGER PRIMARY KEY,
-                    rol TEXT NOT NULL,
-                    en_servicio INTEGER NOT NULL DEFAULT 0,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            cur.execute("SELECT id_usuario, en_servicio FROM tbl_estado_empleado")
-            for uid, es in cur.fetchall():
-                service_status[int(uid)] = bool(es)
-    except Exception as e:
-        logger.error(f"Error leyendo estado de servicio en admin: {e}")
-
-    # Anotar estado en objetos para facilitar en template
-    for g in garzones:
-        try:
-            setattr(g, 'en_servicio', service_status.get(g.id_usuario, False))
-        except Exception:
-            setattr(g, 'en_servicio', False)
-    for c in cocineros:
-        try:
-            setattr(c, 'en_servicio', service_status.get(c.id_usuario, False))
-        except Exception:
-            setattr(c, 'en_servicio', False)
-
-    # Contadores de "en servicio"
-    try:
-        garzones_en_servicio = sum(1 for g in garzones if getattr(g, 'en_servicio', False))
-    except Exception:
-        garzones_en_servicio = 0
-    try:
-        cocineros_en_servicio = sum(1 for c in cocineros if getattr(c, 'en_servicio', False))
-    except Exception:
-        cocineros_en_servicio = 0
-
+    # Las pestañas (garzones, cocineros, mesas, menús, reservas, usuarios,
+    # reportes) se cargan bajo demanda desde `ajax_admin_tab`.
     context = {
-        'total_clientes': total_clientes,
-        'total_garzones': total_garzones,
-        'total_cocineros': total_cocineros,
-        'total_mesas': total_mesas,
-        'total_menus': total_menus,
-        'total_reservas': total_reservas,
-        'garzones': garzones,
-        'cocineros': cocineros,
-        'mesas': mesas,
-        'menus': menus,
-        'reservas': reservas,
-        'usuario': usuario,
-        'fecha': fecha,
-        'ultimos_clientes': ultimos_clientes,
-        'ultimos_menus': ultimos_menus,
-    'service_status': service_status,
-    'usuarios_all': usuarios_all,
-    'perfiles': perfiles,
-    'garzones_en_servicio': garzones_en_servicio,
-    'cocineros_en_servicio': cocineros_en_servicio,
+        'usuario': get_usuario(request),
+        'fecha': timezone.now(),
+        'perfiles': list(TblPerfil.objects.all()),
     }
 
     return render(request, 'reserfast/admin/index_admin.html', context)
@@ -207,29 +103,11 @@ def panel_garzon(request):
         return redirect('reserfast:index')
     
     user_id = request.session.get('id_usuario')
-    usuario = None
-    try:
-        usuario = TblUsuario.objects.get(id_usuario=user_id)
-    except Exception:
-        usuario = None
+    usuario = get_usuario(request)
     
-    db_path = settings.DATABASES['default']['NAME']
     en_servicio = False
     try:
-        with sqlite3.connect(db_path) as conn:
-            cur = conn.cursor()
-            cur.execute('''
-                CREATE TABLE IF NOT EXISTS tbl_estado_empleado (
-                    id_usuario INTEGER PRIMARY KEY,
-                    rol TEXT NOT NULL,
-                    en_servicio INTEGER NOT NULL DEFAULT 0,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            cur.execute("SELECT en_servicio FROM tbl_estado_empleado WHERE id_usuario = ?", (user_id,))
-            row = cur.fetchone()
-            if row:
-                en_servicio = bool(row[0])
+        en_servicio = servicio.en_servicio(user_id)
     except Exception as e:
         logger.error(f"Error al obtener estado de servicio: {e}")
     
@@ -237,16 +115,9 @@ def panel_garzon(request):
     hoy = timezone.now().date()
     reservas_hoy = []
     try:
-        reservas = TblReserva.objects.filter(b_activo=True, d_fechainicio=hoy).select_related('fk_id_cliente')
-        for r in reservas:
-            mesa_rm = TblReservamesa.objects.filter(fk_id_reserva=r, b_activo=True).select_related('fk_id_mesa').first()
-            menus_rm = TblReservamenu.objects.filter(fk_id_reserva=r, b_activo=True).select_related('fk_id_menu')
-            reservas_hoy.append({
-                'reserva': r,
-                'cliente': r.fk_id_cliente,
-                'mesa': mesa_rm.fk_id_mesa if (mesa_rm and mesa_rm.fk_id_mesa) else None,
-                'menus': [rm.fk_id_menu for rm in menus_rm if rm.fk_id_menu],
-            })
+        reservas_hoy = hidratar_reservas(
+            TblReserva.objects.filter(b_activo=True, d_fechainicio=hoy), hoy=hoy
+        )
     except Exception as e:
         logger.error(f"Error construyendo reservas_hoy: {e}")
     
@@ -266,41 +137,20 @@ def gestion_cocina(request):
         messages.error(request, 'No tienes permisos para acceder a esta pgina.')
         return redirect('reserfast:index')
     
-    usuario = None
-    try:
-        usuario = TblUsuario.objects.get(id_usuario=request.session.get('id_usuario'))
-    except Exception:
-        pass
+    usuario = get_usuario(request)
     fecha = timezone.now()
 
-    menus_activos = TblMenu.objects.filter(b_activo=True).order_by('s_tipomenu', 's_titulomenu')
-    menus_inactivos = TblMenu.objects.filter(b_activo=False).order_by('s_tipomenu', 's_titulomenu')
-    total_menus = menus_activos.count()
-    total_inactivos = menus_inactivos.count()
-
-    categorias = {}
-    for m in TblMenu.objects.all().order_by('s_tipomenu', 's_titulomenu'):
-        cat = m.s_tipomenu or 'Sin tipo'
-        categorias.setdefault(cat, []).append(m)
+    cat = catalogo.actual()
+    menus_activos = cat.menus_activos
+    menus_inactivos = cat.menus_inactivos
+    total_menus = len(menus_activos)
+    total_inactivos = len(menus_inactivos)
+    categorias = cat.menus_por_categoria
 
-    # Estado de servicio del cocinero (reutilizar tabla auxiliar)
+    # Estado de servicio del cocinero
     en_servicio = False
     try:
-        db_path = settings.DATABASES['default']['NAME']
-        with sqlite3.connect(db_path) as conn:
-            cur = conn.cursor()
-            cur.execute('''
-                CREATE TABLE IF NOT EXISTS tbl_estado_empleado (
-                    id_usuario INTEGER PRIMARY KEY,
-                    rol TEXT NOT NULL,
-                    en_servicio INTEGER NOT NULL DEFAULT 0,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            cur.execute("SELECT en_servicio FROM tbl_estado_empleado WHERE id_usuario = ?", (request.session.get('id_usuario'),))
-            row = cur.fetchone()
-            if row:
-                en_servicio = bool(row[0])
+        en_servicio = servicio.en_servicio(request.session.get('id_usuario'))
     except Exception as e:
         logger.error(f"Error leyendo estado cocinero: {e}")
 
@@ -336,8 +186,64 @@ def toggle_menu_cocina(request, menu_id):
     
     return redirect('reserfast:gestion_cocina')
 
+def _guardar_hash(kind, pk, nuevo):
+    if kind == 'usuario':
+        TblUsuario.objects.filter(id_usuario=pk).update(s_contrasenausuario=nuevo)
+    else:
+        TblCliente.objects.filter(id_cliente=pk).update(s_contrasena=nuevo)
+    # update() no emite señales: invalidar el principal cacheado.
+    invalidate_principal(kind, pk)
+
+def _rehash_password(kind, pk, password):
+    """Migra el hash de `kind` ('usuario' | 'cliente') al costo BCRYPT_ROUNDS actual.
+
+    Se llama tras un login correcto; si falla, el login sigue igual.
+    """
+    try:
+        _guardar_hash(kind, pk, passwords.hash_password(password))
+    except Exception as e:
+        logger.error(f"Error al actualizar hash de contraseña ({kind} {pk}): {e}")
+
+async def _arehash_password(kind, pk, password):
+    """`_rehash_password` para las vistas asíncronas: bcrypt no bloquea el event loop."""
+    try:
+        nuevo = await passwords.ahash_password(password)
+        await sync_to_async(_guardar_hash)(kind, pk, nuevo)
+    except Exception as e:
+        logger.error(f"Error al actualizar hash de contraseña ({kind} {pk}): {e}")
+
+def _iniciar_sesion_empleado(request, usuario_obj):
+    request.session['id_usuario'] = usuario_obj.id_usuario
+    raw_perfil = (usuario_obj.fk_id_perfil.s_nombreperfil if usuario_obj.fk_id_perfil else 'admin') or 'admin'
+    perfil_norm = raw_perfil.strip().lower()
+    mapping = {
+        'administrador': 'admin',
+        'admin': 'admin',
+        'garzon': 'garzon',
+        'garzón': 'garzon',
+        'cocinero': 'cocinero',
+    }
+    request.session['perfil_usuario'] = mapping.get(perfil_norm, perfil_norm)
+    
+    messages.success(request, f'Bienvenido, {usuario_obj.s_nombreusuario}!')
+    
+    perfil = request.session.get('perfil_usuario')
+    if perfil == 'admin':
+        return redirect('reserfast:index_admin')
+    elif perfil == 'cocinero':
+        return redirect('reserfast:gestion_cocina')
+    elif perfil == 'garzon':
+        return redirect('reserfast:panel_garzon')
+    else:
+        return redirect('reserfast:index')
+
 def login_admin(request):
-    """Vista de login para administradores y empleados."""
+    """Vista de login para administradores y empleados.
+
+    La verificación bcrypt corre en el pool acotado de `passwords`: el hilo
+    del request espera su turno, pero no más de PASSWORD_HASHER_WORKERS
+    hashes compiten por CPU a la vez. Bajo ASGI se enruta `alogin_admin`.
+    """
     if request.method == 'POST':
         usuario = request.POST.get('usuario', '').strip()
         password = request.POST.get('contrasena', '').strip()
@@ -346,71 +252,137 @@ def login_admin(request):
             messages.error(request, 'Usuario y contraseña son obligatorios.')
             return render(request, 'reserfast/admin/login_admin.html')
         
+        if not throttle.permitir(request.META.get('REMOTE_ADDR'), usuario):
+            messages.error(request, 'Demasiados intentos. Espera un momento e inténtalo de nuevo.')
+            return render(request, 'reserfast/admin/login_admin.html', status=429)
+        
         try:
-            usuario_obj = TblUsuario.objects.get(s_usuario=usuario, b_activo=True)
+            usuario_obj = TblUsuario.objects.select_related('fk_id_perfil').get(s_usuario=usuario, b_activo=True)
             
-            if bcrypt.checkpw(password.encode('utf-8'), usuario_obj.s_contrasenausuario.encode('utf-8')):
-                request.session['id_usuario'] = usuario_obj.id_usuario
-                raw_perfil = (usuario_obj.fk_id_perfil.s_nombreperfil if usuario_obj.fk_id_perfil else 'admin') or 'admin'
-                perfil_norm = raw_perfil.strip().lower()
-                mapping = {
-                    'administrador': 'admin',
-                    'admin': 'admin',
-                    'garzon': 'garzon',
-                    'garz�n': 'garzon',
-                    'cocinero': 'cocinero',
-                }
-                request.session['perfil_usuario'] = mapping.get(perfil_norm, perfil_norm)
-                
-                messages.success(request, f'Bienvenido, {usuario_obj.s_nombreusuario}!')
-                
-                perfil = request.session.get('perfil_usuario')
-                if perfil == 'admin':
-                    return redirect('reserfast:index_admin')
-                elif perfil == 'cocinero':
-                    return redirect('reserfast:gestion_cocina')
-                elif perfil == 'garzon':
-                    return redirect('reserfast:panel_garzon')
-                else:
-                    return redirect('reserfast:index')
+            if passwords.check_password(password, usuario_obj.s_contrasenausuario):
+                if passwords.needs_rehash(usuario_obj.s_contrasenausuario):
+                    _rehash_password('usuario', usuario_obj.id_usuario, password)
+                throttle.reiniciar(usuario)
+                return _iniciar_sesion_empleado(request, usuario_obj)
             else:
-                messages.error(request, 'Usuario o contrasea incorrectos.')
+                messages.error(request, 'Usuario o contraseña incorrectos.')
         except TblUsuario.DoesNotExist:
-            messages.error(request, 'Usuario o contrasea incorrectos.')
+            messages.error(request, 'Usuario o contraseña incorrectos.')
         except Exception as e:
             logger.error(f"Error en login_admin: {e}")
             messages.error(request, 'Error interno del servidor.')
     
     return render(request, 'reserfast/admin/login_admin.html')
 
+async def alogin_admin(request):
+    """`login_admin` para despliegues ASGI.
+
+    bcrypt corre en el pool de `passwords` sin ocupar el event loop; la
+    sesión, los mensajes y el render van por sync_to_async.
+    """
+    if request.method == 'POST':
+        usuario = request.POST.get('usuario', '').strip()
+        password = request.POST.get('contrasena', '').strip()
+        
+        if not usuario or not password:
+            messages.error(request, 'Usuario y contraseña son obligatorios.')
+            return await sync_to_async(render)(request, 'reserfast/admin/login_admin.html')
+        
+        if not await sync_to_async(throttle.permitir)(request.META.get('REMOTE_ADDR'), usuario):
+            messages.error(request, 'Demasiados intentos. Espera un momento e inténtalo de nuevo.')
+            return await sync_to_async(render)(request, 'reserfast/admin/login_admin.html', status=429)
+        
+        try:
+            usuario_obj = await TblUsuario.objects.select_related('fk_id_perfil').aget(s_usuario=usuario, b_activo=True)
+            
+            if await passwords.acheck_password(password, usuario_obj.s_contrasenausuario):
+                if passwords.needs_rehash(usuario_obj.s_contrasenausuario):
+                    await _arehash_password('usuario', usuario_obj.id_usuario, password)
+                await sync_to_async(throttle.reiniciar)(usuario)
+                return await sync_to_async(_iniciar_sesion_empleado)(request, usuario_obj)
+            else:
+                messages.error(request, 'Usuario o contraseña incorrectos.')
+        except TblUsuario.DoesNotExist:
+            messages.error(request, 'Usuario o contraseña incorrectos.')
+        except Exception as e:
+            logger.error(f"Error en alogin_admin: {e}")
+            messages.error(request, 'Error interno del servidor.')
+    
+    return await sync_to_async(render)(request, 'reserfast/admin/login_admin.html')
+
+def _iniciar_sesion_cliente(request, cliente):
+    request.session['cliente_id'] = cliente.id_cliente
+    
+    messages.success(request, f'Bienvenido, {cliente.s_primernombrecliente}!')
+    return redirect('reserfast:index_cliente')
+
 def login_clientes(request):
-    """Vista de login para clientes."""
+    """Vista de login para clientes (bcrypt en el pool, ver `login_admin`).
+
+    Bajo ASGI se enruta `alogin_clientes`.
+    """
     if request.method == 'POST':
         email = request.POST.get('email', '').strip()
         password = request.POST.get('contrasena', '').strip()
         
         if not email or not password:
-            messages.error(request, 'Email y contrasea son obligatorios.')
+            messages.error(request, 'Email y contraseña son obligatorios.')
             return render(request, 'reserfast/clientes/login_clientes.html')
         
+        if not throttle.permitir(request.META.get('REMOTE_ADDR'), email):
+            messages.error(request, 'Demasiados intentos. Espera un momento e inténtalo de nuevo.')
+            return render(request, 'reserfast/clientes/login_clientes.html', status=429)
+        
         try:
             cliente = TblCliente.objects.get(s_email=email, b_activo=True)
             
-            if bcrypt.checkpw(password.encode('utf-8'), cliente.s_contrasena.encode('utf-8')):
-                request.session['cliente_id'] = cliente.id_cliente
-                
-                messages.success(request, f'Bienvenido, {cliente.s_primernombrecliente}!')
-                return redirect('reserfast:index_cliente')
+            if passwords.check_password(password, cliente.s_contrasena):
+                if passwords.needs_rehash(cliente.s_contrasena):
+                    _rehash_password('cliente', cliente.id_cliente, password)
+                throttle.reiniciar(email)
+                return _iniciar_sesion_cliente(request, cliente)
             else:
-                messages.error(request, 'Email o contrasea incorrectos.')
+                messages.error(request, 'Email o contraseña incorrectos.')
         except TblCliente.DoesNotExist:
-            messages.error(request, 'Email o contrasea incorrectos.')
+            messages.error(request, 'Email o contraseña incorrectos.')
         except Exception as e:
             logger.error(f"Error en login_clientes: {e}")
             messages.error(request, 'Error interno del servidor.')
     
     return render(request, 'reserfast/clientes/login_clientes.html')
 
+async def alogin_clientes(request):
+    """`login_clientes` para despliegues ASGI (ver `alogin_admin`)."""
+    if request.method == 'POST':
+        email = request.POST.get('email', '').strip()
+        password = request.POST.get('contrasena', '').strip()
+        
+        if not email or not password:
+            messages.error(request, 'Email y contraseña son obligatorios.')
+            return await sync_to_async(render)(request, 'reserfast/clientes/login_clientes.html')
+        
+        if not await sync_to_async(throttle.permitir)(request.META.get('REMOTE_ADDR'), email):
+            messages.error(request, 'Demasiados intentos. Espera un momento e inténtalo de nuevo.')
+            return await sync_to_async(render)(request, 'reserfast/clientes/login_clientes.html', status=429)
+        
+        try:
+            cliente = await TblCliente.objects.aget(s_email=email, b_activo=True)
+            
+            if await passwords.acheck_password(password, cliente.s_contrasena):
+                if passwords.needs_rehash(cliente.s_contrasena):
+                    await _arehash_password('cliente', cliente.id_cliente, password)
+                await sync_to_async(throttle.reiniciar)(email)
+                return await sync_to_async(_iniciar_sesion_cliente)(request, cliente)
+            else:
+                messages.error(request, 'Email o contraseña incorrectos.')
+        except TblCliente.DoesNotExist:
+            messages.error(request, 'Email o contraseña incorrectos.')
+        except Exception as e:
+            logger.error(f"Error en alogin_clientes: {e}")
+            messages.error(request, 'Error interno del servidor.')
+    
+    return await sync_to_async(render)(request, 'reserfast/clientes/login_clientes.html')
+
 def logout_empleado(request):
     """Cerrar sesi�n de empleados."""
     request.session.flush()
@@ -430,9 +402,8 @@ def cambiar_password_empleado(request):
     if not user_id:
         return redirect('reserfast:login_admin')
     
-    try:
-        usuario = TblUsuario.objects.get(id_usuario=user_id)
-    except TblUsuario.DoesNotExist:
+    usuario = get_usuario(request)
+    if usuario is None:
         messages.error(request, 'Usuario no encontrado.')
         return redirect('reserfast:login_admin')
     
@@ -445,7 +416,7 @@ def cambiar_password_empleado(request):
             messages.error(request, 'Todos los campos son obligatorios.')
             return render(request, 'reserfast/cambiar_password.html')
         
-        if not bcrypt.checkpw(current_password.encode('utf-8'), usuario.s_contrasenausuario.encode('utf-8')):
+        if not passwords.check_password(current_password, usuario.s_contrasenausuario):
             messages.error(request, 'La contrasea actual es incorrecta.')
             return render(request, 'reserfast/cambiar_password.html')
         
@@ -458,8 +429,7 @@ def cambiar_password_empleado(request):
             return render(request, 'reserfast/cambiar_password.html')
         
         try:
-            hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
-            usuario.s_contrasenausuario = hashed_password.decode('utf-8')
+            usuario.s_contrasenausuario = passwords.hash_password(new_password)
             usuario.save()
             
             messages.success(request, 'Contrasea cambiada exitosamente.')
@@ -487,42 +457,38 @@ def index_cliente(request):
     return render(request, 'reserfast/clientes/index_cliente.html', context)
 
 @cliente_login_required
+@condicional.revalidable(condicional.catalogo_etag, condicional.catalogo_last_modified)
 def menu_cliente(request):
     """Vista del men� para clientes."""
-    menus = TblMenu.objects.filter(b_activo=True).order_by('s_titulomenu')
-    # Agrupar en categorías esperadas por el template
-    frio, caliente, almuerzos, bebidas = [], [], [], []
-    for m in menus:
-        tipo = (m.s_tipomenu or '').strip().lower()
-        if 'entrada' in tipo:
-            frio.append(m)
-        elif 'rapida' in tipo or 'rápida' in tipo or 'rapido' in tipo or 'rápido' in tipo:
-            caliente.append(m)
-        elif 'almuerzo' in tipo:
-            almuerzos.append(m)
-        elif 'bebida' in tipo:
-            bebidas.append(m)
-        else:
-            # Si no calza, se podría mostrar en "caliente" como fallback
-            caliente.append(m)
-    context = {
-        'frio': frio,
-        'caliente': caliente,
-        'almuerzos': almuerzos,
-        'bebidas': bebidas,
-    }
+    # Agrupados por sección de la carta en la instantánea del catálogo
+    context = dict(catalogo.actual().menus_cliente)
     return render(request, 'reserfast/clientes/menu.html', context)
 
 @cliente_login_required
+@condicional.revalidable(condicional.catalogo_etag, condicional.catalogo_last_modified)
 def mesa_cliente(request):
-    """Vista de mesas para clientes."""
-    mesas = TblMesa.objects.filter(b_activo=True).order_by('s_nombremesa')
-    return render(request, 'reserfast/clientes/mesas.html', {'mesas': mesas})
+    """Vista de mesas para clientes, por ubicación.
+
+    Cada tarjeta (`sub_mesa.html`) sale del caché de fragmentos mientras la
+    mesa no cambie.
+    """
+    secciones = {'interior': [], 'terraza': [], 'vip': []}
+    for mesa in catalogo.actual().mesas_activas:
+        ubicacion = (mesa.s_ubicacion or '').strip().lower()
+        # Sin ubicación conocida se muestran en el salón.
+        secciones.get(ubicacion, secciones['interior']).append({'mesa': mesa, 'disponible': not mesa.b_ocupado})
+    return render(request, 'reserfast/clientes/mesa.html', {
+        'mesas_interior': secciones['interior'],
+        'mesas_terraza': secciones['terraza'],
+        'mesas_vip': secciones['vip'],
+    })
 
 def create_clientes(request):
     """Crear nuevo cliente."""
     if request.method == 'POST':
         form = ClienteForm(request.POST, request.FILES)
+        if uploads.error(request, 's_foto_perfil'):
+            form.add_error('s_foto_perfil', uploads.error(request, 's_foto_perfil'))
         if form.is_valid():
             try:
                 cliente = form.save()
@@ -578,6 +544,8 @@ def editar_perfil_cliente(request):
     cliente = request.cliente  # Disponible a trav�s del decorador
     if request.method == 'POST':
         form = EditarPerfilForm(request.POST, request.FILES, instance=cliente, user=cliente)
+        if uploads.error(request, 's_foto_perfil'):
+            form.add_error('s_foto_perfil', uploads.error(request, 's_foto_perfil'))
         if form.is_valid():
             try:
                 form.save()
@@ -586,6 +554,9 @@ def editar_perfil_cliente(request):
             except Exception as e:
                 logger.error(f"Error al editar perfil: {e}")
                 messages.error(request, 'Error al actualizar perfil.')
+        # Una validación fallida deja en `cliente` los datos enviados; la
+        # cabecera del perfil muestra los guardados.
+        cliente = TblCliente.objects.filter(pk=cliente.pk).first() or cliente
     else:
         form = EditarPerfilForm(instance=cliente, user=cliente)
     
@@ -595,10 +566,8 @@ def editar_perfil_cliente(request):
 @usuario_login_required
 def editar_perfil_empleado(request):
     """Permitir a garzón/cocinero/admin editar su propio perfil básico y contraseña."""
-    user_id = request.session.get('id_usuario')
-    try:
-        usuario = TblUsuario.objects.get(id_usuario=user_id)
-    except TblUsuario.DoesNotExist:
+    usuario = get_usuario(request)
+    if usuario is None:
         messages.error(request, 'Usuario no encontrado.')
         return redirect('reserfast:index')
 
@@ -723,11 +692,12 @@ def crear_venta(request):
 @cliente_login_required
 def crear_reserva(request):
     """Crear una nueva reserva."""
+    cat = catalogo.actual()
     mesas_disponibles = TblMesa.objects.filter(b_activo=True).order_by('s_nombremesa')
     menus_disponibles = TblMenu.objects.filter(b_activo=True).order_by('s_titulomenu')
     
     if request.method == 'POST':
-        form = CrearReservaForm(request.POST, mesas=mesas_disponibles, menus=menus_disponibles)
+        form = CrearReservaForm(request.POST, mesas=mesas_disponibles, menus=menus_disponibles, catalogo=cat)
         
         if form.is_valid():
             try:
@@ -770,17 +740,18 @@ def crear_reserva(request):
                 for error in errors:
                     messages.error(request, f'{field}: {error}')
     else:
-        form = CrearReservaForm(mesas=mesas_disponibles, menus=menus_disponibles)
+        form = CrearReservaForm(mesas=mesas_disponibles, menus=menus_disponibles, catalogo=cat)
     
     try:
+        # Los querysets solo validan el POST; el render usa la instantánea.
         context = {
             'form': form,
-            'mesas_disponibles': bool(mesas_disponibles),
-            'mesas_list': mesas_disponibles,
-            'mesas_count': mesas_disponibles.count(),
-            'menus_disponibles': bool(menus_disponibles),
-            'menus_list': menus_disponibles,
-            'menus_count': menus_disponibles.count(),
+            'mesas_disponibles': bool(cat.mesas_activas),
+            'mesas_list': cat.mesas_activas,
+            'mesas_count': len(cat.mesas_activas),
+            'menus_disponibles': bool(cat.menus_por_titulo),
+            'menus_list': cat.menus_por_titulo,
+            'menus_count': len(cat.menus_por_titulo),
             'debug_info': settings.DEBUG,
         }
         
@@ -797,38 +768,15 @@ def mis_reservas(request):
     cliente_id = request.session.get('cliente_id')
     
     try:
-        reservas = TblReserva.objects.filter(
-            fk_id_cliente_id=cliente_id
-        ).order_by('-d_fechainicio')
-
         hoy = timezone.now().date()
+        reservas = hidratar_reservas(
+            TblReserva.objects.filter(fk_id_cliente_id=cliente_id).order_by('-d_fechainicio'),
+            hoy=hoy,
+        )
         reservas_futuras, reservas_pasadas = [], []
 
-        for reserva in reservas:
-            mesa_rm = TblReservamesa.objects.filter(
-                fk_id_reserva=reserva, b_activo=True
-            ).select_related('fk_id_mesa').first()
-            mesa = mesa_rm.fk_id_mesa if mesa_rm and mesa_rm.fk_id_mesa else None
-
-            menus_rm = TblReservamenu.objects.filter(
-                fk_id_reserva=reserva, b_activo=True
-            ).select_related('fk_id_menu')
-            menus = [rm.fk_id_menu for rm in menus_rm if rm.fk_id_menu]
-
-            if not reserva.b_activo:
-                estado = 'Cancelada'
-            elif reserva.d_fechainicio and reserva.d_fechainicio < hoy:
-                estado = 'Pasada'
-            else:
-                estado = 'Activa'
-
-            detalle = {
-                'reserva': reserva,
-                'mesa': mesa,
-                'menus': menus,
-                'estado': estado,
-            }
-
+        for detalle in reservas:
+            reserva = detalle.reserva
             if reserva.d_fechainicio and reserva.d_fechainicio >= hoy and reserva.b_activo:
                 reservas_futuras.append(detalle)
             else:
@@ -867,6 +815,7 @@ def editar_reserva(request, reserva_id):
         messages.error(request, 'Reserva no encontrada.')
         return redirect('reserfast:mis_reservas')
 
+    cat = catalogo.actual()
     mesas_disponibles = TblMesa.objects.filter(b_activo=True).order_by('s_nombremesa')
     menus_disponibles = TblMenu.objects.filter(b_activo=True).order_by('s_titulomenu')
 
@@ -876,7 +825,7 @@ def editar_reserva(request, reserva_id):
     menu_ids_actuales_str = [str(mid) for mid in menu_ids_actuales]
 
     if request.method == 'POST':
-        form = EditarReservaForm(request.POST, mesas=mesas_disponibles, menus=menus_disponibles, reserva=reserva)
+        form = EditarReservaForm(request.POST, mesas=mesas_disponibles, menus=menus_disponibles, catalogo=cat, reserva=reserva)
         if form.is_valid():
             try:
                 with transaction.atomic():
@@ -920,10 +869,11 @@ def editar_reserva(request, reserva_id):
             'mesa': reserva_mesa.fk_id_mesa if reserva_mesa and reserva_mesa.fk_id_mesa else None,
             'menus': menu_ids_actuales,
         }
-        form = EditarReservaForm(initial=initial, mesas=mesas_disponibles, menus=menus_disponibles, reserva=reserva)
+        form = EditarReservaForm(initial=initial, mesas=mesas_disponibles, menus=menus_disponibles, catalogo=cat, reserva=reserva)
 
     context = {
         'form': form,
+        'menus_list': cat.menus_por_titulo,
         'reserva': reserva,
         'reserva_mesa': reserva_mesa,
     'menu_ids_actuales_str': menu_ids_actuales_str,
@@ -933,35 +883,19 @@ def editar_reserva(request, reserva_id):
 @require_POST
 @usuario_login_required
 def ajax_toggle_empleado_servicio(request):
-    """Alternar el estado de servicio del empleado actual (garzón/cocinero)."""
+    """Alternar (o fijar) el estado de servicio del empleado actual (garzón/cocinero)."""
     try:
         user_id = request.session.get('id_usuario')
         rol = request.session.get('perfil_usuario')
         if not user_id or rol not in ('garzon', 'cocinero'):
             return JsonResponse({'success': False, 'mensaje': 'Permisos insuficientes.'})
 
-        db_path = settings.DATABASES['default']['NAME']
-        with sqlite3.connect(db_path) as conn:
-            cur = conn.cursor()
-            cur.execute('''
-                CREATE TABLE IF NOT EXISTS tbl_estado_empleado (
-                    id_usuario INTEGER PRIMARY KEY,
-                    rol TEXT NOT NULL,
-                    en_servicio INTEGER NOT NULL DEFAULT 0,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            # Leer estado actual
-            cur.execute("SELECT en_servicio FROM tbl_estado_empleado WHERE id_usuario = ?", (user_id,))
-            row = cur.fetchone()
-            nuevo = 1
-            if row:
-                nuevo = 0 if row[0] == 1 else 1
-                cur.execute("UPDATE tbl_estado_empleado SET en_servicio = ?, rol = ?, updated_at = CURRENT_TIMESTAMP WHERE id_usuario = ?", (nuevo, rol, user_id))
-            else:
-                cur.execute("INSERT INTO tbl_estado_empleado (id_usuario, rol, en_servicio) VALUES (?, ?, ?)", (user_id, rol, 1))
-                nuevo = 1
-            conn.commit()
+        # Con `en_servicio` ('1'/'0') se fija el estado (idempotente); sin él se alterna.
+        deseado = request.POST.get('en_servicio', _parse_json(request).get('en_servicio'))
+        if deseado is None or deseado == '':
+            nuevo = servicio.alternar(user_id, rol)
+        else:
+            nuevo = servicio.establecer(user_id, rol, str(deseado).lower() in ('1', 'true', 'on'))
 
         return JsonResponse({'success': True, 'en_servicio': bool(nuevo)})
     except Exception as e:
@@ -984,6 +918,75 @@ def _parse_json(request):
         pass
     return {}
 
+@usuario_login_required
+def ajax_admin_estadisticas(request):
+    """Contadores del panel de administración en JSON (mismos datos que index_admin)."""
+    if not _require_admin(request):
+        return JsonResponse({'success': False, 'mensaje': 'Permisos insuficientes.'}, status=403)
+    try:
+        return JsonResponse({
+            'success': True,
+            **dashboard.estadisticas(),
+            'login_throttle': throttle.contadores(),
+            'fragmentos': fragmentos.contadores(),
+        })
+    except Exception as e:
+        logger.error(f"Error al calcular estadísticas del panel: {e}")
+        return JsonResponse({'success': False, 'mensaje': 'Error interno.'})
+
+# Pestañas paginadas del panel: queryset, campo de orden, descendente
+ADMIN_TAB_PAGE_SIZE = 25
+_ADMIN_TABS = {
+    'garzones': (lambda: TblUsuario.objects.filter(fk_id_perfil_id__in=perfiles.ids('garzon')), 's_nombreusuario', False),
+    'cocineros': (lambda: TblUsuario.objects.filter(fk_id_perfil_id__in=perfiles.ids('cocinero')), 's_nombreusuario', False),
+    'usuarios': (lambda: TblUsuario.objects.select_related('fk_id_perfil'), 's_nombreusuario', False),
+    'menus': (lambda: TblMenu.objects.all(), 's_titulomenu', False),
+    'mesas': (lambda: TblMesa.objects.all(), 's_nombremesa', False),
+    'reservas': (lambda: TblReserva.objects.select_related('fk_id_cliente'), 'd_fechainicio', True),
+}
+
+@usuario_login_required
+def ajax_admin_tab(request, tab):
+    """Una página de filas (HTML) de una pestaña del panel de administración.
+
+    GET `cursor` continúa desde la página anterior; la respuesta trae `html`
+    y `siguiente` (None en la última página). La pestaña `reportes` no se
+    pagina.
+    """
+    if not _require_admin(request):
+        return JsonResponse({'success': False, 'mensaje': 'Permisos insuficientes.'}, status=403)
+    if tab == 'reportes':
+        context = {
+            **dashboard.estadisticas(),
+            'ultimos_clientes': TblCliente.objects.filter(b_activo=True).order_by('-id_cliente')[:5],
+            'ultimos_menus': sorted(catalogo.actual().menus_activos, key=lambda m: -m.id_menu)[:5],
+        }
+        html = render_to_string('reserfast/admin/sub_tab_reportes.html', context, request=request)
+        return JsonResponse({'success': True, 'html': html, 'siguiente': None})
+    if tab not in _ADMIN_TABS:
+        return JsonResponse({'success': False, 'mensaje': 'Pestaña no encontrada.'}, status=404)
+
+    consulta, campo, descendente = _ADMIN_TABS[tab]
+    cursor = request.GET.get('cursor') or None
+    try:
+        filas, siguiente = pagina_keyset(
+            consulta(), campo, cursor, ADMIN_TAB_PAGE_SIZE, descendente=descendente
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'mensaje': str(e)}, status=400)
+
+    if tab in ('garzones', 'cocineros'):
+        estados = servicio.estados()
+        for u in filas:
+            u.en_servicio = estados.get(u.id_usuario, False)
+
+    html = render_to_string(
+        f'reserfast/admin/sub_tab_{tab}.html',
+        {'filas': filas, 'primera_pagina': cursor is None},
+        request=request,
+    )
+    return JsonResponse({'success': True, 'html': html, 'siguiente': siguiente})
+
 @require_POST
 @usuario_login_required
 def ajax_crear_garzon(request):
@@ -1001,7 +1004,7 @@ def ajax_crear_garzon(request):
         if TblUsuario.objects.filter(s_usuario=usuario_login).exists():
             return JsonResponse({'success': False, 'mensaje': 'El usuario ya existe.'})
         perfil = resolve_perfil('garzon')
-        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed = passwords.hash_password(password)
         u = TblUsuario(
             s_nombreusuario=nombre,
             s_primerapellidousuario=p_ap,
@@ -1026,7 +1029,7 @@ def ajax_editar_garzon(request, id_usuario):
         return JsonResponse({'success': False, 'mensaje': 'Permisos insuficientes.'}, status=403)
     data = _parse_json(request)
     try:
-        u = TblUsuario.objects.get(id_usuario=id_usuario, fk_id_perfil__s_nombreperfil__iexact='garzon')
+        u = TblUsuario.objects.get(id_usuario=id_usuario, fk_id_perfil_id__in=perfiles.ids('garzon'))
         nombre = (data.get('s_nombreusuario') or u.s_nombreusuario or '').strip()
         p_ap = (data.get('s_primerapellidousuario') or u.s_primerapellidousuario or '').strip()
         s_ap = (data.get('s_segundoapellidousuario') or u.s_segundoapellidousuario or '').strip()
@@ -1044,7 +1047,7 @@ def ajax_editar_garzon(request, id_usuario):
         u.s_segundoapellidousuario = s_ap
         u.s_usuario = usuario_login
         if new_pass:
-            u.s_contrasenausuario = bcrypt.hashpw(new_pass.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            u.s_contrasenausuario = passwords.hash_password(new_pass)
         u.save()
         return JsonResponse({'success': True, 'mensaje': 'Garzón actualizado.'})
     except TblUsuario.DoesNotExist:
@@ -1059,7 +1062,7 @@ def ajax_eliminar_garzon(request, id_usuario):
     if not _require_admin(request):
         return JsonResponse({'success': False, 'mensaje': 'Permisos insuficientes.'}, status=403)
     try:
-        u = TblUsuario.objects.get(id_usuario=id_usuario, fk_id_perfil__s_nombreperfil__iexact='garzon')
+        u = TblUsuario.objects.get(id_usuario=id_usuario, fk_id_perfil_id__in=perfiles.ids('garzon'))
         u.b_activo = False
         u.save()
         return JsonResponse({'success': True, 'mensaje': 'Garzón eliminado.'})
@@ -1086,7 +1089,7 @@ def ajax_crear_cocinero(request):
         if TblUsuario.objects.filter(s_usuario=usuario_login).exists():
             return JsonResponse({'success': False, 'mensaje': 'El usuario ya existe.'})
         perfil = resolve_perfil('cocinero')
-        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed = passwords.hash_password(password)
         u = TblUsuario(
             s_nombreusuario=nombre,
             s_primerapellidousuario=p_ap,
@@ -1111,7 +1114,7 @@ def ajax_editar_cocinero(request, id_usuario):
         return JsonResponse({'success': False, 'mensaje': 'Permisos insuficientes.'}, status=403)
     data = _parse_json(request)
     try:
-        u = TblUsuario.objects.get(id_usuario=id_usuario, fk_id_perfil__s_nombreperfil__iexact='cocinero')
+        u = TblUsuario.objects.get(id_usuario=id_usuario, fk_id_perfil_id__in=perfiles.ids('cocinero'))
         nombre = (data.get('s_nombreusuario') or u.s_nombreusuario or '').strip()
         p_ap = (data.get('s_primerapellidousuario') or u.s_primerapellidousuario or '').strip()
         s_ap = (data.get('s_segundoapellidousuario') or u.s_segundoapellidousuario or '').strip()
@@ -1129,7 +1132,7 @@ def ajax_editar_cocinero(request, id_usuario):
         u.s_segundoapellidousuario = s_ap
         u.s_usuario = usuario_login
         if new_pass:
-            u.s_contrasenausuario = bcrypt.hashpw(new_pass.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            u.s_contrasenausuario = passwords.hash_password(new_pass)
         u.save()
         return JsonResponse({'success': True, 'mensaje': 'Cocinero actualizado.'})
     except TblUsuario.DoesNotExist:
@@ -1144,7 +1147,7 @@ def ajax_eliminar_cocinero(request, id_usuario):
     if not _require_admin(request):
         return JsonResponse({'success': False, 'mensaje': 'Permisos insuficientes.'}, status=403)
     try:
-        u = TblUsuario.objects.get(id_usuario=id_usuario, fk_id_perfil__s_nombreperfil__iexact='cocinero')
+        u = TblUsuario.objects.get(id_usuario=id_usuario, fk_id_perfil_id__in=perfiles.ids('cocinero'))
         u.b_activo = False
         u.save()
         return JsonResponse({'success': True, 'mensaje': 'Cocinero eliminado.'})
@@ -1227,6 +1230,7 @@ def eliminar_reserva(request, reserva_id):
         messages.error(request, 'Error al cancelar reserva.')
     return redirect('reserfast:mis_reservas')
 
+@condicional.revalidable(condicional.disponibilidad_etag)
 def verificar_disponibilidad_mesa(request, mesa_id):
     """Verificar si una mesa est� disponible en una fecha espec�fica."""
     if request.method == 'GET':
@@ -1243,21 +1247,15 @@ def verificar_disponibilidad_mesa(request, mesa_id):
             
             fecha_reserva = datetime.strptime(fecha, '%Y-%m-%d').date()
             
-            reservas_qs = TblReservamesa.objects.filter(
-                fk_id_mesa=mesa,
-                fk_id_reserva__d_fechainicio=fecha_reserva,
-                fk_id_reserva__b_activo=True,
-                b_activo=True
-            )
+            exclude_id_int = None
             if exclude_reserva_id:
                 try:
                     exclude_id_int = int(exclude_reserva_id)
-                    reservas_qs = reservas_qs.exclude(fk_id_reserva_id=exclude_id_int)
                 except Exception:
                     pass
-            reservas_existentes = reservas_qs.exists()
+            disponible = disponibilidad.mesa_disponible(mesa.id_mesa, fecha_reserva, exclude_id_int)
             
-            if reservas_existentes:
+            if not disponible:
                 return JsonResponse({
                     'disponible': False, 
                     'mensaje': f'La mesa {mesa.s_nombremesa} ya est� reservada para el {fecha}.',
@@ -1280,27 +1278,86 @@ def verificar_disponibilidad_mesa(request, mesa_id):
     
     return JsonResponse({'disponible': False, 'mensaje': 'M�todo no permitido.'})
 
+def disponibilidad_mesas(request):
+    """Matriz de disponibilidad mesa × fecha para un rango de fechas.
+
+    Parámetros GET: `desde` y `hasta` (YYYY-MM-DD, máximo
+    disponibilidad.MAX_DIAS días), `ubicacion` y `exclude_reserva_id`
+    opcionales. Cada mesa trae una cadena `ocupacion` con un carácter por día
+    del rango ('1' = ocupada), para que los selectores de fecha/mesa se
+    pinten con una sola petición.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'success': False, 'mensaje': 'Método no permitido.'})
+
+    from datetime import datetime, timedelta
+
+    try:
+        desde = datetime.strptime(request.GET.get('desde', ''), '%Y-%m-%d').date()
+        hasta = datetime.strptime(request.GET.get('hasta', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return JsonResponse({'success': False, 'mensaje': 'Formato de fecha inválido.'})
+    if hasta < desde:
+        return JsonResponse({'success': False, 'mensaje': 'Rango de fechas inválido.'})
+    if (hasta - desde).days + 1 > disponibilidad.MAX_DIAS:
+        return JsonResponse({
+            'success': False,
+            'mensaje': f'El rango no puede superar {disponibilidad.MAX_DIAS} días.',
+        })
+
+    exclude_id_int = None
+    exclude_reserva_id = request.GET.get('exclude_reserva_id')
+    if exclude_reserva_id:
+        try:
+            exclude_id_int = int(exclude_reserva_id)
+        except Exception:
+            pass
+
+    try:
+        mesas = TblMesa.objects.filter(b_activo=True)
+        ubicacion = request.GET.get('ubicacion', '').strip()
+        if ubicacion:
+            mesas = mesas.filter(s_ubicacion__iexact=ubicacion)
+        mesas = list(
+            mesas.order_by('s_nombremesa').values('id_mesa', 's_nombremesa', 's_ubicacion')
+        )
+        ocupacion = disponibilidad.matriz([m['id_mesa'] for m in mesas], desde, hasta, exclude_id_int)
+        return JsonResponse({
+            'success': True,
+            'desde': desde.isoformat(),
+            'hasta': hasta.isoformat(),
+            'fechas': [(desde + timedelta(days=n)).isoformat() for n in range((hasta - desde).days + 1)],
+            'mesas': [
+                {
+                    'id': m['id_mesa'],
+                    'nombre': m['s_nombremesa'],
+                    'ubicacion': m['s_ubicacion'],
+                    'ocupacion': ocupacion[m['id_mesa']],
+                }
+                for m in mesas
+            ],
+        })
+    except Exception as e:
+        logger.error(f"Error al calcular disponibilidad de mesas: {e}")
+        return JsonResponse({'success': False, 'mensaje': 'Error al verificar disponibilidad.'})
+
 def detalle_reserva_ajax(request):
     if request.method == 'GET':
         reserva_id = request.GET.get('reserva_id')
         if not reserva_id:
             return JsonResponse({'success': False, 'mensaje': 'ID de reserva requerido.'})
         try:
-            reserva = TblReserva.objects.get(id_reserva=reserva_id, b_activo=True)
-            cliente = reserva.fk_id_cliente
-            mesa_rm = TblReservamesa.objects.filter(
-                fk_id_reserva=reserva, b_activo=True
-            ).select_related('fk_id_mesa').first()
-            mesa_nombre = mesa_rm.fk_id_mesa.s_nombremesa if mesa_rm and mesa_rm.fk_id_mesa else ''
-
-            menus_rm = TblReservamenu.objects.filter(
-                fk_id_reserva=reserva, b_activo=True
-            ).select_related('fk_id_menu')
-            menus_json = []
-            for rm in menus_rm:
-                m = rm.fk_id_menu
-                if m:
-                    menus_json.append({'nombre': m.s_titulomenu or '', 'precio': int(m.i_precio or 0)})
+            detalles = hidratar_reservas(TblReserva.objects.filter(id_reserva=reserva_id, b_activo=True))
+            if not detalles:
+                raise TblReserva.DoesNotExist
+            detalle = detalles[0]
+            reserva = detalle.reserva
+            cliente = detalle.cliente
+            mesa_nombre = detalle.mesa.s_nombremesa if detalle.mesa else ''
+            menus_json = [
+                {'nombre': m.s_titulomenu or '', 'precio': int(m.i_precio or 0)}
+                for m in detalle.menus
+            ]
             data = {
                 'success': True,
                 'reserva': {
@@ -1394,22 +1451,18 @@ def crear_menu_cocina(request):
             )
 
             # Asignar usuario creador si disponible
-            try:
-                usuario = TblUsuario.objects.get(id_usuario=request.session.get('id_usuario'))
+            usuario = get_usuario(request)
+            if usuario is not None:
                 nuevo_menu.fk_id_usuario = usuario
-            except Exception:
-                pass
 
             # Manejar imagen si se proporciona
+            # Tipo (bytes mágicos), tamaño y dimensiones ya se validaron al recibir
+            # el archivo (uploads.ImagenUploadHandler); aquí solo se informa el motivo.
+            error_imagen = uploads.error(request, 's_imagen')
+            if error_imagen:
+                return JsonResponse({'success': False, 'mensaje': error_imagen})
             if 's_imagen' in request.FILES:
-                imagen = request.FILES['s_imagen']
-                # Validar tama�o de archivo (m�ximo 5MB)
-                if imagen.size > 5 * 1024 * 1024:
-                    return JsonResponse({'success': False, 'mensaje': 'La imagen no puede ser mayor a 5MB.'})
-                tipos_permitidos = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp']
-                if imagen.content_type not in tipos_permitidos:
-                    return JsonResponse({'success': False, 'mensaje': 'Tipo de archivo no permitido. Use JPG, PNG, GIF o WebP.'})
-                nuevo_menu.s_imagen = imagen
+                nuevo_menu.s_imagen = request.FILES['s_imagen']
 
             nuevo_menu.save()
 
@@ -1449,7 +1502,7 @@ def ajax_crear_usuario(request):
                 perfil = TblPerfil.objects.get(id_perfil=int(perfil_alias))
             except Exception:
                 return JsonResponse({'success': False, 'mensaje': 'Perfil no encontrado.'})
-        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed = passwords.hash_password(password)
         u = TblUsuario(
             s_nombreusuario=nombre,
             s_primerapellidousuario=p_ap,
@@ -1501,7 +1554,7 @@ def ajax_editar_usuario(request, id_usuario):
             if perfil:
                 u.fk_id_perfil = perfil
         if new_pass:
-            u.s_contrasenausuario = bcrypt.hashpw(new_pass.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            u.s_contrasenausuario = passwords.hash_password(new_pass)
         u.save()
         return JsonResponse({'success': True, 'mensaje': 'Usuario actualizado.'})
     except TblUsuario.DoesNotExist:
@@ -1526,6 +1579,7 @@ def ajax_eliminar_usuario(request, id_usuario):
         logger.error(f"ajax_eliminar_usuario error: {e}")
         return JsonResponse({'success': False, 'mensaje': 'Error interno.'})
 @usuario_login_required
+@condicional.revalidable(condicional.menu_etag, condicional.catalogo_last_modified)
 def editar_menu_cocina(request, menu_id):
     """Editar un men existente desde la interfaz de cocina."""
     if request.session.get('perfil_usuario') not in ('cocinero', 'admin'):
@@ -1580,15 +1634,13 @@ def editar_menu_cocina(request, menu_id):
             menu.i_precio = precio_int
 
             # Manejar nueva imagen si se proporciona
+            # Tipo (bytes mágicos), tamaño y dimensiones ya se validaron al recibir
+            # el archivo (uploads.ImagenUploadHandler); aquí solo se informa el motivo.
+            error_imagen = uploads.error(request, 's_imagen')
+            if error_imagen:
+                return JsonResponse({'success': False, 'mensaje': error_imagen})
             if 's_imagen' in request.FILES:
-                imagen = request.FILES['s_imagen']
-                # Validar tama�o de archivo (m�ximo 5MB)
-                if imagen.size > 5 * 1024 * 1024:
-                    return JsonResponse({'success': False, 'mensaje': 'La imagen no puede ser mayor a 5MB.'})
-                tipos_permitidos = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp']
-                if imagen.content_type not in tipos_permitidos:
-                    return JsonResponse({'success': False, 'mensaje': 'Tipo de archivo no permitido. Use JPG, PNG, GIF o WebP.'})
-                menu.s_imagen = imagen
+                menu.s_imagen = request.FILES['s_imagen']
 
             menu.save()
 